@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Dispatch benchmark for the SimpleScript virtual machine.
+
+Compares the per-step string dispatch loop (tuple unpack plus
+CPU.execute name lookup and an output-buffer poll, as Computer.run used
+to work) against the pre-decoded dispatch of Computer.run, and reports
+instructions/second. The countdown loop is also run with superinstruction
+fusion enabled and on the block and tracing engines; it runs to HALT so its instruction
+count is known exactly.
+
+Usage: python3 benchmarks/bench_dispatch.py [--steps N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.compiler import SimpleCompiler
+from src.computer import Computer
+
+COUNTER_ADDR = 16
+
+
+def countdown_program():
+    """A 7-instruction loop that decrements memory[16] until it reaches zero."""
+    return [
+        ("LDA_MEM", COUNTER_ADDR),
+        ("LDB", 1),
+        ("SUB", None),
+        ("STA", COUNTER_ADDR),
+        ("LDB", 0),
+        ("CMP", None),
+        ("JNZ", 0),
+        ("HALT", None),
+    ]
+
+
+def fibonacci_program():
+    """The compiled examples/fibonacci.txt program."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "examples", "fibonacci.txt")) as f:
+        return SimpleCompiler().compile(f.read())
+
+
+def run_string_dispatch(computer, max_steps):
+    """
+    Execute like the original Computer.run: unpack a tuple, dispatch by name
+    and poll the output buffer after every instruction.
+    """
+    cpu = computer.cpu
+    memory = computer.memory
+    program = computer.program
+    cpu.pc = 0
+    cpu.running = True
+    steps = 0
+    while steps < max_steps and cpu.running and cpu.pc < len(program):
+        instruction, operand = program[cpu.pc]
+        cpu.execute(instruction, operand)
+        steps += 1
+        if memory.read(computer.IO_OUTPUT_BUFFER) != 0:
+            computer.outputs.append(memory.read(computer.IO_OUTPUT_BUFFER))
+            count = memory.read(computer.IO_OUTPUT_COUNT)
+            memory.write(computer.IO_OUTPUT_COUNT, count + 1)
+            memory.write(computer.IO_OUTPUT_BUFFER, 0)
+    return steps
+
+
+def run_decoded_dispatch(computer, max_steps):
+    """Execute through the pre-decoded CodeObject of Computer.run."""
+    return computer.run(max_steps=max_steps)
+
+
+def run_to_halt(computer, max_steps):
+    """Execute with Computer.run until HALT and return the known instruction count."""
+    computer.run()
+    return max_steps
+
+
+def measure(program, runner, max_steps, setup=None, options=None):
+    """Run the program once and return (steps, seconds)."""
+    computer = Computer(**(options or {"fuse_instructions": False}))
+    computer.load_program(program)
+    if setup:
+        setup(computer)
+    start = time.perf_counter()
+    steps = runner(computer, max_steps)
+    return steps, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", type=int, default=10_000_000,
+                        help="instruction budget per run (default: 10M)")
+    args = parser.parse_args()
+
+    # The countdown loop runs 7 instructions per iteration plus the final HALT
+    iterations = args.steps // 7
+    countdown_steps = iterations * 7 + 1
+
+    def init_counter(computer):
+        computer.memory.write(COUNTER_ADDR, iterations)
+
+    cases = [
+        ("fibonacci.txt", fibonacci_program(), None, args.steps, [
+            ("string", run_string_dispatch, None),
+            ("decoded", run_decoded_dispatch, None),
+        ]),
+        ("countdown loop", countdown_program(), init_counter, countdown_steps, [
+            ("string", run_string_dispatch, None),
+            ("decoded", run_decoded_dispatch, None),
+            ("fused", run_to_halt, {"fuse_instructions": True}),
+            ("blocks", run_to_halt, {"engine": "blocks"}),
+            ("tracing", run_to_halt, {"engine": "tracing"}),
+        ]),
+    ]
+
+    print(f"{'program':<16} {'dispatch':<10} {'steps':>10} {'seconds':>9} {'instr/s':>12}")
+    for name, program, setup, steps, runners in cases:
+        rates = {}
+        for label, runner, options in runners:
+            executed, seconds = measure(program, runner, steps, setup, options)
+            rates[label] = executed / seconds
+            print(f"{name:<16} {label:<10} {executed:>10} {seconds:>9.3f} {rates[label]:>12,.0f}")
+        for label in rates:
+            if label != "string":
+                print(f"{name:<16} {label + ' speedup':<20} {rates[label] / rates['string']:>23.2f}x")
+
+
+if __name__ == "__main__":
+    main()
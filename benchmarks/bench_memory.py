@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Memory backend benchmark for the SimpleScript virtual machine.
+
+Compares the list-based Memory against TypedMemory at several word widths:
+- footprint of a memory filled with distinct values (the list holds a
+  pointer per word plus an int object per distinct value)
+- speed of random reads and writes through Memory.read/write
+- speed of a multiply loop, which grows big integers on list memory and
+  wraps around on typed memory
+
+Usage: python3 benchmarks/bench_memory.py [--sizes N,N] [--accesses N] [--iterations N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.memory import Memory, TypedMemory
+
+ACC_ADDR = 16
+COUNTER_ADDR = 17
+
+BACKENDS = [
+    ("list", lambda size: Memory(size)),
+    ("array q (64)", lambda size: TypedMemory(size, 64)),
+    ("array i (32)", lambda size: TypedMemory(size, 32)),
+    ("array h (16)", lambda size: TypedMemory(size, 16)),
+    ("array b (8)", lambda size: TypedMemory(size, 8)),
+]
+
+
+def multiply_program():
+    """A loop that multiplies memory[16] by 3 until memory[17] counts down to zero."""
+    return [
+        ("LDA_MEM", ACC_ADDR),
+        ("LDB", 3),
+        ("MUL", None),
+        ("STA", ACC_ADDR),
+        ("LDA_MEM", COUNTER_ADDR),
+        ("LDB", 1),
+        ("SUB", None),
+        ("STA", COUNTER_ADDR),
+        ("LDB", 0),
+        ("CMP", None),
+        ("JNZ", 0),
+        ("HALT", None),
+    ]
+
+
+def fill(memory):
+    """Fill memory with distinct values (as far as the word width allows)."""
+    values = range(1000, 1000 + memory.size)
+    if memory.word_bits is None:
+        memory.memory[:] = values
+    else:
+        limit = 1 << (memory.word_bits - 1)
+        memory.memory[:] = type(memory.memory)(memory.typecode, (v % limit for v in values))
+
+
+def footprint(memory):
+    """Return the bytes used by the memory cells, including int objects for lists."""
+    cells = memory.memory
+    size = sys.getsizeof(cells)
+    if memory.word_bits is None:
+        size += sum(map(sys.getsizeof, cells))
+    return size
+
+
+def time_accesses(memory, accesses):
+    """Return random reads plus writes per second through Memory.read/write."""
+    rng = random.Random(0)
+    addresses = [rng.randrange(memory.size) for _ in range(accesses)]
+    read = memory.read
+    write = memory.write
+    start = time.perf_counter()
+    for address in addresses:
+        write(address, read(address) + 1)
+    return 2 * accesses / (time.perf_counter() - start)
+
+
+def time_multiply(make_memory, iterations, engine):
+    """Return instructions per second of the multiply loop."""
+    computer = Computer(engine=engine, memory=make_memory(256))
+    computer.load_program(multiply_program())
+    computer.memory.write(ACC_ADDR, 1)
+    # Narrow words cannot hold the whole count, so the loop is run in chunks
+    chunk = iterations
+    if computer.memory.word_bits is not None:
+        chunk = min(iterations, (1 << (computer.memory.word_bits - 1)) - 1)
+
+    steps = 0
+    start = time.perf_counter()
+    for done in range(0, iterations, chunk):
+        count = min(chunk, iterations - done)
+        computer.memory.write(COUNTER_ADDR, count)
+        steps += computer.run(max_steps=count * 11 + 1)
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="65536,16777216",
+                        help="comma-separated memory sizes in words (default: 64K and 16M)")
+    parser.add_argument("--accesses", type=int, default=1_000_000,
+                        help="random read/write pairs per backend (default: 1M)")
+    parser.add_argument("--iterations", type=int, default=20_000,
+                        help="multiply loop iterations (default: 20K)")
+    args = parser.parse_args()
+
+    print(f"{'words':>10} {'backend':<14} {'bytes':>14} {'bytes/word':>11} {'accesses/s':>13}")
+    for size in map(int, args.sizes.split(",")):
+        for label, make_memory in BACKENDS:
+            memory = make_memory(size)
+            fill(memory)
+            used = footprint(memory)
+            rate = time_accesses(memory, args.accesses)
+            print(f"{size:>10} {label:<14} {used:>14,} {used / size:>11.1f} {rate:>13,.0f}")
+            del memory
+
+    print(f"\n{'multiply loop':<14} {'engine':<12} {'instr/s':>12}")
+    for label, make_memory in BACKENDS:
+        for engine in ("interpreter", "blocks"):
+            rate = time_multiply(make_memory, args.iterations, engine)
+            print(f"{label:<14} {engine:<12} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
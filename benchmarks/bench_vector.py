@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Vector engine benchmark for the SimpleScript virtual machine.
+
+Runs one program over N inputs with N scalar Computers and with a single
+VectorComputer of N lanes, for N = 1, 100 and 10,000, and reports the time
+of each and the speedup. The uniform program runs the same number of loop
+iterations on every lane; the divergent one runs as many iterations as each
+lane's input value.
+
+Usage: python3 benchmarks/bench_vector.py [--lanes 1,100,10000] [--iterations N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.vector import VectorComputer, np
+
+COUNTER = 16
+TOTAL = 17
+
+
+def loop_program(uniform, iterations):
+    """Sum input * counter while counting down from a fixed count or from the input."""
+    start = ("LDA", iterations) if uniform else ("LDA_MEM", 0xF0)
+    return [
+        start,
+        ("STA", COUNTER),
+        ("LDA_MEM", COUNTER),     # 2: loop head
+        ("LDB", 0),
+        ("CMP", None),
+        ("JZ", 17),
+        ("LDA_MEM", 0xF0),
+        ("LDB_MEM", COUNTER),
+        ("MUL", None),
+        ("LDB_MEM", TOTAL),
+        ("ADD", None),
+        ("STA", TOTAL),
+        ("LDA_MEM", COUNTER),
+        ("LDB", 1),
+        ("SUB", None),
+        ("STA", COUNTER),
+        ("JMP", 2),
+        ("LDA_MEM", TOTAL),       # 17: loop exit
+        ("STA", 0xF1),
+        ("HALT", None),
+    ]
+
+
+def run_scalar(program, inputs):
+    outputs = []
+    for value in inputs:
+        computer = Computer()
+        computer.load_program(program)
+        computer.set_input(value)
+        computer.run()
+        outputs.append(computer.get_all_outputs())
+    return outputs
+
+
+def run_vector(program, inputs):
+    computer = VectorComputer(len(inputs))
+    computer.load_program(program)
+    computer.set_input(inputs)
+    computer.run()
+    return computer.get_all_outputs()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lanes", default="1,100,10000",
+                        help="comma-separated lane counts (default: 1,100,10000)")
+    parser.add_argument("--iterations", type=int, default=50,
+                        help="loop iterations per lane (default: 50)")
+    args = parser.parse_args()
+
+    if np is None:
+        print("NumPy is not installed; the vector engine is unavailable.")
+        return
+
+    rng = random.Random(0)
+    print(f"{'program':<10} {'lanes':>6} {'scalar s':>10} {'vector s':>10} {'speedup':>9}")
+    for uniform in (True, False):
+        name = "uniform" if uniform else "divergent"
+        program = loop_program(uniform, args.iterations)
+        for lanes in (int(n) for n in args.lanes.split(",")):
+            inputs = [rng.randint(1, 2 * args.iterations) for _ in range(lanes)]
+            scalar, scalar_seconds = timed(run_scalar, program, inputs)
+            vector, vector_seconds = timed(run_vector, program, inputs)
+            if scalar != vector:
+                raise AssertionError(f"{name} outputs differ at {lanes} lanes")
+            print(f"{name:<10} {lanes:>6} {scalar_seconds:>10.3f} {vector_seconds:>10.3f} "
+                  f"{scalar_seconds / vector_seconds:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
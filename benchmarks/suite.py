@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the SimpleScript compiler and virtual machine.
+
+Runs four groups of benchmarks:
+- opcode: one microbenchmark per CPU instruction, a straight-line program
+  of the instruction repeated, run without fusion (ns per instruction)
+- compile: SimpleCompiler.compile on sources of 1K to 1M lines generated
+  by src/generator.py
+- example: compiling and running every program in examples/, with a step
+  limit for programs that do not halt
+- calls: call-heavy programs (nested calls and deep recursion) on every
+  execution engine
+
+Each benchmark is timed several times. The results are written as JSON and
+compared to a stored baseline: a benchmark only counts as slower or faster
+if its median moved by more than the threshold, which is widened by the
+run-to-run noise (the relative standard deviation) of both measurements.
+
+Baselines are machine-specific. Record one on the machine you compare on
+with --update-baseline (make bench-baseline) before relying on comparisons.
+
+Usage: python3 benchmarks/suite.py [--quick] [--filter TEXT] [--repeats N]
+           [--output FILE] [--baseline FILE] [--update-baseline]
+           [--threshold F] [--fail-on-regression]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import signal
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from src.compiler import SimpleCompiler
+from src.computer import Computer
+from src.generator import generate_program
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+FORMAT_VERSION = 1
+
+# Instructions per repeat of an opcode microbenchmark
+OPCODE_WORK = 200_000
+OPCODE_BODY = 1000
+
+# Global variables and functions of the generated sources compiled by
+# compile benchmarks
+COMPILE_VARIABLES = 50
+COMPILE_FUNCTIONS = 10
+
+# Step limit for example programs, some of which loop forever
+EXAMPLE_STEPS = 200_000
+
+# Seconds after which compiling or running an example is abandoned
+EXAMPLE_TIMEOUT = 10
+
+# Shortest time a single timing should take
+MIN_TIME = 0.05
+
+
+class Benchmark:
+    """
+    A named benchmark.
+
+    Args:
+        name: Unique name, "group/case"
+        unit: What the work is counted in, e.g. "instructions"
+        setup: Function returning (run, work): a function to time and the
+            amount of work one call does
+        repeats: Optional cap on the number of repeats
+    """
+
+    def __init__(self, name, unit, setup, repeats=None):
+        self.name = name
+        self.unit = unit
+        self.setup = setup
+        self.repeats = repeats
+
+    @property
+    def group(self):
+        return self.name.split("/", 1)[0]
+
+
+def opcode_body(name):
+    """Return the program for an opcode microbenchmark, and its work per pass."""
+    prefix = [("LDA", 1), ("LDB", 1), ("STA", 16)]
+    body = []
+    for i in range(OPCODE_BODY):
+        pc = len(prefix) + len(body)
+        if name in ("JMP", "JZ", "JNZ"):
+            body.append((name, pc + 1))
+        elif name == "CALL":
+            # CALL the RET two ahead, which returns to the JMP over it
+            body.extend([("CALL", pc + 2), ("JMP", pc + 3), ("RET", None)])
+        elif name == "PUSH":
+            body.extend([("PUSH", None), ("POP_PARAM", None)])
+        elif name in ("LDA_MEM", "LDB_MEM", "STA", "STB"):
+            body.append((name, 16))
+        elif name in ("LDA", "LDB"):
+            body.append((name, 1))
+        else:
+            body.append((name, None))
+    return prefix + body + [("HALT", None)], len(body)
+
+
+# Opcodes with a microbenchmark; CALL also covers RET and JMP, and PUSH
+# covers POP_PARAM
+OPCODES = ("LDA", "LDB", "LDA_MEM", "LDB_MEM", "STA", "STB",
+           "ADD", "SUB", "MUL", "DIV", "CMP", "JMP", "JZ", "JNZ", "CALL", "PUSH")
+
+
+def opcode_benchmark(name):
+    def setup():
+        program, work = opcode_body(name)
+        computer = Computer(fuse_instructions=False)
+        computer.load_program(program)
+        passes = max(1, OPCODE_WORK // work)
+
+        def run():
+            for _ in range(passes):
+                computer.run()
+        return run, passes * work
+    label = {"CALL": "CALL+JMP+RET", "PUSH": "PUSH+POP_PARAM"}.get(name, name)
+    return Benchmark(f"opcode/{label}", "instructions", setup)
+
+
+def compile_benchmark(lines):
+    def setup():
+        source = generate_program(seed=lines, variables=COMPILE_VARIABLES,
+                                  functions=COMPILE_FUNCTIONS,
+                                  statements=lines - COMPILE_VARIABLES, depth=3)
+
+        def run():
+            SimpleCompiler().compile(source)
+        # Function bodies and else lines make the source a little longer
+        return run, source.count("\n")
+    label = f"{lines // 1_000_000}M" if lines >= 1_000_000 else f"{lines // 1000}K"
+    # The largest sources take seconds per compile
+    return Benchmark(f"compile/{label} lines", "lines", setup,
+                     repeats=3 if lines >= 1_000_000 else None)
+
+
+class Timeout(BaseException):
+    """Raised when an example takes longer than EXAMPLE_TIMEOUT."""
+
+
+def time_limit(seconds):
+    """Raise Timeout in the main thread after seconds (0 cancels)."""
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+
+
+def _timeout(signum, frame):
+    raise Timeout()
+
+
+def example_benchmark(filename):
+    def setup():
+        with open(os.path.join(ROOT, "examples", filename)) as f:
+            source = f.read()
+
+        def run():
+            computer = Computer()
+            computer.load_program(SimpleCompiler().compile(source))
+            # Keep warnings printed by the CPU out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                return computer.run(max_steps=EXAMPLE_STEPS)
+        # Find out once whether the example works and how many steps it runs
+        time_limit(EXAMPLE_TIMEOUT)
+        try:
+            steps = run()
+        finally:
+            time_limit(0)
+        return run, steps
+    return Benchmark(f"example/{filename}", "instructions", setup)
+
+
+def nested_calls_program(count):
+    """A loop that calls f count times; f calls g."""
+    return [
+        ("LDA", count), ("STA", 16),                               # 0-1
+        ("CALL", 11),                                              # 2
+        ("LDA_MEM", 16), ("LDB", 1), ("SUB", None), ("STA", 16),   # 3-6
+        ("LDB", 0), ("CMP", None), ("JNZ", 2),                     # 7-9
+        ("HALT", None),                                            # 10
+        ("LDA", 3), ("PUSH", None), ("CALL", 16), ("POP_PARAM", None), ("RET", None),  # 11-15 f
+        ("LDA", 4), ("STA", 17), ("RET", None),                    # 16-18 g
+    ]
+
+
+def recursion_program(depth):
+    """A function that calls itself depth times, then unwinds."""
+    return [
+        ("LDA", depth), ("STA", 16),                               # 0-1
+        ("CALL", 4), ("HALT", None),                               # 2-3
+        ("LDA_MEM", 16), ("LDB", 0), ("CMP", None), ("JZ", 13),    # 4-7 f
+        ("LDB", 1), ("SUB", None), ("STA", 16),                    # 8-10
+        ("CALL", 4),                                               # 11
+        ("JMP", 13),                                               # 12
+        ("RET", None),                                             # 13
+    ]
+
+
+def calls_benchmark(label, program, engine):
+    def setup():
+        computer = Computer(engine=engine)
+        computer.load_program(program)
+
+        def run():
+            computer.memory.stack.clear()
+            computer.run()
+        # Count the instructions once on the hooked loop
+        counter = Computer(fuse_instructions=False)
+        counter.load_program(program)
+        steps = []
+        counter.hooks.add("instruction", steps.append)
+        counter.run()
+        return run, len(steps)
+    return Benchmark(f"calls/{label} ({engine})", "instructions", setup)
+
+
+def benchmarks(quick=False):
+    """Return the list of benchmarks."""
+    cases = [opcode_benchmark(name) for name in OPCODES]
+    sizes = (1000, 10_000) if quick else (1000, 10_000, 100_000, 1_000_000)
+    cases += [compile_benchmark(lines) for lines in sizes]
+    cases += [example_benchmark(filename)
+              for filename in sorted(os.listdir(os.path.join(ROOT, "examples")))
+              if filename.endswith((".ss", ".txt"))]
+    for engine in Computer.ENGINES:
+        cases.append(calls_benchmark("nested", nested_calls_program(10_000), engine))
+        cases.append(calls_benchmark("recursion", recursion_program(5000), engine))
+    return cases
+
+
+def measure(benchmark, repeats):
+    """
+    Run a benchmark and return its result as a dictionary.
+
+    Each timing covers enough calls of the benchmark to take at least
+    MIN_TIME seconds; times are reported per call. Benchmarks that fail or
+    time out report an error instead of times.
+    """
+    if benchmark.repeats is not None:
+        repeats = min(repeats, benchmark.repeats)
+    result = {"group": benchmark.group, "unit": benchmark.unit, "calls": 1}
+    try:
+        run, work = benchmark.setup()
+        # Short benchmarks are run several times per timing, like timeit's
+        # autorange, so that timer resolution and scheduling noise matter less
+        start = time.perf_counter()
+        run()
+        calls = max(1, math.ceil(MIN_TIME / max(time.perf_counter() - start, 1e-9)))
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(calls):
+                run()
+            times.append((time.perf_counter() - start) / calls)
+    except Timeout:
+        result["error"] = f"timed out after {EXAMPLE_TIMEOUT}s"
+        return result
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+    median = statistics.median(times)
+    result.update({
+        "calls": calls,
+        "work": work,
+        "times": times,
+        "median": median,
+        "min": min(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rate": work / median if median else None,
+    })
+    return result
+
+
+def noise(result):
+    """Return the relative standard deviation of a result."""
+    return result["stdev"] / result["median"] if result.get("median") else 0.0
+
+
+def compare(results, baseline, threshold=0.05, sigmas=3.0):
+    """
+    Compare benchmark results to a baseline.
+
+    A benchmark is "slower" or "faster" if its median changed by more than
+    the larger of threshold and sigmas times the combined relative noise of
+    the two measurements, and "same" otherwise.
+
+    Args:
+        results: The "benchmarks" dictionary of a result file
+        baseline: The "benchmarks" dictionary of the baseline file
+        threshold: The smallest relative change that counts
+        sigmas: How many standard deviations of noise a change must exceed
+
+    Returns:
+        A list of (name, baseline median, new median, ratio, allowed change,
+        status) tuples; status is also "new", "missing" or "error"
+    """
+    rows = []
+    for name in sorted(set(results) | set(baseline)):
+        new = results.get(name)
+        old = baseline.get(name)
+        if new is None:
+            rows.append((name, old.get("median"), None, None, None, "missing"))
+        elif old is None:
+            rows.append((name, None, new.get("median"), None, None, "new"))
+        elif "error" in new or "error" in old or not old.get("median"):
+            rows.append((name, old.get("median"), new.get("median"), None, None, "error"))
+        else:
+            ratio = new["median"] / old["median"]
+            allowed = max(threshold, sigmas * (noise(new) ** 2 + noise(old) ** 2) ** 0.5)
+            status = "slower" if ratio > 1 + allowed else "faster" if ratio < 1 - allowed else "same"
+            rows.append((name, old["median"], new["median"], ratio, allowed, status))
+    return rows
+
+
+def print_results(results):
+    print(f"{'benchmark':<40} {'median':>10} {'noise':>7} {'rate':>16}")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<40} {'error: ' + result['error']}")
+            continue
+        unit = "ns/instr" if result["unit"] == "instructions" and result["group"] == "opcode" else \
+            f"{result['unit']}/s"
+        rate = 1e9 / result["rate"] if unit == "ns/instr" else result["rate"]
+        print(f"{name:<40} {result['median']:>9.4f}s {100 * noise(result):>6.1f}% "
+              f"{rate:>12,.1f} {unit}")
+
+
+def print_comparison(rows):
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'new':>10} {'change':>8} {'allowed':>8}  status")
+    for name, old, new, ratio, allowed, status in rows:
+        old_text = f"{old:.4f}s" if old is not None else "-"
+        new_text = f"{new:.4f}s" if new is not None else "-"
+        change = f"{100 * (ratio - 1):+.1f}%" if ratio is not None else "-"
+        allowed_text = f"{100 * allowed:.1f}%" if allowed is not None else "-"
+        print(f"{name:<40} {old_text:>10} {new_text:>10} {change:>8} {allowed_text:>8}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true",
+                        help="skip the largest compile benchmarks and repeat less")
+    parser.add_argument("--filter", default="",
+                        help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeats", type=int, default=None,
+                        help="timed runs per benchmark (default: 5, 3 with --quick)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE,
+                        help=f"baseline to compare to (default: {os.path.relpath(BASELINE, ROOT)})")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the results as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="smallest relative change reported (default: 0.05)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 if any benchmark got slower")
+    args = parser.parse_args()
+    repeats = args.repeats or (3 if args.quick else 5)
+    if repeats < 2:
+        parser.error("--repeats must be at least 2 to estimate noise")
+
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _timeout)
+
+    results = {}
+    for benchmark in benchmarks(args.quick):
+        if args.filter in benchmark.name:
+            results[benchmark.name] = measure(benchmark, repeats)
+    print_results(results)
+
+    document = {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeats": repeats,
+            "quick": args.quick,
+        },
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+        print(f"\nStored baseline in {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; create one with --update-baseline")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["benchmarks"]
+    if args.filter:
+        baseline = {name: result for name, result in baseline.items() if args.filter in name}
+    rows = compare(results, baseline, args.threshold)
+    print_comparison(rows)
+    slower = [row[0] for row in rows if row[5] == "slower"]
+    if slower:
+        print(f"\n{len(slower)} benchmark(s) slower than the baseline")
+    return 1 if slower and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,12 @@ SimpleScript Launcher
 
 This script runs SimpleScript programs from text files.
 Usage: python3 run_simplescript.py <program_file>
+       python3 run_simplescript.py <program_file> --batch <inputs_file> [--workers N]
+       python3 run_simplescript.py <program_file> --compile <output.ssb>
+
+The program file can be SimpleScript source or a compiled .ssb object file.
+Compiled source is cached in a __sscache__ directory next to the source file;
+--no-cache disables the cache and --cache-stats reports its hit/miss counts.
 """
 
 import sys
@@ -14,38 +20,155 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 # Import SimpleScript components
-from src.compiler import SimpleCompiler
+from src.compiler import SimpleCompiler, format_location
 from src.computer import Computer
+from src.batch import run_batch
+from src.objfile import is_ssb, read_ssb, write_ssb
+from src.cache import CompileCache, cache_directory
+from src.debugger import Debugger
+
+def get_option(name, default=None):
+    """Return the value following a command line option, or default."""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def get_options(name):
+    """Return the values following every occurrence of a command line option."""
+    return [sys.argv[i + 1] for i, arg in enumerate(sys.argv[:-1]) if arg == name]
+
+def add_breakpoint(debugger, spec):
+    """
+    Add a breakpoint from a --break option.
+    
+    The spec is "pc:N", "line:N" or a bare line number, or a function name,
+    optionally followed by " if CONDITION".
+    """
+    location, _, condition = spec.partition(" if ")
+    location = location.strip()
+    condition = condition.strip() or None
+    if location.startswith("pc:"):
+        return debugger.add_breakpoint(pc=int(location[3:]), condition=condition)
+    if location.startswith("line:"):
+        location = location[5:]
+    if location.isdigit():
+        return debugger.add_breakpoint(line=int(location), condition=condition)
+    return debugger.add_breakpoint(function=location, condition=condition)
+
+def describe_stop(debugger, stop):
+    """Print where and why a debugged program stopped."""
+    cpu = debugger.computer.cpu
+    pc = stop.store if stop.reason == "watchpoint" else stop.pc
+    location = debugger.location(pc)
+    where = f"pc {pc}" + (f" ({location})" if location else "")
+    if stop.reason == "watchpoint":
+        print(f"Watchpoint: address {stop.address} changed from {stop.old} to {stop.new} at {where}")
+    else:
+        print(f"Breakpoint at {where}: A={cpu.register_a} B={cpu.register_b} "
+              f"zero={cpu.zero_flag} carry={cpu.carry_flag}")
+
+def read_inputs(inputs_file):
+    """Read one integer input value per line, skipping blank lines."""
+    with open(inputs_file, 'r') as f:
+        return [int(line) for line in f if line.strip()]
+
+def print_cache_stats(cache):
+    """Print the result of this run's cache lookup and the cache's totals."""
+    if cache is None:
+        print("Compile cache: disabled")
+        return
+    if cache.hits or cache.misses:
+        print(f"Compile cache: {'hit' if cache.hits else 'miss'}")
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    rate = 100 * stats["hits"] / lookups if lookups else 0
+    print(f"Compile cache {cache.directory}: {stats['hits']} hits, {stats['misses']} misses "
+          f"({rate:.1f}% hit rate), {stats['entries']} entries")
+
+def print_location(error):
+    """Print the SimpleScript source location attached to a runtime error."""
+    location = getattr(error, "source_location", None)
+    if location is not None:
+        print(f"  at {format_location(location)}")
 
 def main():
     # Check if program file was provided
     if len(sys.argv) < 2:
         print("Error: No program file specified")
         print("Usage: python3 run_simplescript.py <program_file>")
-        print("       Add --debug to enable debug mode")
+        print("       Add --debug to enable debug mode, --trace to print every instruction")
+        print("       Add --batch <inputs_file> [--workers N] to run once per input value")
+        print("       Add --compile <output.ssb> to write the compiled program to a file")
+        print("       Add --no-cache to always recompile, --cache-stats to show cache statistics")
+        print("       Add --profile [--profile-stacks <file>] to profile the program")
+        print("       Add --break <pc:N|line:N|function>[' if <condition>'], --watch <address|variable>")
+        print("       and --history N to run under the debugger")
         return
     
-    # Read program from file
     program_file = sys.argv[1]
-    try:
-        with open(program_file, 'r') as f:
-            source_code = f.read()
-    except FileNotFoundError:
+    if not os.path.isfile(program_file):
         print(f"Error: Program file '{program_file}' not found")
         return
     
     # Determine if debug mode is enabled
     debug_mode = "--debug" in sys.argv
+    trace_mode = "--trace" in sys.argv
+    
+    # Determine if batch mode is enabled
+    inputs_file = get_option("--batch")
+    
+    # Determine if the program should be profiled; --profile-stacks also
+    # writes the profile as collapsed stacks for flamegraph tools
+    stacks_file = get_option("--profile-stacks")
+    profile_mode = "--profile" in sys.argv or stacks_file is not None
     
-    print(f"Running SimpleScript program '{program_file}'")
-    print("="*50)
+    # Breakpoints and watchpoints run the program under the debugger, which
+    # reports every stop and prints the last executed instructions at the end
+    breakpoints = get_options("--break")
+    watchpoints = get_options("--watch")
+    history = get_option("--history")
+    debugger_mode = bool(breakpoints or watchpoints or history)
     
-    # Create the compiler
-    compiler = SimpleCompiler()
+    # Determine if the program should be compiled to an object file
+    output_file = get_option("--compile")
+    
+    # Compile cache settings
+    cache = None if "--no-cache" in sys.argv else CompileCache(cache_directory(program_file))
+    show_cache_stats = "--cache-stats" in sys.argv
     
     try:
-        # Compile the program
-        program = compiler.compile(source_code)
+        if is_ssb(program_file):
+            # Load the precompiled program without recompiling
+            obj = read_ssb(program_file)
+            program = obj.program
+            symbols = obj.symbols
+            source_map = obj.source_map
+        else:
+            with open(program_file, 'r') as f:
+                source_code = f.read()
+            if cache is not None:
+                obj = cache.compile(source_code, os.path.basename(program_file))
+                program = obj.program
+                symbols = obj.symbols
+                source_map = obj.source_map
+            else:
+                compiler = SimpleCompiler()
+                program = compiler.compile(source_code, os.path.basename(program_file))
+                symbols = compiler.symbol_table()
+                source_map = compiler.source_map
+        
+        if show_cache_stats:
+            print_cache_stats(cache)
+        
+        if output_file:
+            write_ssb(output_file, program, symbols, source_map)
+            print(f"Compiled '{program_file}' to '{output_file}' ({len(program)} instructions)")
+            return
+        
+        print(f"Running SimpleScript program '{program_file}'")
+        print("="*50)
         
         # Print program information
         if debug_mode:
@@ -57,24 +180,55 @@ def main():
                     print(f"{i}: {instr}")
                 
             print("\nVariable Addresses:")
-            for var, addr in compiler.variables.items():
+            for var, addr in symbols["variables"].items():
                 print(f"{var}: {addr}")
             
             print("\nExecution Trace:")
         
+        if inputs_file:
+            # Run the program once per input value across worker processes
+            workers = int(get_option("--workers", os.cpu_count() or 1))
+            inputs = read_inputs(inputs_file)
+            for value, outputs in zip(inputs, run_batch(program, inputs, workers=workers)):
+                print(f"Input {value}: {' '.join(str(output) for output in outputs)}")
+            return
+        
         # Create the computer and run the program
         computer = Computer()
-        computer.load_program(program)
+        computer.load_program(program, source_map)
         
         if debug_mode:
             # Run in debug mode showing each step
             computer.debug_mode()
+        elif debugger_mode:
+            debugger = Debugger(computer, int(history or 20), symbols, output=sys.stdout)
+            for spec in breakpoints:
+                add_breakpoint(debugger, spec)
+            for target in watchpoints:
+                debugger.watch(int(target) if target.isdigit() else target)
+            stop = debugger.run()
+            while stop.reason != "halt":
+                describe_stop(debugger, stop)
+                stop = debugger.cont()
+        elif trace_mode:
+            # Print every instruction without pausing
+            computer.trace()
+        elif profile_mode:
+            # Count instructions per line, function and opcode
+            profile = computer.run(profile=True)
         else:
             # Run normally
             computer.run()
         
         # Display output using the computer's output handling
         computer.print_output()
+        
+        if profile_mode:
+            print()
+            print(profile.report())
+            if stacks_file:
+                profile.write_collapsed(stacks_file)
+                print(f"\nWrote collapsed stacks to '{stacks_file}'")
             
     except SyntaxError as e:
         print(f"Error: {str(e)}")
@@ -82,8 +236,10 @@ def main():
         print(f"Error: {str(e)}")
     except ValueError as e:
         print(f"Error: {str(e)}")
+        print_location(e)
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
+        print_location(e)
         if debug_mode:
             traceback.print_exc()
         return
@@ -0,0 +1,97 @@
+"""
+SimpleScript Batch Runner
+
+Runs one compiled program against many inputs using a pool of worker
+processes.
+
+The program is sent to each worker once, when the worker starts. Jobs are
+then sent to the workers in chunks, each job being a single input value set
+through Computer.set_input, and the outputs of every job are streamed back
+in input order.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.computer import Computer
+
+# Program and Computer options of the current worker process
+_worker_program = None
+_worker_options = None
+
+
+def _init_worker(program, options):
+    """Store the program in a worker process."""
+    global _worker_program, _worker_options
+    _worker_program = program
+    _worker_options = options
+
+
+def run_job(program, value, max_steps=None, **options):
+    """
+    Run a program for a single input value.
+
+    Args:
+        program: The compiled program
+        value: The value to place in the input buffer
+        max_steps: Optional limit on the number of instructions to execute
+        **options: Keyword arguments for Computer
+
+    Returns:
+        The list of outputs produced by the program
+    """
+    computer = Computer(**options)
+    computer.load_program(program)
+    computer.set_input(value)
+    computer.run(max_steps=max_steps)
+    return computer.get_all_outputs()
+
+
+def _run_worker_job(job):
+    """Run one job with the program stored in this worker."""
+    value, max_steps = job
+    return run_job(_worker_program, value, max_steps, **_worker_options)
+
+
+def run_batch(program, inputs, workers=None, chunksize=64, max_steps=None, **options):
+    """
+    Run a program once for every input value.
+
+    The arguments are checked when run_batch is called; the jobs run as the
+    results are consumed.
+
+    Args:
+        program: The compiled program
+        inputs: An iterable of input values
+        workers: Number of worker processes (defaults to the number of CPUs);
+            1 runs every job in the calling process
+        chunksize: Number of jobs sent to a worker at a time
+        max_steps: Optional limit on the number of instructions per job
+        **options: Keyword arguments for each job's Computer
+
+    Returns:
+        An iterator over the list of outputs of each job, in the order of inputs
+
+    Raises:
+        ValueError: If workers or chunksize is less than 1
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"Number of workers must be at least 1, got {workers}")
+    if chunksize < 1:
+        raise ValueError(f"Chunk size must be at least 1, got {chunksize}")
+    return _run_batch(program, inputs, workers, chunksize, max_steps, options)
+
+
+def _run_batch(program, inputs, workers, chunksize, max_steps, options):
+    """Yield the outputs of each job for run_batch()."""
+    if workers == 1:
+        for value in inputs:
+            yield run_job(program, value, max_steps, **options)
+        return
+
+    jobs = ((value, max_steps) for value in inputs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(program, options)) as executor:
+        yield from executor.map(_run_worker_job, jobs, chunksize=chunksize)
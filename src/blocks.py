@@ -0,0 +1,397 @@
+"""
+SimpleScript Block Engine
+
+An alternative execution engine that translates a program into Python
+functions, one per basic block, instead of interpreting it one instruction
+at a time.
+
+Blocks start at every jump or CALL target and after every control transfer
+and device store. Each block is generated as Python source in which the
+registers and flags are local variables and memory is a local list, then
+compiled with compile(). A block function returns the program counter of
+the next block, so the engine simply chains block functions until the
+program halts or runs off the end.
+
+If an instruction raises, its block writes the registers and the program
+counter of that instruction back before the error propagates, so the CPU is
+left in the same state as after the interpreter raised there.
+
+Blocks are compiled the first time control reaches them, which also covers
+RET to an address that is not a known block start. Compiled blocks are
+cached per program and can be shared by every Computer that loads the same
+program.
+"""
+
+from collections import OrderedDict
+
+from src.bytecode import (
+    OPCODES, LDA, LDB, LDA_MEM, LDB_MEM, STA, STB,
+    ADD, SUB, MUL, DIV, CMP, JMP, JZ, JNZ, HALT,
+    CALL, RET, PUSH, POP_PARAM, POP_RET,
+)
+
+# Register and flag locals each opcode reads and writes
+READS = {
+    STA: "a", STB: "b", ADD: "ab", SUB: "ab", MUL: "ab", DIV: "ab",
+    CMP: "ab", JZ: "z", JNZ: "z", PUSH: "a",
+}
+WRITES = {
+    LDA: "a", LDB: "b", LDA_MEM: "a", LDB_MEM: "b",
+    ADD: "a", SUB: "a", MUL: "a", DIV: "a", CMP: "zc", POP_PARAM: "a",
+}
+
+# Map from local name to CPU attribute
+REGISTERS = {"a": "register_a", "b": "register_b", "z": "zero_flag", "c": "carry_flag"}
+
+# Instructions that always end a block
+TERMINATORS = frozenset((JMP, JZ, JNZ, HALT, CALL, RET))
+
+ARITHMETIC_OPERATORS = {ADD: "+", SUB: "-", MUL: "*"}
+
+# Maximum number of programs whose blocks are kept
+CACHE_SIZE = 32
+
+_cache = OrderedDict()
+
+
+class CodeGenerator:
+    """
+    Emits Python source for individual instructions.
+
+    Generated code uses the locals a, b, z and c for the registers and flags,
+    mem for the memory list, memory for the Memory object, stack for the
+    call stack and bus for the I/O bus.
+
+    Args:
+        memory_size: Number of memory cells
+        io_addresses: Addresses mapped to an I/O device
+        read_addresses: Addresses whose loads are forwarded to a device
+        word_bits: Word width of fixed-width memory, or None. Arithmetic
+            then wraps around and sets the carry flag, and immediate values
+            are wrapped when the code is generated.
+        flat: Whether memory can be accessed by indexing mem (see Memory.flat);
+            otherwise every access goes through the Memory object
+    """
+
+    def __init__(self, memory_size, io_addresses, read_addresses=frozenset(), word_bits=None,
+                 flat=True):
+        self.memory_size = memory_size
+        self.flat = flat
+        self.io_addresses = io_addresses
+        self.read_addresses = read_addresses
+        self.word_bits = word_bits
+        self.writes = WRITES
+        if word_bits is not None:
+            self.word_half = 1 << (word_bits - 1)
+            self.word_mask = (1 << word_bits) - 1
+            self.writes = dict(WRITES)
+            for opcode in (ADD, SUB, MUL, DIV):
+                self.writes[opcode] = "ac"
+
+    def immediate(self, value):
+        """Return an immediate operand as it is loaded into a register."""
+        if self.word_bits is not None and isinstance(value, int):
+            return ((value + self.word_half) & self.word_mask) - self.word_half
+        return value
+
+    def is_plain_address(self, address):
+        """Check whether address can be accessed by indexing the memory list."""
+        return (self.flat and isinstance(address, int) and 0 <= address < self.memory_size
+                and address not in self.io_addresses)
+
+    def is_device_store(self, opcode, operand):
+        """Check whether an instruction stores to an I/O device."""
+        return opcode in (STA, STB) and operand in self.io_addresses
+
+    def is_device_load(self, opcode, operand):
+        """Check whether an instruction loads from an I/O device."""
+        return opcode in (LDA_MEM, LDB_MEM) and operand in self.read_addresses
+
+    def emit(self, opcode, operand, indent):
+        """
+        Emit the source lines for a non-control instruction.
+
+        Args:
+            opcode: The integer opcode
+            operand: The resolved operand
+            indent: Indentation prefix for the emitted lines
+
+        Returns:
+            A list of source lines
+        """
+        if opcode == LDA:
+            return [f"{indent}a = {self.immediate(operand)!r}"]
+        if opcode == LDB:
+            return [f"{indent}b = {self.immediate(operand)!r}"]
+        if opcode in (LDA_MEM, LDB_MEM):
+            register = "a" if opcode == LDA_MEM else "b"
+            if operand in self.read_addresses:
+                return [f"{indent}{register} = bus.read({operand!r})"]
+            if self.is_plain_address(operand):
+                return [f"{indent}{register} = mem[{operand}]"]
+            return [f"{indent}{register} = memory.read({operand!r})"]
+        if opcode in (STA, STB):
+            register = "a" if opcode == STA else "b"
+            if operand in self.io_addresses:
+                return [f"{indent}bus.write({operand!r}, {register})"]
+            if self.is_plain_address(operand):
+                return [f"{indent}mem[{operand}] = {register}"]
+            return [f"{indent}memory.write({operand!r}, {register})"]
+        if opcode in ARITHMETIC_OPERATORS:
+            return [f"{indent}a = a {ARITHMETIC_OPERATORS[opcode]} b"] + self.emit_wrap(indent)
+        if opcode == DIV:
+            return [
+                f"{indent}if b == 0:",
+                f'{indent}    print("Warning: Division by zero. Result undefined.")',
+                f"{indent}    a = 0",
+                f"{indent}else:",
+                f"{indent}    a = a // b",
+            ] + self.emit_wrap(indent)
+        if opcode == CMP:
+            return [f"{indent}z = a == b", f"{indent}c = a < b"]
+        if opcode == PUSH:
+            return [f"{indent}stack.append(a)"]
+        if opcode == POP_PARAM:
+            return [f"{indent}a = memory.pop()"]
+        if opcode == POP_RET:
+            return [f"{indent}memory.pop()"]
+        raise ValueError(f"Cannot generate code for opcode {opcode}")
+
+    def can_raise(self, opcode, operand):
+        """Check whether the code for an instruction can raise an error."""
+        if opcode in (LDA, LDB, PUSH):
+            return False
+        if opcode in (LDA_MEM, LDB_MEM):
+            return operand in self.read_addresses or not self.is_plain_address(operand)
+        if opcode in (STA, STB):
+            # Fixed-width memory rejects values that do not fit a word
+            return self.word_bits is not None or not self.is_plain_address(operand)
+        return True
+
+    def emit_wrap(self, indent):
+        """Emit the lines that wrap an arithmetic result in a around, if needed."""
+        if self.word_bits is None:
+            return []
+        return [
+            f"{indent}r = a",
+            f"{indent}a = ((a + {self.word_half}) & {self.word_mask}) - {self.word_half}",
+            f"{indent}c = a != r",
+        ]
+
+
+def live_registers(opcodes, writes=WRITES):
+    """
+    Find the registers a straight-line sequence reads before writing, and writes.
+
+    Args:
+        opcodes: The opcodes of the sequence
+        writes: Map from opcode to the registers it writes
+
+    Returns:
+        A tuple (loaded, stored) of strings of register local names
+    """
+    loaded = ""
+    stored = ""
+    for opcode in opcodes:
+        for register in READS.get(opcode, ""):
+            if register not in stored and register not in loaded:
+                loaded += register
+        for register in writes.get(opcode, ""):
+            if register not in stored:
+                stored += register
+    return loaded, stored
+
+
+class BlockSet:
+    """The compiled blocks of one program."""
+
+    def __init__(self, program, memory_size, io_addresses, read_addresses=frozenset(),
+                 word_bits=None, flat=True):
+        self.program = program
+        self.opcodes = [OPCODES[instruction] for instruction, _ in program]
+        self.operands = [operand for _, operand in program]
+        self.generator = CodeGenerator(memory_size, io_addresses, read_addresses, word_bits, flat)
+        self.leaders = self.find_leaders()
+        self.blocks = [None] * len(program)  # Block function by start pc
+        self.lengths = [0] * len(program)  # Instructions in each block
+
+    def find_leaders(self):
+        """Find the program counters at which a basic block starts."""
+        leaders = {0}
+        for pc, (opcode, operand) in enumerate(zip(self.opcodes, self.operands)):
+            if opcode in (JMP, JZ, JNZ, CALL) and isinstance(operand, int):
+                leaders.add(operand)
+            if self.generator.is_device_load(opcode, operand):
+                # A device read may raise InputPending, so it runs in a block of
+                # its own and nothing before it in the same block is lost
+                leaders.add(pc)
+                leaders.add(pc + 1)
+            if opcode in TERMINATORS or self.generator.is_device_store(opcode, operand):
+                leaders.add(pc + 1)
+        return leaders
+
+    def block(self, pc):
+        """Return the block function starting at pc, compiling it if needed."""
+        function = self.blocks[pc]
+        if function is None:
+            function, length = self.compile_block(pc)
+            self.blocks[pc] = function
+            self.lengths[pc] = length
+        return function
+
+    def compile_block(self, start):
+        """
+        Generate and compile the block starting at start.
+
+        Returns:
+            A tuple (function, number of instructions in the block)
+        """
+        opcodes = self.opcodes
+        operands = self.operands
+        generator = self.generator
+
+        end = start
+        while end < len(opcodes):
+            opcode = opcodes[end]
+            end += 1
+            if (opcode in TERMINATORS or generator.is_device_store(opcode, operands[end - 1])
+                    or end in self.leaders):
+                break
+
+        last = opcodes[end - 1]
+        loaded, stored = live_registers(opcodes[start:end], generator.writes)
+
+        lines = [f"def block_{start}(cpu, mem, memory, stack, bus):"]
+        for register in loaded:
+            lines.append(f"    {register} = cpu.{REGISTERS[register]}")
+
+        # The local p holds the pc of the last instruction that can raise,
+        # for the error handler below
+        body = []
+        faulting = None
+        for pc in range(start, end):
+            if opcodes[pc] not in TERMINATORS:
+                if generator.can_raise(opcodes[pc], operands[pc]):
+                    body.append(f"        p = {pc}")
+                    faulting = pc
+                body.extend(generator.emit(opcodes[pc], operands[pc], "        "))
+        if faulting is None:
+            lines.extend(line[4:] for line in body)
+        else:
+            lines.append("    try:")
+            lines.extend(body)
+            lines.append("    except BaseException:")
+            # Registers written before the failing instruction may be unbound
+            lines.append("        bound = locals()")
+            for register in loaded + "".join(r for r in stored if r not in loaded):
+                if register in loaded:
+                    lines.append(f"        cpu.{REGISTERS[register]} = {register}")
+                else:
+                    lines.append(f"        if {register!r} in bound:")
+                    lines.append(f"            cpu.{REGISTERS[register]} = {register}")
+            lines.append("        cpu.pc = p")
+            lines.append("        raise")
+        for register in stored:
+            lines.append(f"    cpu.{REGISTERS[register]} = {register}")
+
+        target = operands[end - 1]
+        if last == JMP:
+            lines.append(f"    return {target!r}")
+        elif last in (JZ, JNZ):
+            condition = "z" if last == JZ else "not z"
+            lines.append(f"    if {condition}:")
+            lines.append(f"        return {target!r}")
+            lines.append(f"    return {end}")
+        elif last == CALL:
+            lines.append(f"    stack.append({end})")
+            lines.append(f"    return {target!r}")
+        elif last == RET:
+            lines.append("    if stack:")
+            lines.append("        return stack.pop()")
+            lines.append('    print("Warning: Stack underflow during return. Halting.")')
+            lines.append("    cpu.running = False")
+            lines.append(f"    return {end - 1}")
+        elif last == HALT:
+            lines.append("    cpu.running = False")
+            lines.append(f"    return {end}")
+        else:
+            lines.append(f"    return {end}")
+
+        namespace = {}
+        exec(compile("\n".join(lines) + "\n", f"<block {start}>", "exec"), namespace)
+        return namespace[f"block_{start}"], end - start
+
+
+def block_set(program, memory_size, io_addresses, read_addresses=frozenset(), word_bits=None,
+              flat=True):
+    """Return the cached BlockSet for a program, creating it if needed."""
+    key = (tuple(program), memory_size, frozenset(io_addresses), frozenset(read_addresses),
+           word_bits, flat)
+    blocks = _cache.get(key)
+    if blocks is None:
+        blocks = BlockSet(program, memory_size, frozenset(io_addresses),
+                          frozenset(read_addresses), word_bits, flat)
+        _cache[key] = blocks
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return blocks
+
+
+class BlockEngine:
+    """Runs a program on a CPU by chaining compiled basic blocks."""
+
+    def __init__(self, cpu, program):
+        self.cpu = cpu
+        bus = cpu.bus
+        io_addresses = bus.devices.keys() if bus is not None else ()
+        read_addresses = bus.read_addresses() if bus is not None else ()
+        self.blocks = block_set(program, cpu.memory.size, io_addresses, read_addresses,
+                                cpu.word_bits, cpu.memory.flat)
+
+    def run(self, max_steps=None):
+        """
+        Run from the CPU's current program counter.
+
+        Args:
+            max_steps: Optional instruction budget. Execution stops at the
+                first block boundary once the budget is used up.
+
+        Returns:
+            The number of instructions executed if max_steps was given, else None
+        """
+        cpu = self.cpu
+        memory = cpu.memory
+        mem = memory.memory
+        stack = memory.stack
+        bus = cpu.bus
+        blocks = self.blocks.blocks
+        block = self.blocks.block
+        end = len(blocks)
+        pc = cpu.pc
+
+        # A block that raises writes back the pc of the failing instruction
+        # itself; the pc is set before compiling a block in case that fails
+        if max_steps is None:
+            while cpu.running and pc < end:
+                function = blocks[pc]
+                if function is None:
+                    cpu.pc = pc
+                    function = block(pc)
+                pc = function(cpu, mem, memory, stack, bus)
+            cpu.pc = pc
+            return None
+
+        lengths = self.blocks.lengths
+        steps = 0
+        while steps < max_steps and cpu.running and pc < end:
+            function = blocks[pc]
+            if function is None:
+                cpu.pc = pc
+                function = block(pc)
+            length = lengths[pc]
+            pc = function(cpu, mem, memory, stack, bus)
+            steps += length
+        cpu.pc = pc
+        return steps
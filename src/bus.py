@@ -0,0 +1,222 @@
+"""
+SimpleScript I/O Bus
+
+Memory-mapped devices for the SimpleScript virtual machine.
+
+Devices register the address ranges they own on an IOBus. When a program is
+loaded, stores (STA/STB) whose address belongs to a device are bound to the
+CPU's I/O handlers, which forward the value to the device. Loads (LDA_MEM/
+LDB_MEM) are bound the same way for devices that intercept reads. Every other
+memory access goes straight to memory, so programs pay nothing for I/O they
+do not perform.
+"""
+
+from collections import deque
+
+
+class InputPending(Exception):
+    """Raised by a device read when no input value is available yet."""
+
+    def __init__(self, address):
+        super().__init__(f"No input available at address {address}")
+        self.address = address
+
+
+class Device:
+    """Base class for memory-mapped devices."""
+
+    # Whether loads from the device's addresses are forwarded to read()
+    intercepts_reads = False
+
+    def write(self, address, value):
+        """Handle a store of value to one of the device's addresses."""
+        raise NotImplementedError
+
+    def read(self, address):
+        """Handle a load from one of the device's addresses."""
+        raise NotImplementedError
+
+
+class InputDevice(Device):
+    """
+    Input buffer device.
+
+    By default the current input value lives in memory at the device address
+    and every read returns it. In queued mode (see start_queue()) each read
+    consumes the next queued value instead, and raises InputPending when the
+    queue is empty so that the caller can supply more input and retry.
+    """
+
+    intercepts_reads = True
+
+    def __init__(self, memory, address):
+        self.memory = memory
+        self.address = address
+        self.pending = None  # Queued input values, or None when not queued
+
+    def write(self, address, value):
+        """Set the input value."""
+        self.memory.write(address, value)
+
+    def read(self, address):
+        """Return the input value, consuming it in queued mode."""
+        if self.pending is None:
+            return self.memory.read(address)
+        if not self.pending:
+            raise InputPending(address)
+        self.memory.write(address, self.pending.popleft())
+        # Memory may have wrapped the value to its word width
+        return self.memory.read(address)
+
+    def start_queue(self):
+        """Switch to queued mode with an empty queue."""
+        self.pending = deque()
+
+    def stop_queue(self):
+        """Switch back to reading the value stored in memory."""
+        self.pending = None
+
+    def feed(self, value):
+        """Queue an input value (queued mode only)."""
+        self.pending.append(value)
+
+
+class OutputBuffer:
+    """
+    Bounded output sink that keeps only the most recent values.
+
+    Any object with append() can serve as the output sink of a Computer; a
+    plain list keeps every output. An OutputBuffer keeps at most maxlen
+    values, so a long-running program uses constant memory for its outputs.
+
+    Attributes:
+        maxlen: Maximum number of values kept
+        total: Number of values appended so far, including dropped ones
+    """
+
+    def __init__(self, maxlen):
+        if maxlen < 0:
+            raise ValueError(f"Maximum length must not be negative, got {maxlen}")
+        self.maxlen = maxlen
+        self.values = deque(maxlen=maxlen)
+        self.total = 0
+
+    def append(self, value):
+        """Add a value, dropping the oldest one if the buffer is full."""
+        self.values.append(value)
+        self.total += 1
+
+    def extend(self, values):
+        """Add several values."""
+        for value in values:
+            self.append(value)
+
+    def clear(self):
+        """Remove every value."""
+        self.values.clear()
+
+    def drain(self):
+        """Remove and return the values currently kept."""
+        values = list(self.values)
+        self.values.clear()
+        return values
+
+    def __delitem__(self, index):
+        """Remove values, e.g. the newest ones with del buffer[n:]."""
+        values = list(self.values)
+        del values[index]
+        self.total -= len(self.values) - len(values)
+        self.values = deque(values, maxlen=self.maxlen)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __repr__(self):
+        return f"OutputBuffer({list(self.values)!r}, maxlen={self.maxlen})"
+
+
+class OutputDevice(Device):
+    """
+    Output buffer device with an output counter.
+
+    A store to the buffer address appends the value to the output sink and
+    increments the counter kept in memory at the count address. Stores to the
+    count address set the counter.
+
+    When pause_cpu is set, every output also stops that CPU and sets paused,
+    so that the caller regains control right after the output.
+    """
+
+    def __init__(self, memory, buffer_address, count_address, outputs):
+        self.memory = memory
+        self.buffer_address = buffer_address
+        self.count_address = count_address
+        self.outputs = outputs
+        self.total = 0  # Outputs written so far
+        self.last_output = None
+        self.pause_cpu = None  # CPU to stop after each output, if any
+        self.paused = False
+
+    def write(self, address, value):
+        """Record an output value or set the output counter."""
+        if address == self.buffer_address:
+            self.outputs.append(value)
+            self.total += 1
+            self.last_output = value
+            count = self.memory.read(self.count_address)
+            self.memory.write(self.count_address, count + 1)
+            if self.pause_cpu is not None:
+                self.pause_cpu.running = False
+                self.paused = True
+        else:
+            self.memory.write(address, value)
+
+
+class IOBus:
+    """Maps memory addresses to devices."""
+
+    def __init__(self):
+        self.devices = {}  # Map from address to device
+
+    def map(self, device, start, end=None):
+        """
+        Map a device to an address range.
+
+        Args:
+            device: The device to map
+            start: First address of the range
+            end: Last address of the range (inclusive), defaults to start
+
+        Raises:
+            ValueError: If an address in the range is already mapped
+        """
+        if end is None:
+            end = start
+        for address in range(start, end + 1):
+            if address in self.devices:
+                raise ValueError(f"Address {address} is already mapped to a device")
+        for address in range(start, end + 1):
+            self.devices[address] = device
+
+    def device_at(self, address):
+        """Return the device mapped at address, or None."""
+        return self.devices.get(address)
+
+    def write(self, address, value):
+        """Forward a store to the device mapped at address."""
+        self.devices[address].write(address, value)
+
+    def read(self, address):
+        """Forward a load to the device mapped at address."""
+        return self.devices[address].read(address)
+
+    def read_addresses(self):
+        """Return the addresses whose loads are forwarded to a device."""
+        return frozenset(address for address, device in self.devices.items()
+                         if device.intercepts_reads)
@@ -0,0 +1,138 @@
+"""
+SimpleScript Bytecode
+
+This module defines the integer opcode table shared by the compiler output
+and the virtual machine, and the decoder that turns a compiled program
+(a list of (instruction, operand) tuples) into a CodeObject.
+
+Decoding happens once, when a program is loaded. The CodeObject keeps three
+parallel lists indexed by program counter:
+- opcodes: integer opcodes
+- handlers: CPU methods, already bound to the CPU that will run the program
+- operands: resolved operands passed to the handlers
+
+so the execution loop only has to index two lists and call the handler.
+Stores to addresses mapped on the CPU's I/O bus, and loads from devices that
+intercept reads, are bound to the CPU's I/O handlers at this point, so the bus
+is never consulted for ordinary memory accesses. On fixed-width memory,
+immediate operands are wrapped to the word width here as well. Programs that
+passed the verifier (see verifier.py) get memory handlers without range checks.
+"""
+
+from src.memory import PAGE_SIZE
+
+# Opcode table. The position of a name in this tuple is its integer opcode.
+OPCODE_NAMES = (
+    "LDA", "LDB", "LDA_MEM", "LDB_MEM",
+    "STA", "STB",
+    "ADD", "SUB", "MUL", "DIV",
+    "CMP",
+    "JMP", "JZ", "JNZ",
+    "HALT",
+    "CALL", "RET", "PUSH", "POP_PARAM", "POP_RET",
+)
+
+OPCODES = {name: opcode for opcode, name in enumerate(OPCODE_NAMES)}
+
+(LDA, LDB, LDA_MEM, LDB_MEM,
+ STA, STB,
+ ADD, SUB, MUL, DIV,
+ CMP,
+ JMP, JZ, JNZ,
+ HALT,
+ CALL, RET, PUSH, POP_PARAM, POP_RET) = range(len(OPCODE_NAMES))
+
+# Instructions that transfer control to the address in their operand
+JUMP_OPCODES = frozenset((JMP, JZ, JNZ, CALL))
+
+# Superinstructions produced by the fusion pass (see fusion.py). They never
+# appear in compiled programs, only in decoded CodeObjects.
+FUSED_NAMES = ("FUSED_MOVE", "FUSED_ARITH", "FUSED_BRANCH")
+
+FUSED_MOVE, FUSED_ARITH, FUSED_BRANCH = range(
+    len(OPCODE_NAMES), len(OPCODE_NAMES) + len(FUSED_NAMES))
+
+
+class CodeObject:
+    """
+    A program decoded for a specific CPU.
+
+    Attributes:
+        program: The original list of (instruction, operand) tuples
+        opcodes: Integer opcode of each instruction
+        operands: Resolved operand of each instruction
+        handlers: Bound CPU handler of each instruction
+        store_pages: Memory pages (see memory.PAGE_SIZE) the program's stores
+            can write, used to find pages changed since a snapshot
+    """
+
+    __slots__ = ("program", "opcodes", "operands", "handlers", "store_pages")
+
+    def __init__(self, program, opcodes, operands, handlers, store_pages=frozenset()):
+        self.program = program
+        self.opcodes = opcodes
+        self.operands = operands
+        self.handlers = handlers
+        self.store_pages = store_pages
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def copy(self):
+        """Return a CodeObject with copies of the per-instruction arrays."""
+        return CodeObject(self.program, list(self.opcodes), list(self.operands),
+                          list(self.handlers), self.store_pages)
+
+
+def decode(program, cpu, verified=False):
+    """
+    Decode a program for execution on the given CPU.
+
+    Args:
+        program: A list of (instruction, operand) tuples
+        cpu: The CPU whose handlers the program will be bound to
+        verified: Whether the program passed verify() for the CPU's memory,
+            so that its memory accesses can skip range checks
+
+    Returns:
+        A CodeObject for the program
+
+    Raises:
+        ValueError: If the program contains an unknown instruction
+    """
+    opcodes = []
+    operands = []
+    handlers = []
+    store_pages = set()
+    io_handlers = {STA: cpu._sta_io, STB: cpu._stb_io}
+    io_read_handlers = {LDA_MEM: cpu._lda_io, LDB_MEM: cpu._ldb_io}
+    read_addresses = cpu.bus.read_addresses() if cpu.bus is not None else frozenset()
+    unchecked_handlers = {}
+    if verified and cpu.memory.flat:
+        # Stores are covered by store_pages, so they need not mark dirty pages
+        unchecked_handlers = {
+            LDA_MEM: cpu._lda_mem_unchecked, LDB_MEM: cpu._ldb_mem_unchecked,
+            STA: cpu._sta_unchecked, STB: cpu._stb_unchecked,
+        }
+
+    for i, (instruction, operand) in enumerate(program):
+        if instruction not in OPCODES:
+            raise ValueError(f"Unknown instruction: {instruction} at position {i}")
+        opcode = OPCODES[instruction]
+        handler = cpu.instructions[instruction]
+        if (opcode in io_handlers and cpu.bus is not None
+                and cpu.bus.device_at(operand) is not None):
+            handler = io_handlers[opcode]
+        elif opcode in io_read_handlers and operand in read_addresses:
+            handler = io_read_handlers[opcode]
+        elif opcode in unchecked_handlers:
+            handler = unchecked_handlers[opcode]
+        if opcode in (STA, STB) and isinstance(operand, int) and 0 <= operand < cpu.memory.size:
+            store_pages.add(operand // PAGE_SIZE)
+        if opcode in (LDA, LDB) and cpu.word_bits is not None and isinstance(operand, int):
+            operand = cpu.memory.wrap(operand)
+        opcodes.append(opcode)
+        operands.append(operand)
+        handlers.append(handler)
+
+    return CodeObject(program, opcodes, operands, handlers, frozenset(store_pages))
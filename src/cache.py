@@ -0,0 +1,194 @@
+"""
+SimpleScript Compile Cache
+
+Stores compiled programs on disk so that running the same source file again
+skips compilation, like Python's __pycache__.
+
+Entries are .ssb object files (see objfile.py) in a __sscache__ directory
+next to the source file. An entry is named after the source file and a hash
+of the source text, the compiler version and the object file version, so an
+entry is only ever reused for exactly the source and compiler that produced
+it. When a source file changes, its old entries are removed as the new one
+is written. Entries that cannot be read are treated as misses and replaced.
+
+Entries are created with the default file mode (0o666 less the umask), like
+__pycache__ entries, so a cache directory can be shared between users.
+
+Hit and miss counts are kept in a stats.json file in the cache directory.
+Updates to it are serialized with a lock on the stats.lock file where the
+platform supports it (not on Windows, where concurrent compiles may lose
+counts).
+"""
+
+import hashlib
+import json
+import os
+import re
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+from src.compiler import SimpleCompiler, COMPILER_VERSION
+from src.objfile import ObjectFile, VERSION as OBJECT_VERSION, read_ssb, write_ssb
+
+CACHE_DIRECTORY = "__sscache__"
+STATS_FILE = "stats.json"
+LOCK_FILE = "stats.lock"
+
+
+def cache_directory(source_path):
+    """Return the cache directory for a source file."""
+    return os.path.join(os.path.dirname(os.path.abspath(source_path)), CACHE_DIRECTORY)
+
+
+def source_key(source):
+    """Return the cache key of a source text for the current compiler."""
+    digest = hashlib.sha256()
+    digest.update(f"simplescript {COMPILER_VERSION} ssb {OBJECT_VERSION}\n".encode())
+    digest.update(source.encode())
+    return digest.hexdigest()[:32]
+
+
+def create_temporary(directory):
+    """
+    Create a new temporary file in a directory.
+
+    Unlike tempfile.mkstemp(), which makes the file private, the file gets
+    the default mode for new files.
+
+    Returns:
+        A tuple (file descriptor, path)
+    """
+    while True:
+        path = os.path.join(directory, f"{os.urandom(8).hex()}.tmp")
+        try:
+            return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), path
+        except FileExistsError:  # pragma: no cover - 64 random bits
+            continue
+
+
+class CompileCache:
+    """
+    An on-disk cache of compiled programs.
+
+    Args:
+        directory: The cache directory, created when the first entry is written
+
+    Attributes:
+        hits: Lookups answered from the cache by this object
+        misses: Lookups that had to compile by this object
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def entry_path(self, name, key):
+        """Return the path of the entry for a source name and key."""
+        return os.path.join(self.directory, f"{name}.{key}.ssb")
+
+    def compile(self, source, name="program"):
+        """
+        Return the compiled program for a source text, compiling it on a miss.
+
+        Args:
+            source: The SimpleScript source code
+            name: Name of the source file, used to name the entry and in the
+                source map
+
+        Returns:
+            An ObjectFile with the program, its symbol table and source map
+
+        Raises:
+            SyntaxError, NameError, ValueError: As SimpleCompiler.compile
+        """
+        key = source_key(source)
+        path = self.entry_path(name, key)
+        try:
+            obj = read_ssb(path)
+        except (OSError, ValueError):
+            obj = None
+
+        if obj is not None:
+            self.hits += 1
+            self.record(hit=True)
+            return obj
+
+        self.misses += 1
+        compiler = SimpleCompiler()
+        program = compiler.compile(source, name)
+        obj = ObjectFile(program, compiler.symbol_table(), compiler.source_map)
+        self.store(name, key, obj)
+        self.record(hit=False)
+        return obj
+
+    def store(self, name, key, obj):
+        """Write an entry and remove older entries for the same source name."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first so that concurrent runs never
+            # read a partially written entry
+            fd, temporary = create_temporary(self.directory)
+            os.close(fd)
+            try:
+                write_ssb(temporary, obj.program, obj.symbols, obj.source_map)
+                os.replace(temporary, self.entry_path(name, key))
+            except BaseException:
+                os.unlink(temporary)
+                raise
+            stale = re.compile(re.escape(name) + r"\.[0-9a-f]{32}\.ssb")
+            for entry in os.listdir(self.directory):
+                if stale.fullmatch(entry) and entry != f"{name}.{key}.ssb":
+                    os.unlink(os.path.join(self.directory, entry))
+        except (OSError, ValueError):
+            # Caching is best effort: an unwritable directory or a program
+            # that cannot be stored only means the next run compiles again
+            pass
+
+    def stats(self):
+        """
+        Return the hit and miss counts recorded in the cache directory.
+
+        Returns:
+            A dictionary with "hits", "misses" and "entries"
+        """
+        stats = {"hits": 0, "misses": 0}
+        try:
+            with open(os.path.join(self.directory, STATS_FILE)) as f:
+                stats.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        try:
+            stats["entries"] = sum(1 for entry in os.listdir(self.directory)
+                                   if entry.endswith(".ssb"))
+        except OSError:
+            stats["entries"] = 0
+        return stats
+
+    def record(self, hit):
+        """Add a lookup to the counts in the cache directory."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            lock = os.open(os.path.join(self.directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o666)
+        except OSError:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            stats = self.stats()
+            stats.pop("entries")
+            stats["hits" if hit else "misses"] += 1
+            # The stats file is replaced rather than rewritten so that stats()
+            # never reads a partial file
+            fd, temporary = create_temporary(self.directory)
+            with os.fdopen(fd, "w") as f:
+                json.dump(stats, f)
+            os.replace(temporary, os.path.join(self.directory, STATS_FILE))
+        except OSError:
+            pass
+        finally:
+            # Closing the file releases the lock
+            os.close(lock)
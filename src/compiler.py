@@ -5,621 +5,404 @@ This module implements the compiler for the SimpleScript language.
 It translates SimpleScript source code into bytecode that can be executed
 by the SimpleScript virtual machine (computer.py).
 
-The SimpleCompiler class handles parsing, code generation, and optimization
-for the SimpleScript language features including:
+The SimpleCompiler class generates code from the abstract syntax tree built
+by the parser (parser.py) for the SimpleScript language features including:
 - Variable assignments
-- Arithmetic operations (addition, subtraction)
+- Arithmetic expressions (+, -, * and / with the usual precedence)
 - Conditional statements (if/else)
 - Loops (while)
 - Print statements
 - Function definitions and calls
+
+A program with functions starts with a jump over them to the main program,
+which ends with HALT. Variables, including parameters, are global.
+Arguments are evaluated in the caller and stored in the callee's
+parameters just before the CALL, and the return value is passed in
+register A.
 """
 
+from collections import namedtuple
+
+from src.parser import (
+    parse, Assign, Print, Return, ExprStatement, If, While, BinaryOp, Call, Number, Name,
+)
+
+# Version of the code generator. Change it whenever the compiler's output for
+# a given source changes, so that cached compiled programs are invalidated.
+COMPILER_VERSION = "4"
+
+# Source location of a compiled instruction. line is the 1-based line number
+# in the source file, or None for instructions the compiler adds on its own;
+# function is the name of the enclosing function, or None at top level.
+SourceLocation = namedtuple("SourceLocation", ("file", "line", "function"))
+
+# Instructions for the arithmetic operators
+OPERATORS = {"+": "ADD", "-": "SUB", "*": "MUL", "/": "DIV"}
+
+# Memory cell for intermediate values (see compile_expression)
+TEMPORARY = "$tmp"
+
+
+def format_location(location):
+    """Format a SourceLocation as "file:line in function"."""
+    text = location.file if location.line is None else f"{location.file}:{location.line}"
+    if location.function is not None:
+        text += f" in {location.function}"
+    return text
+
+
 class SimpleCompiler:
     """
     The SimpleScript compiler that translates SimpleScript source code to bytecode.
-    
-    This compiler implements a simple two-pass compilation process:
-    1. First pass: Parse the code and generate instructions with placeholders for jumps
-    2. Second pass: Resolve labels and fix jump instructions
+
+    Compilation makes three linear passes:
+    1. Parse the source into an abstract syntax tree (see parser.py)
+    2. Generate instructions from the tree, with labels as jump targets
+    3. Resolve the labels to instruction indices
     """
-    
-    def __init__(self):
-        """Initialize the compiler with empty variable table and instruction list."""
+
+    # Memory-mapped I/O addresses used by compiled programs
+    IO_START = 0xF0
+    IO_END = 0xF2
+    OUTPUT = 0xF1
+
+    def __init__(self, data_start=16, data_end=IO_START):
+        """
+        Initialize the compiler with empty variable table and instruction list.
+
+        Variables are allocated from the data segment [data_start, data_end),
+        which must not overlap the I/O addresses. The default segment fits in
+        the default 256-word memory; larger programs can use a segment above
+        the I/O region together with a larger memory such as PagedMemory.
+
+        Args:
+            data_start: First address of the data segment
+            data_end: End of the data segment (exclusive)
+
+        Raises:
+            ValueError: If the data segment is empty or overlaps the I/O addresses
+        """
+        if not 0 <= data_start < data_end:
+            raise ValueError(f"Invalid data segment: {data_start}-{data_end}")
+        if data_start <= self.IO_END and data_end > self.IO_START:
+            raise ValueError(f"Data segment {data_start}-{data_end} overlaps the I/O addresses "
+                             f"{self.IO_START}-{self.IO_END}")
+        self.data_start = data_start
+        self.data_end = data_end
         self.variables = {}  # Symbol table for variables
         self.functions = {}  # Symbol table for functions
-        self.next_var_addr = 16  # Start variables at address 16
+        self.next_var_addr = data_start  # Next free address in the data segment
         self.instructions = []
-        self.current_line = 0
+        self.labels = {}  # Map from label to instruction index
+        self.source_map = []  # SourceLocation of each instruction
         self.label_counter = 0  # For generating unique labels
-        
+
     def allocate_variable(self, var_name):
         """
         Allocate memory for a variable.
-        
+
         Args:
             var_name: The name of the variable to allocate
-            
+
         Returns:
             The memory address assigned to the variable
+
+        Raises:
+            ValueError: If the data segment is full
         """
         if var_name not in self.variables:
+            if self.next_var_addr >= self.data_end:
+                raise ValueError(f"Out of variable memory: cannot allocate {var_name} "
+                                 f"(data segment {self.data_start}-{self.data_end} is full)")
             self.variables[var_name] = self.next_var_addr
             self.next_var_addr += 1
         return self.variables[var_name]
-    
+
+    def symbol_table(self):
+        """
+        Return the variables and functions of the last compiled program.
+
+        Returns:
+            A dictionary with "variables" (map from name to address) and
+            "functions" (map from name to a dictionary with "params" and
+            "address", the index of the function's first instruction)
+        """
+        return {
+            "variables": dict(self.variables),
+            "functions": {
+                name: {"params": list(info["params"]), "address": self.labels.get(f"func_{name}")}
+                for name, info in self.functions.items()
+            },
+        }
+
     def generate_label(self):
         """
         Generate a unique label for jumps.
-        
+
         Returns:
             A unique label string for branching instructions
         """
         label = f"L{self.label_counter}"
         self.label_counter += 1
         return label
-        
-    def compile(self, source_code):
+
+    def compile(self, source_code, filename="<source>"):
         """
         Compile source code to computer instructions.
-        
+
+        The source location of every instruction is recorded in source_map,
+        a list of SourceLocation parallel to the returned program.
+
         Args:
             source_code: The SimpleScript source code as a string
-            
+            filename: Name of the source file, recorded in the source map
+
         Returns:
             A list of tuples (instruction, operand) representing the compiled program
-            
+
         Raises:
             SyntaxError: If the source code contains syntax errors
-            NameError: If an undefined variable is referenced
-            ValueError: If an invalid operation is attempted
+            NameError: If an undefined function is called
+            ValueError: If a function is called with the wrong number of
+                arguments, or the data segment is full
         """
         self.instructions = []
         self.labels = {}  # Map from label to instruction index
         self.fixups = []  # List of (instruction_index, label) pairs to fix later
-        self.current_line = 0  # Reset line counter
-        
-        # Preprocess to remove comments and store clean lines
-        clean_lines = []
-        for line in source_code.strip().split('\n'):
-            line = line.split('#', 1)[0].rstrip()  # Remove comments
-            if line.strip():  # Skip empty lines
-                clean_lines.append(line)
-                
-        # First pass: Process the main program and register function definitions
-        i = 0
-        while i < len(clean_lines):
-            line = clean_lines[i]
-            stripped = line.strip()
-            
-            # Check for function definitions
-            if stripped.startswith('def '):
-                # Extract function name
-                func_parts = stripped[4:].split('(')
-                if len(func_parts) != 2 or not func_parts[1].rstrip().endswith(')'):
-                    raise SyntaxError(f"Invalid function definition: {line}")
-                
-                func_name = func_parts[0].strip()
-                params_str = func_parts[1].rstrip(')')
-                params = [p.strip() for p in params_str.split(',')] if params_str.strip() else []
-                
-                # Find the end of the function
-                start_idx = i
-                indent_level = self.get_indent(line)
-                end_idx, _ = self.parse_block(clean_lines, start_idx, indent_level)
-                
-                # Register the function
-                self.functions[func_name] = {
-                    'params': params,
-                    'start_line': start_idx,
-                    'end_line': end_idx,
-                    'indent': indent_level
-                }
-                
-                # Skip the function body
-                i = end_idx + 1
-            else:
-                i += 1
-                
-        # Generate a jump to skip over function definitions
-        main_start_label = self.generate_label()
-        self.instructions.append(("JMP", main_start_label))
-        self.fixups.append((len(self.instructions) - 1, main_start_label))
-        
-        # Second pass: Process function definitions
-        for func_name, func_info in self.functions.items():
-            # Add function entry point label
-            func_label = f"func_{func_name}"
-            self.labels[func_label] = len(self.instructions)
-            
-            # Process function body
-            func_lines = clean_lines[func_info['start_line']+1:func_info['end_line']+1]
-            func_indent = func_info['indent'] + 2  # Function body is indented
-            
-            # Generate code for function body
-            for line in func_lines:
-                # Skip lines that don't have enough indentation (must be at least func_indent)
-                if self.get_indent(line) < func_indent:
-                    continue
-                    
-                # Remove the indentation up to func_indent level
-                adjusted_line = line[func_indent:]
-                self.process_line(adjusted_line)
-                
-            # Add return instruction at the end of function
-            self.instructions.append(("RET", None))
-            
-        # Add main program start label - this is the position after all functions
-        self.labels[main_start_label] = len(self.instructions)
-        
-        # Third pass: Process the main program
-        i = 0
-        while i < len(clean_lines):
-            stripped = clean_lines[i].strip()
-            # Skip function definitions
-            if stripped.startswith('def '):
-                indent_level = self.get_indent(clean_lines[i])
-                _, end_idx = self.parse_block(clean_lines, i, indent_level)
-                i = end_idx + 1
-            # Process non-function lines
-            elif not stripped.startswith('def '):
-                self.current_line = i
-                self.process_line(clean_lines[i])
-                i += 1
-            else:
-                i += 1  # Handle any other case
-        
-        # Add halt instruction at the end of the program
-        self.instructions.append(("HALT", None))
-        
+        self.filename = filename
+        self.source_map = []  # SourceLocation of each instruction
+        self.functions = {}
+
+        self.compile_program(parse(source_code, filename))
+        return self.instructions
+
+    def compile_program(self, program):
+        """
+        Generate the instructions for a parsed program.
+
+        Args:
+            program: A Program node
+        """
+        filename = self.filename
+        for function in program.functions:
+            if function.name in self.functions:
+                raise SyntaxError(f"Function {function.name} is defined twice",
+                                  (filename, function.line, None, None))
+            self.functions[function.name] = {"params": list(function.params)}
+
+        # Jump over the function definitions to the main program
+        self.location = SourceLocation(filename, None, None)
+        main_label = self.generate_label()
+        if program.functions:
+            self.emit_jump("JMP", main_label)
+        for function in program.functions:
+            self.compile_function(function)
+
+        self.labels[main_label] = len(self.instructions)
+        self.function = None
+        self.compile_block(program.body)
+        self.location = SourceLocation(filename, None, None)
+        self.emit("HALT")
+
         # Fix up jumps using labels
         for idx, label in self.fixups:
             if label in self.labels:
                 self.instructions[idx] = (self.instructions[idx][0], self.labels[label])
             else:
                 raise ValueError(f"Undefined label: {label}")
-                
-        return self.instructions
-        
-    def process_line(self, line):
-        """Process a single line of code and generate appropriate instructions."""
-        stripped = line.strip()
-        
-        # Skip empty lines
-        if not stripped:
-            return
-            
-        # Handle function calls
-        if "(" in stripped and ")" in stripped and not stripped.startswith(('if ', 'while ', 'print ')):
-            self.compile_function_call(stripped)
-            return
-            
-        # Handle return statements
-        if stripped.startswith('return'):
-            self.compile_return(stripped)
-            return
-        
-        # Handle if statements
-        if stripped.startswith('if '):
-            self.compile_if_statement(stripped, line)
-            return
-            
-        # Handle while loops
-        if stripped.startswith('while '):
-            self.compile_while_loop(stripped, line)
-            return
-            
-        # Handle print statements
-        if stripped.startswith('print '):
-            self.compile_print(stripped)
-            return
-            
-        # Handle variable assignments
-        if '=' in stripped and not stripped.startswith('if') and not '==' in stripped and not '!=' in stripped:
-            self.compile_assignment(stripped)
-            return
-            
-        # If we get here, the syntax is not recognized
-        raise SyntaxError(f"Syntax error at line: {line}")
-        
-    def compile_function_call(self, line):
-        """Compile a function call."""
-        # Extract function name and arguments
-        parts = line.split('(', 1)
-        func_name = parts[0].strip()
-        
-        # Check if the function exists
-        if func_name not in self.functions:
-            raise NameError(f"Undefined function: {func_name}")
-            
-        # Extract arguments
-        args_str = parts[1].split(')', 1)[0].strip()
-        args = [arg.strip() for arg in args_str.split(',')] if args_str else []
-        
-        # Validate argument count
-        if len(args) != len(self.functions[func_name]['params']):
-            raise ValueError(f"Function {func_name} expects {len(self.functions[func_name]['params'])} arguments, but {len(args)} were provided")
-            
-        # Push arguments onto the stack (in reverse order)
-        for arg in reversed(args):
-            # Load the argument into register A
-            self.load_operand(arg, 'A')
-            # Push it onto the stack
-            self.instructions.append(("PUSH", None))
-            
-        # Call the function
-        func_label = f"func_{func_name}"
-        self.instructions.append(("CALL", func_label))
-        self.fixups.append((len(self.instructions) - 1, func_label))
-        
-    def compile_return(self, line):
-        """Compile a return statement."""
-        parts = line.split('return', 1)
-        if len(parts) > 1 and parts[1].strip():
-            # Return a value
-            return_value = parts[1].strip()
-            self.load_operand(return_value, 'A')
-        
-        # Add return instruction
-        self.instructions.append(("RET", None))
-        
-    def compile_if_statement(self, stripped_line, full_line):
+
+    def emit(self, instruction, operand=None):
+        """Append an instruction at the current source location."""
+        self.instructions.append((instruction, operand))
+        self.source_map.append(self.location)
+
+    def emit_jump(self, instruction, label):
+        """Append a jump or call to a label, to be resolved at the end."""
+        self.fixups.append((len(self.instructions), label))
+        self.emit(instruction, label)
+
+    def compile_function(self, function):
         """
-        Compile an if statement.
-        
+        Compile a function definition.
+
         Args:
-            stripped_line: The if statement without indentation
-            full_line: The original line with indentation
+            function: A FunctionDef node
         """
-        # Extract condition
-        condition = stripped_line[3:].strip()  # Remove 'if '
-        
-        # Generate labels for branching
-        else_label = self.generate_label()
-        end_label = self.generate_label()
-        
-        # Compile condition and conditional jump
-        self.compile_condition(condition, else_label)
-        
-        # Remember current position for if block
-        if_block_start = len(self.instructions)
-        
-        # Compile if block (this would be done by parse_block in the full compiler)
-        # For now, we'll just add a placeholder
-        
-        # Add unconditional jump to end (to skip else block)
-        jump_idx = len(self.instructions)
-        self.instructions.append(("JMP", end_label))
-        self.fixups.append((jump_idx, end_label))
-        
-        # Mark else label position
-        self.labels[else_label] = len(self.instructions)
-        
-        # Compile else block (would be parsed in full compiler)
-        # Placeholder for else block
-        
-        # Mark end label position
-        self.labels[end_label] = len(self.instructions)
-        
-    def compile_while_loop(self, stripped_line, full_line):
+        self.function = function.name
+        self.labels[f"func_{function.name}"] = len(self.instructions)
+        self.compile_block(function.body)
+
+        # Functions that do not end with a return statement return at the end
+        if not function.body or not isinstance(function.body[-1], Return):
+            self.location = SourceLocation(self.filename, function.line, function.name)
+            self.emit("RET")
+
+    def compile_block(self, statements):
+        """Compile a list of statements."""
+        for statement in statements:
+            self.location = SourceLocation(self.filename, statement.line, self.function)
+            if isinstance(statement, Assign):
+                self.compile_expression(statement.value)
+                self.emit("STA", self.allocate_variable(statement.target))
+            elif isinstance(statement, Print):
+                self.compile_expression(statement.value)
+                self.emit("STA", self.OUTPUT)
+            elif isinstance(statement, If):
+                self.compile_if_statement(statement)
+            elif isinstance(statement, While):
+                self.compile_while_loop(statement)
+            elif isinstance(statement, ExprStatement):
+                self.compile_call(statement.value)
+            elif isinstance(statement, Return):
+                if self.function is None:
+                    raise SyntaxError("'return' outside a function",
+                                      (self.filename, statement.line, None, None))
+                if statement.value is not None:
+                    self.compile_expression(statement.value)
+                self.emit("RET")
+
+    def compile_if_statement(self, node):
         """
-        Compile a while loop.
-        
+        Compile an if statement.
+
+        The condition jumps over the if block when it is false; an if block
+        followed by an else block ends with a jump over the else block.
+
         Args:
-            stripped_line: The while statement without indentation
-            full_line: The original line with indentation
+            node: An If node
         """
-        # Extract condition
-        condition = stripped_line[6:].strip()  # Remove 'while '
-        
-        # Generate labels for branching
-        start_label = self.generate_label()
-        end_label = self.generate_label()
-        
-        # Mark start of loop
-        self.labels[start_label] = len(self.instructions)
-        
-        # Compile condition - if not true, jump to end
-        self.compile_condition_inverse(condition, end_label)
-        
-        # Remember current position for loop body
-        loop_body_start = len(self.instructions)
-        
-        # Compile loop body (would be parsed in full compiler)
-        # Placeholder for loop body
-        
-        # Jump back to start of loop
-        self.instructions.append(("JMP", start_label))
-        self.fixups.append((len(self.instructions) - 1, start_label))
-        
-        # Mark end of loop
-        self.labels[end_label] = len(self.instructions)
-        
-    def compile_print(self, line):
+        location = self.location
+        else_label = self.generate_label()
+        self.compile_condition(node.test, else_label, False)
+        self.compile_block(node.body)
+        if node.orelse:
+            end_label = self.generate_label()
+            if not isinstance(node.body[-1], Return):
+                self.location = location
+                self.emit_jump("JMP", end_label)
+            self.labels[else_label] = len(self.instructions)
+            self.compile_block(node.orelse)
+            self.labels[end_label] = len(self.instructions)
+        else:
+            self.labels[else_label] = len(self.instructions)
+
+    def compile_while_loop(self, node):
         """
-        Compile a print statement.
-        
+        Compile a while loop.
+
+        The condition is tested at the bottom of the loop, so an iteration
+        executes one branch: the loop starts with a jump to the condition,
+        which jumps back to the body while it holds.
+
         Args:
-            line: A string containing the print statement
-            
-        Example:
-            'print x' -> Load value of x into A, then store A to output buffer
+            node: A While node
         """
-        # Extract what to print
-        parts = line.split('print', 1)
-        if len(parts) < 2:
-            raise SyntaxError(f"Invalid print statement: {line}")
-            
-        expr = parts[1].strip()
-        
-        # Load the value to print into register A
-        self.load_operand(expr, 'A')
-        
-        # Store register A to the output buffer (memory address 241 / 0xF1)
-        self.instructions.append(("STA", 0xF1))
-        
-    def compile_assignment(self, line):
+        location = self.location
+        body_label = self.generate_label()
+        test_label = self.generate_label()
+        self.emit_jump("JMP", test_label)
+        self.labels[body_label] = len(self.instructions)
+        self.compile_block(node.body)
+        self.location = location
+        self.labels[test_label] = len(self.instructions)
+        self.compile_condition(node.test, body_label, True)
+
+    def compile_condition(self, node, label, jump_if):
         """
-        Compile a variable assignment like 'x = 5' or 'y = x + 3'.
-        
+        Compile a comparison and a jump to a label.
+
         Args:
-            line: The assignment statement
+            node: A Compare node
+            label: The label to jump to
+            jump_if: Whether to jump when the comparison holds (or when it fails)
         """
-        # Split at first equals sign
-        parts = line.split('=', 1)
-        if len(parts) != 2:
-            raise SyntaxError(f"Invalid assignment at line {self.current_line}: {line}")
-            
-        left = parts[0].strip()
-        right = parts[1].strip()
-        
-        # Allocate memory for the variable
-        var_addr = self.allocate_variable(left)
-        
-        # Handle different right-hand expressions
-        if '+' in right:
-            # Addition
-            operands = [s.strip() for s in right.split('+')]
-            self.load_operand(operands[0], 'A')
-            self.load_operand(operands[1], 'B')
-            self.instructions.append(("ADD", None))
-        elif '-' in right:
-            # Subtraction
-            operands = [s.strip() for s in right.split('-')]
-            self.load_operand(operands[0], 'A')
-            self.load_operand(operands[1], 'B')
-            self.instructions.append(("SUB", None))
-        elif '*' in right:
-            # Multiplication
-            operands = [s.strip() for s in right.split('*')]
-            self.load_operand(operands[0], 'A')
-            self.load_operand(operands[1], 'B')
-            self.instructions.append(("MUL", None))
-        elif '/' in right:
-            # Division
-            operands = [s.strip() for s in right.split('/')]
-            self.load_operand(operands[0], 'A')
-            self.load_operand(operands[1], 'B')
-            self.instructions.append(("DIV", None))
-        else:
-            # Simple assignment
-            self.load_operand(right, 'A')
-            
-        # Store the result in the variable
-        self.instructions.append(("STA", var_addr))
-        
-    def compile_condition(self, condition, jump_label):
+        self.compile_operands(node.left, node.right)
+        self.emit("CMP")
+        # CMP sets the zero flag when the operands are equal
+        self.emit_jump("JZ" if (node.op == "==") == jump_if else "JNZ", label)
+
+    def compile_expression(self, node):
         """
-        Compile a condition with jump to label if condition is false.
-        
+        Compile an expression, leaving its value in register A.
+
         Args:
-            condition: The condition string (e.g., "x == 5")
-            jump_label: The label to jump to if the condition is false
+            node: An expression node
         """
-        if '==' in condition:
-            left, right = [s.strip() for s in condition.split('==')]
-            
-            # Load left operand into A
-            self.load_operand(left, 'A')
-            
-            # Load right operand into B
-            self.load_operand(right, 'B')
-            
-            # Compare A and B
-            self.instructions.append(("CMP", None))
-            
-            # Jump if not equal
-            jump_idx = len(self.instructions)
-            self.instructions.append(("JNZ", None))
-            self.fixups.append((jump_idx, jump_label))
-            
-        elif '!=' in condition:
-            left, right = [s.strip() for s in condition.split('!=')]
-            
-            # Load left operand into A
-            self.load_operand(left, 'A')
-            
-            # Load right operand into B
-            self.load_operand(right, 'B')
-            
-            # Compare A and B
-            self.instructions.append(("CMP", None))
-            
-            # Jump if equal
-            jump_idx = len(self.instructions)
-            self.instructions.append(("JZ", None))
-            self.fixups.append((jump_idx, jump_label))
-            
+        if isinstance(node, Number):
+            self.emit("LDA", node.value)
+        elif isinstance(node, Name):
+            self.emit("LDA_MEM", self.allocate_variable(node.name))
+        elif isinstance(node, BinaryOp):
+            if node.op in "+*" and self.is_operand(node.left) and not self.is_operand(node.right):
+                # Both operators commute, so the operand can be loaded into B
+                self.compile_operands(node.right, node.left)
+            else:
+                self.compile_operands(node.left, node.right)
+            self.emit(OPERATORS[node.op])
         else:
-            raise SyntaxError(f"Unsupported condition at line {self.current_line}: {condition}")
-    
-    def compile_condition_inverse(self, condition, jump_label):
+            self.compile_call(node)
+
+    @staticmethod
+    def is_operand(node):
+        """Return whether an expression is a number or a variable."""
+        return isinstance(node, (Number, Name))
+
+    def compile_operands(self, left, right):
         """
-        Compile a condition with jump to label if condition is true (inverse logic).
-        
+        Compile two expressions into registers A and B.
+
+        A number or variable on the right is loaded into B directly. Any
+        other right operand is computed in A while the left operand waits on
+        the stack, and moved to B through a temporary memory cell.
+
         Args:
-            condition: The condition string (e.g., "x == 5")
-            jump_label: The label to jump to if the condition is true
+            left: The expression for register A
+            right: The expression for register B
         """
-        if '==' in condition:
-            left, right = [s.strip() for s in condition.split('==')]
-            
-            # Load left operand into A
-            self.load_operand(left, 'A')
-            
-            # Load right operand into B
-            self.load_operand(right, 'B')
-            
-            # Compare A and B
-            self.instructions.append(("CMP", None))
-            
-            # Jump if not equal (condition is false)
-            jump_idx = len(self.instructions)
-            self.instructions.append(("JNZ", None))
-            self.fixups.append((jump_idx, jump_label))
-            
-        elif '!=' in condition:
-            left, right = [s.strip() for s in condition.split('!=')]
-            
-            # Load left operand into A
-            self.load_operand(left, 'A')
-            
-            # Load right operand into B
-            self.load_operand(right, 'B')
-            
-            # Compare A and B
-            self.instructions.append(("CMP", None))
-            
-            # Jump if equal (condition is false)
-            jump_idx = len(self.instructions)
-            self.instructions.append(("JZ", None))
-            self.fixups.append((jump_idx, jump_label))
-            
+        self.compile_expression(left)
+        if isinstance(right, Number):
+            self.emit("LDB", right.value)
+        elif isinstance(right, Name):
+            self.emit("LDB_MEM", self.allocate_variable(right.name))
         else:
-            raise SyntaxError(f"Unsupported condition at line {self.current_line}: {condition}")
-        
-    def find_matching_else(self, lines, if_idx, if_indent):
-        """
-        Find the matching else statement for an if.
-        
-        Args:
-            lines: List of code lines
-            if_idx: Index of the if statement
-            if_indent: Indentation level of the if statement
-            
-        Returns:
-            The index of the matching else statement, or -1 if not found
-        """
-        i = if_idx + 1
-        # Skip the if block
-        while i < len(lines):
-            line = lines[i].strip()
-            line_indent = self.get_indent(lines[i])
-            
-            # If we find an else at the same level as the if, it's our match
-            if line == 'else' and line_indent == if_indent:
-                return i
-                
-            # If we find a line with less indent than the if, we've exited without finding else
-            if line and line_indent < if_indent:
-                return -1
-                
-            i += 1
-        
-        # Reached end of file without finding else
-        return -1
-    
-    def get_indent(self, line):
-        """
-        Get the indentation level of a line.
-        
-        Args:
-            line: A line of code
-            
-        Returns:
-            The number of spaces at the beginning of the line
-        """
-        return len(line) - len(line.lstrip())
-    
-    def load_operand(self, operand, register):
+            self.emit("PUSH")
+            self.compile_expression(right)
+            temporary = self.allocate_variable(TEMPORARY)
+            self.emit("STA", temporary)
+            self.emit("POP_PARAM")
+            self.emit("LDB_MEM", temporary)
+
+    def compile_call(self, node):
         """
-        Load an operand into a register.
-        
+        Compile a function call, leaving the return value in register A.
+
         Args:
-            operand: A string representation of the operand (variable name or numeric value)
-            register: The register to load into ('A' or 'B')
-            
+            node: A Call node
+
         Raises:
-            NameError: If the operand is a variable that doesn't exist
-            ValueError: If the register is invalid
+            NameError: If the function is not defined
+            ValueError: If the number of arguments does not match the parameters
         """
-        # Check for valid register
-        if register not in ('A', 'B'):
-            raise ValueError(f"Invalid register: {register}")
-            
-        instruction = f"LD{register}"
-        mem_instruction = f"LD{register}_MEM"
-        
-        # Check if operand is a numeric value or a variable
-        operand = operand.strip()
-        try:
-            # Try to convert to a number
-            value = int(operand)
-            self.instructions.append((instruction, value))
-        except ValueError:
-            # If not a number, must be a variable
-            if operand not in self.variables:
-                # If the variable doesn't exist, allocate it (set to 0)
-                self.allocate_variable(operand)
-                
-            # Load from variable's memory address
-            var_addr = self.variables[operand]
-            self.instructions.append((mem_instruction, var_addr))
-
-    def parse_block(self, lines, start_idx, indent_level):
-        """
-        Parse a block of code starting at the given index and indent level.
-        
-        Args:
-            lines: List of code lines
-            start_idx: Starting index in the lines list
-            indent_level: Indentation level of this block
-            
-        Returns:
-            Tuple of (end_idx, has_else) where:
-                end_idx: The index of the next line after this block
-                has_else: Boolean indicating if an else block was found
-        """
-        i = start_idx
-        has_else = False
-        
-        while i < len(lines):
-            line = lines[i]
-            if not isinstance(line, str):
-                i += 1
-                continue
-                
-            line_indent = self.get_indent(line)
-            
-            # If we encounter a line with less indent than our current level, 
-            # we've exited the current block
-            if line_indent < indent_level:
-                break
-                
-            # Only process lines at the current indent level
-            if line_indent == indent_level:
-                line_content = line.strip()
-                
-                if line_content.startswith('else'):
-                    has_else = True
-                    i += 1
-                else:
-                    i += 1
-            else:
-                # Skip lines with different indentation
-                i += 1
-                
-        return i, has_else
+        if node.name not in self.functions:
+            raise NameError(f"Undefined function: {node.name} (line {node.line})")
+        params = self.functions[node.name]["params"]
+        if len(node.args) != len(params):
+            raise ValueError(f"Function {node.name} expects {len(params)} arguments, "
+                             f"but {len(node.args)} were provided (line {node.line})")
+
+        # All arguments are evaluated before any parameter is stored, as the
+        # arguments may read the parameters themselves
+        addresses = [self.allocate_variable(name) for name in params]
+        for arg in node.args[:-1]:
+            self.compile_expression(arg)
+            self.emit("PUSH")
+        if node.args:
+            self.compile_expression(node.args[-1])
+            self.emit("STA", addresses[-1])
+        for address in reversed(addresses[:-1]):
+            self.emit("POP_PARAM")
+            self.emit("STA", address)
+        self.emit_jump("CALL", f"func_{node.name}")
 
 
 # Example usage (only runs when this file is executed directly)
@@ -663,7 +446,7 @@ def main():
         print(f"{var}: {addr}")
     
     # Run on the computer
-    from computer import Computer
+    from src.computer import Computer
     computer = Computer()
     computer.load_program(program)
     computer.run()  # Changed to run without debug for the example
@@ -1,10 +1,81 @@
+import asyncio
+
 from src.memory import Memory
 from src.cpu import CPU
+from src.bytecode import decode
+from src.bus import IOBus, InputDevice, OutputDevice, InputPending
+from src.fusion import fuse
+from src.blocks import BlockEngine
+from src.tracing import TracingEngine
+from src.verifier import verify, VerificationError
+from src.objfile import read_ssb
+from src.compiler import format_location
+from src.profiler import Profiler
+from src.hooks import Hooks, run_hooked
+from src.timetravel import Recording
+
+class OutputHistory:
+    """
+    The outputs of a Computer up to a snapshot.
+    
+    Each history only holds the outputs written since the history it
+    continues (the previous snapshot or restore), so a snapshot costs only
+    its new outputs and histories form a tree shared between snapshots.
+    
+    Attributes:
+        previous: The OutputHistory this one continues, or None
+        values: The outputs written since previous
+        total: The number of outputs written up to this history
+    """
+    
+    __slots__ = ("previous", "values", "total")
+    
+    def __init__(self, previous=None, values=()):
+        self.previous = previous
+        self.values = values
+        self.total = len(values) + (previous.total if previous is not None else 0)
+
+
+# The history before any output, shared by all computers so that the
+# histories of forks meet their parent's
+NO_OUTPUTS = OutputHistory()
+
+
+class Snapshot:
+    """
+    The saved state of a Computer: registers, flags, program counter,
+    memory, stack and outputs. See Computer.snapshot().
+    """
+    
+    __slots__ = ("program", "registers", "memory", "stack", "outputs")
+    
+    def __init__(self, program, registers, memory, stack, outputs):
+        self.program = program
+        self.registers = registers
+        self.memory = memory
+        self.stack = stack
+        self.outputs = outputs  # An OutputHistory
+
 
 class Computer:
-    def __init__(self, memory_size=256):
-        self.memory = Memory(memory_size)
-        self.cpu = CPU(self.memory)
+    # CPU attributes saved in snapshots
+    SNAPSHOT_REGISTERS = ("register_a", "register_b", "zero_flag", "carry_flag", "pc", "running")
+    
+    # Available execution engines
+    ENGINES = ("interpreter", "blocks", "tracing")
+    
+    def __init__(self, memory_size=256, fuse_instructions=True, engine="interpreter",
+                 output_sink=None, memory=None):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {', '.join(self.ENGINES)})")
+        
+        # A memory backend such as TypedMemory can be passed in instead of the
+        # default list-based Memory; its size then replaces memory_size
+        if memory is not None:
+            memory_size = memory.size
+        self.memory = memory if memory is not None else Memory(memory_size)
+        self.bus = IOBus()
+        self.cpu = CPU(self.memory, self.bus)
         
         # Define memory-mapped I/O addresses
         self.IO_INPUT_BUFFER = 0xF0  # Address 240 for input
@@ -14,37 +85,414 @@ class Computer:
         # Initialize the output counter
         self.memory.write(self.IO_OUTPUT_COUNT, 0)
         
-        # Store outputs for easy access
-        self.outputs = []
+        # Store outputs for easy access. Any object with append() can replace
+        # the list, e.g. a bounded OutputBuffer for long-running programs.
+        self.outputs = output_sink if output_sink is not None else []
+        
+        # Attach the I/O devices. Devices must be mapped before a program is
+        # loaded, since stores are bound to devices when the program is decoded.
+        self.input_device = InputDevice(self.memory, self.IO_INPUT_BUFFER)
+        self.output_device = OutputDevice(self.memory, self.IO_OUTPUT_BUFFER,
+                                          self.IO_OUTPUT_COUNT, self.outputs)
+        self.bus.map(self.input_device, self.IO_INPUT_BUFFER)
+        self.bus.map(self.output_device, self.IO_OUTPUT_BUFFER, self.IO_OUTPUT_COUNT)
+        
+        # The outputs up to the last snapshot taken or restored
+        self.output_history = NO_OUTPUTS
+        
+        # Replace common instruction sequences with superinstructions on load
+        self.fuse_instructions = fuse_instructions
+        
+        # Settings needed to create forks of this computer
+        self.memory_size = memory_size
+        
+        # "interpreter" runs the decoded program one instruction at a time,
+        # "blocks" runs it as compiled Python functions per basic block,
+        # "tracing" interprets it and compiles hot loops into traces
+        self.engine = engine
+        self.block_engine = None
+        self.tracing_engine = None
+        
+        # Callbacks that observe execution (see hooks.py). While any are
+        # registered, programs run on the hooked loop instead of the engine.
+        self.hooks = Hooks()
         
-    def load_program(self, program):
+    def load_program(self, program, source_map=None):
         """
         Loads a program into memory.
         
         Program is a list of tuples (instruction, operand).
         Operand can be None for instructions that don't need one.
+        The optional source map is a list with the SourceLocation of each
+        instruction (see SimpleCompiler.source_map).
+        
+        The program is decoded once here into a CodeObject holding integer
+        opcodes, pre-bound CPU handlers and operands, so that run() does not
+        have to look instructions up by name on every step. Unless disabled,
+        common instruction sequences are then fused into superinstructions.
+        
+        The program is also verified once here. Verified programs access
+        memory without range checks; programs that fail verification still
+        load and keep the checks, except that programs with unresolved
+        labels cannot be run.
         """
+        if source_map is not None and len(source_map) != len(program):
+            raise ValueError(f"Source map has {len(source_map)} entries for {len(program)} instructions")
         self.program = program
+        self.source_map = source_map
+        try:
+            verify(program, self.memory.size)
+            self.verification_error = None
+        except VerificationError as e:
+            self.verification_error = e
+        self.verified = self.verification_error is None
+        self.code = decode(program, self.cpu, self.verified)
+        self.plain_code = self.code  # Unfused code for the hooked loop
+        if self.fuse_instructions:
+            self.code = fuse(self.code, self.cpu)
+        if self.engine == "blocks":
+            self.block_engine = BlockEngine(self.cpu, program)
+        elif self.engine == "tracing":
+            self.tracing_engine = TracingEngine(self.cpu, decode(program, self.cpu, self.verified))
     
-    def run(self):
+    def load_file(self, path):
+        """
+        Load a compiled program from an .ssb object file (see objfile.py).
+        
+        Returns:
+            The ObjectFile, holding the program's symbol table and source map
+        """
+        obj = read_ssb(path)
+        self.load_program(obj.program, obj.source_map)
+        return obj
+    
+    def run(self, max_steps=None, profile=False):
+        """
+        Run the loaded program from the beginning.
+        
+        Args:
+            max_steps: Optional limit on the number of instructions to execute
+                (a fused superinstruction counts as one). The block engine
+                stops at the first block boundary once the limit is reached.
+            profile: Run under the profiler (see profile())
+            
+        Returns:
+            A Profile if profile is set, else the number of instructions
+            executed if max_steps was given, else None
+        """
+        self.start()
+        if profile:
+            return self.profile(max_steps)
+        return self.resume(max_steps)
+    
+    def profile(self, max_steps=None, sample_interval=0.001):
+        """
+        Continue running the loaded program under the profiler.
+        
+        The profiler counts instructions per pc, opcode, source line and
+        function through execution hooks (see profiler.py).
+        
+        Args:
+            max_steps: Optional limit on the number of instructions to execute
+            sample_interval: Seconds between wall-clock samples
+            
+        Returns:
+            A Profile
+        """
+        return Profiler(self, sample_interval).run(max_steps)
+    
+    def record(self, interval=1000, max_steps=None):
+        """
+        Run the loaded program from the beginning in record mode.
+        
+        The returned Recording can move the computer to any step of the run,
+        re-executing at most interval instructions (see timetravel.py).
+        
+        Args:
+            interval: Instructions between checkpoints
+            max_steps: Optional limit on the number of instructions to record
+            
+        Returns:
+            A Recording, positioned at the end of the run
+            
+        Raises:
+            Any error raised by the program, with the recording of the steps
+            before it in the error's recording attribute
+        """
+        recording = Recording(self, interval)
+        try:
+            recording.record(max_steps)
+        except Exception as e:
+            e.recording = recording
+            raise
+        return recording
+    
+    def start(self):
+        """Prepare the loaded program to run from the beginning."""
+        self.check_labels()
         self.cpu.pc = 0  # Reset program counter
         self.cpu.running = True
+    
+    def check_labels(self):
+        """
+        Ensure all labels of the loaded program are resolved.
         
-        # Ensure all labels are resolved
-        for i, (instruction, operand) in enumerate(self.program):
-            if isinstance(operand, str):
-                raise ValueError(f"Unresolved label in program: {operand} at position {i}")
+        Raises:
+            VerificationError: If load-time verification found an unresolved label
+        """
+        error = self.verification_error
+        if error is not None and error.reason == "label":
+            raise error
+    
+    def location(self, pc=None):
+        """
+        Return the source location of an instruction.
         
-        while self.cpu.running and self.cpu.pc < len(self.program):
-            instruction, operand = self.program[self.cpu.pc]
-            self.cpu.execute(instruction, operand)
+        Args:
+            pc: Index of the instruction (defaults to the program counter)
             
-            # Check if output was written
-            if self.has_new_output():
-                self.record_output()
+        Returns:
+            A SourceLocation, or None if the program has no source map
+        """
+        if pc is None:
+            pc = self.cpu.pc
+        if self.source_map is None or not 0 <= pc < len(self.source_map):
+            return None
+        return self.source_map[pc]
+    
+    def annotate_error(self, error):
+        """
+        Attach the source location of the program counter to an exception.
+        
+        The location is stored in error.source_location and, where supported,
+        added as a note shown in the traceback.
+        """
+        location = self.location()
+        error.source_location = location
+        if location is not None and hasattr(error, "add_note"):
+            error.add_note(f"SimpleScript location: {format_location(location)} "
+                           f"(instruction {self.cpu.pc})")
+    
+    def is_finished(self):
+        """Check whether the program has halted or run past its last instruction."""
+        return not self.cpu.running or self.cpu.pc >= len(self.program)
+    
+    def resume(self, max_steps=None):
+        """
+        Continue running the loaded program from the current program counter.
+        
+        Args:
+            max_steps: Optional limit on the number of instructions to execute,
+                as for run()
+            
+        Returns:
+            The number of instructions executed if max_steps was given, else None
+            
+        Errors raised by the program get the source location of the
+        instruction at the program counter attached (see annotate_error).
+        """
+        try:
+            return self.execute(max_steps)
+        except InputPending:
+            raise
+        except Exception as e:
+            self.annotate_error(e)
+            raise
+    
+    def execute(self, max_steps=None):
+        """Run the loaded program on the selected engine (see resume())."""
+        if self.hooks:
+            steps = run_hooked(self.cpu, self.plain_code, self.hooks, max_steps)
+            return steps if max_steps is not None else None
+        if self.block_engine is not None:
+            return self.block_engine.run(max_steps)
+        if self.tracing_engine is not None:
+            return self.tracing_engine.run(max_steps)
+        
+        cpu = self.cpu
+        handlers = self.code.handlers
+        operands = self.code.operands
+        end = len(handlers)
+        
+        # Output is handled by the output device when a store reaches it,
+        # so the loop itself never polls memory.
+        if max_steps is None:
+            while cpu.running and cpu.pc < end:
+                pc = cpu.pc
+                handlers[pc](operands[pc])
+            return None
+        
+        steps = 0
+        while steps < max_steps and cpu.running and cpu.pc < end:
+            pc = cpu.pc
+            handlers[pc](operands[pc])
+            steps += 1
+        return steps
+    
+    async def run_async(self, inputs=None, output_sink=None, slice_size=1000):
+        """
+        Run the loaded program from the beginning as an asyncio task.
+        
+        The program runs in slices of slice_size instructions and yields to
+        the event loop between slices. If inputs is given, every read of the
+        input buffer takes the next value from it, awaiting the queue when it
+        is empty; otherwise reads return the value set with set_input().
+        
+        Args:
+            inputs: Optional asyncio.Queue of input values
+            output_sink: Optional asyncio.Queue or coroutine function that
+                receives every output value, in order, after the slice that
+                produced it
+            slice_size: Instructions to run between yields to the event loop
+            
+        Returns:
+            The list of all outputs
+        """
+        if slice_size < 1:
+            raise ValueError(f"Slice size must be at least 1, got {slice_size}")
+        
+        device = self.input_device
+        sent = self.output_device.total
+        self.start()
+        if inputs is not None:
+            device.start_queue()
+        try:
+            while not self.is_finished():
+                waiting = False
+                try:
+                    self.resume(max_steps=slice_size)
+                except InputPending:
+                    waiting = True
+                # Outputs are sent first, since the input may depend on them
+                if output_sink is not None:
+                    sent = await self._send_outputs(output_sink, sent)
+                if waiting:
+                    # The read did not advance the pc, so it is retried
+                    device.feed(await inputs.get())
+                else:
+                    await asyncio.sleep(0)
+        finally:
+            device.stop_queue()
+        return self.outputs
+    
+    async def _send_outputs(self, sink, sent):
+        """
+        Send the outputs written since the first sent ones to sink.
+        
+        Returns:
+            The new number of outputs sent
+        """
+        put = sink.put if isinstance(sink, asyncio.Queue) else sink
+        outputs = self.outputs
+        total = self.output_device.total
+        # A bounded sink may already have dropped some of the new outputs
+        for i in range(len(outputs) - min(total - sent, len(outputs)), len(outputs)):
+            await put(outputs[i])
+        return total
+    
+    def iter_outputs(self):
+        """
+        Run the loaded program from the beginning, yielding each output.
+        
+        Execution stops right after every output until the next value is
+        requested, so consumers can process outputs as they are produced.
+        Closing the generator early leaves the computer ready to resume().
+        
+        Yields:
+            Each output value, in order
+        """
+        self.start()
+        cpu = self.cpu
+        device = self.output_device
+        device.pause_cpu = cpu
+        device.paused = False
+        try:
+            while not self.is_finished():
+                self.resume()
+                if device.paused:
+                    device.paused = False
+                    cpu.running = True
+                    yield device.last_output
+        finally:
+            device.pause_cpu = None
+    
+    def snapshot(self):
+        """
+        Save the state of the computer.
+        
+        Memory is saved copy-on-write by page: only pages written since the
+        previous snapshot or restore are copied, the others are shared with
+        it. Likewise only the outputs written since then are saved. Snapshots
+        are immutable and can be restored any number of times.
+        
+        Returns:
+            A Snapshot
+        """
+        registers = tuple(getattr(self.cpu, name) for name in self.SNAPSHOT_REGISTERS)
+        memory = self.memory.snapshot(self.code.store_pages)
+        history = self.output_history
+        new = self.output_device.total - history.total
+        if new:
+            outputs = self.outputs
+            # A bounded sink may already have dropped some of the new outputs
+            values = tuple(outputs[i] for i in range(len(outputs) - min(new, len(outputs)), len(outputs)))
+            history = self.output_history = OutputHistory(history, values)
+        return Snapshot(self.program, registers, memory, tuple(self.memory.stack), history)
+    
+    def restore(self, snapshot):
+        """
+        Restore a snapshot taken from this computer or one running the same
+        program. Execution continues from the snapshot with resume().
+        
+        Outputs written since the latest history the computer's outputs share
+        with the snapshot are removed, and the snapshot's outputs after it are
+        appended, so restoring a nearby snapshot only touches the outputs in
+        between.
+        """
+        for name, value in zip(self.SNAPSHOT_REGISTERS, snapshot.registers):
+            setattr(self.cpu, name, value)
+        self.memory.restore(snapshot.memory, self.code.store_pages)
+        self.memory.stack[:] = snapshot.stack
+        
+        # Find the common history of the current outputs and the snapshot's,
+        # collecting the snapshot's values after it
+        current = self.output_history
+        target = snapshot.outputs
+        replay = []
+        while current is not target:
+            if target.total > current.total:
+                replay.append(target.values)
+                target = target.previous
+            else:
+                current = current.previous
+        outputs = self.outputs
+        removed = self.output_device.total - current.total
+        if removed:
+            del outputs[max(len(outputs) - removed, 0):]
+        for values in reversed(replay):
+            outputs.extend(values)
+        self.output_history = snapshot.outputs
+        self.output_device.total = snapshot.outputs.total
+    
+    def fork(self):
+        """
+        Create a new computer in the same state as this one.
+        
+        The fork shares snapshot pages with this computer, so both can take
+        and restore snapshots of the shared state without copying it again.
+        
+        Returns:
+            A new Computer with the same program and settings
+        """
+        snapshot = self.snapshot()
+        child = Computer(self.memory_size, self.fuse_instructions, self.engine,
+                         memory=self.memory.empty_copy())
+        child.load_program(snapshot.program)
+        child.restore(snapshot)
+        return child
     
     def set_input(self, value):
-        self.memory.write(self.IO_INPUT_BUFFER, value)
+        self.bus.write(self.IO_INPUT_BUFFER, value)
         
     def get_output(self):
         """Get the most recent output value"""
@@ -56,23 +504,6 @@ class Computer:
         """Get all outputs from the program execution"""
         return self.outputs
     
-    def has_new_output(self):
-        """Check if there's new output written to the buffer"""
-        # This simplistic approach just checks if the output buffer has a non-zero value
-        return self.memory.read(self.IO_OUTPUT_BUFFER) != 0
-    
-    def record_output(self):
-        """Record the current output value"""
-        output_value = self.memory.read(self.IO_OUTPUT_BUFFER)
-        self.outputs.append(output_value)
-        
-        # Update output counter
-        count = self.memory.read(self.IO_OUTPUT_COUNT)
-        self.memory.write(self.IO_OUTPUT_COUNT, count + 1)
-        
-        # Clear the output buffer
-        self.memory.write(self.IO_OUTPUT_BUFFER, 0)
-    
     def print_output(self):
         """Print all outputs generated by the program"""
         if not self.outputs:
@@ -83,28 +514,48 @@ class Computer:
         for i, value in enumerate(self.outputs):
             print(f"Output {i+1}: {value}")
     
-    def debug_mode(self):
-        self.cpu.pc = 0  # Reset program counter
-        self.cpu.running = True
+    def trace(self, file=None, pause=False):
+        """
+        Run the loaded program from the beginning, printing every instruction.
         
-        # Ensure all labels are resolved
-        for i, (instruction, operand) in enumerate(self.program):
-            if isinstance(operand, str):
-                raise ValueError(f"Unresolved label in program: {operand} at position {i}")
-        
-        while self.cpu.running and self.cpu.pc < len(self.program):
-            instruction, operand = self.program[self.cpu.pc]
-            print(f"PC: {self.cpu.pc}, Executing: {instruction} {operand if operand is not None else ''}")
-            print(f"Registers - A: {self.cpu.register_a}, B: {self.cpu.register_b}")
-            print(f"Flags - Zero: {self.cpu.zero_flag}, Carry: {self.cpu.carry_flag}")
-            print(f"-"*10)
-            
-            self.cpu.execute(instruction, operand)
-            
-            # Check if output was written
-            if self.has_new_output():
-                output_value = self.memory.read(self.IO_OUTPUT_BUFFER)
-                print(f"Output: {output_value}")
-                self.record_output()
-                
-            input("Press Enter to continue...")
\ No newline at end of file
+        Each instruction is printed with the registers and flags before it
+        runs, followed by any output it writes.
+        
+        Args:
+            file: Stream to print to (defaults to sys.stdout)
+            pause: Wait for Enter after each instruction
+        """
+        cpu = self.cpu
+        program = self.program
+        started = False
+        
+        def before(pc):
+            nonlocal started
+            # Waiting before the next instruction waits after the previous
+            # one and its output
+            if pause and started:
+                input("Press Enter to continue...")
+            started = True
+            instruction, operand = program[pc]
+            print(f"PC: {pc}, Executing: {instruction} {operand if operand is not None else ''}", file=file)
+            print(f"Registers - A: {cpu.register_a}, B: {cpu.register_b}", file=file)
+            print(f"Flags - Zero: {cpu.zero_flag}, Carry: {cpu.carry_flag}", file=file)
+            print(f"-"*10, file=file)
+        
+        def write(pc, address, value):
+            if address == self.IO_OUTPUT_BUFFER:
+                print(f"Output: {value}", file=file)
+        
+        self.hooks.add("instruction", before)
+        self.hooks.add("write", write)
+        try:
+            self.run()
+        finally:
+            self.hooks.remove("instruction", before)
+            self.hooks.remove("write", write)
+        if pause and started:
+            input("Press Enter to continue...")
+    
+    def debug_mode(self):
+        """Step through the loaded program, printing every instruction (see trace())."""
+        self.trace(pause=True)
@@ -1,6 +1,10 @@
+from src.bytecode import ADD, SUB, MUL
+
+
 class CPU:
-    def __init__(self, memory):
+    def __init__(self, memory, bus=None):
         self.memory = memory
+        self.bus = bus  # Optional I/O bus for memory-mapped devices
         
         # Registers
         self.register_a = 0  # Accumulator
@@ -16,6 +20,10 @@ class CPU:
         # State
         self.running = False
         
+        # Word width of the memory; on fixed-width memory arithmetic wraps
+        # around and sets the carry flag when it overflows
+        self.word_bits = memory.word_bits
+        
         # Define the instruction set
         self.instructions = {
             # Load operations
@@ -53,6 +61,16 @@ class CPU:
             "POP_RET": self._pop_ret,      # Pop return address from stack (internal use)
         }
         
+        if self.word_bits is not None:
+            self.word_half = 1 << (self.word_bits - 1)
+            self.word_mask = (1 << self.word_bits) - 1
+            self.instructions.update({
+                "ADD": self._add_wrap,
+                "SUB": self._sub_wrap,
+                "MUL": self._mul_wrap,
+                "DIV": self._div_wrap,
+            })
+        
     def execute(self, instruction, operand):
         """Execute a single instruction with its operand."""
         if instruction in self.instructions:
@@ -90,6 +108,46 @@ class CPU:
         self.memory.write(address, self.register_b)
         self.pc += 1
     
+    def _lda_mem_unchecked(self, address):
+        """Load register A from a verified memory address."""
+        self.register_a = self.memory.memory[address]
+        self.pc += 1
+    
+    def _ldb_mem_unchecked(self, address):
+        """Load register B from a verified memory address."""
+        self.register_b = self.memory.memory[address]
+        self.pc += 1
+    
+    def _sta_unchecked(self, address):
+        """Store register A to a verified memory address."""
+        self.memory.memory[address] = self.register_a
+        self.pc += 1
+    
+    def _stb_unchecked(self, address):
+        """Store register B to a verified memory address."""
+        self.memory.memory[address] = self.register_b
+        self.pc += 1
+    
+    def _lda_io(self, address):
+        """Load register A from a memory-mapped device."""
+        self.register_a = self.bus.read(address)
+        self.pc += 1
+    
+    def _ldb_io(self, address):
+        """Load register B from a memory-mapped device."""
+        self.register_b = self.bus.read(address)
+        self.pc += 1
+    
+    def _sta_io(self, address):
+        """Store register A to a memory-mapped device."""
+        self.bus.write(address, self.register_a)
+        self.pc += 1
+    
+    def _stb_io(self, address):
+        """Store register B to a memory-mapped device."""
+        self.bus.write(address, self.register_b)
+        self.pc += 1
+    
     def _add(self, _):
         """Add register B to register A."""
         self.register_a += self.register_b
@@ -114,6 +172,33 @@ class CPU:
             self.register_a = self.register_a // self.register_b
         self.pc += 1
     
+    def _wrap_a(self):
+        """Wrap register A around to the word width and set carry on overflow."""
+        value = self.register_a
+        wrapped = ((value + self.word_half) & self.word_mask) - self.word_half
+        self.register_a = wrapped
+        self.carry_flag = wrapped != value
+    
+    def _add_wrap(self, operand):
+        """Add register B to register A with wraparound."""
+        self._add(operand)
+        self._wrap_a()
+    
+    def _sub_wrap(self, operand):
+        """Subtract register B from register A with wraparound."""
+        self._sub(operand)
+        self._wrap_a()
+    
+    def _mul_wrap(self, operand):
+        """Multiply register A by register B with wraparound."""
+        self._mul(operand)
+        self._wrap_a()
+    
+    def _div_wrap(self, operand):
+        """Divide register A by register B with wraparound."""
+        self._div(operand)
+        self._wrap_a()
+    
     def _cmp(self, _):
         """Compare A and B, set flags."""
         if self.register_a == self.register_b:
@@ -186,4 +271,56 @@ class CPU:
         """Pop the return address off the stack."""
         # Only used internally
         self.memory.pop()  # Discard the value
-        self.pc += 1
\ No newline at end of file
+        self.pc += 1
+    
+    def _fused_move(self, operand):
+        """LDA or LDA_MEM followed by STA."""
+        from_memory, value, address = operand
+        memory = self.memory.memory
+        if from_memory:
+            value = memory[value]
+        self.register_a = value
+        memory[address] = value
+        self.pc += 2
+    
+    def _fused_arith(self, operand):
+        """Load A, load B, ADD/SUB/MUL/DIV, then STA."""
+        a_from_memory, a, b_from_memory, b, opcode, address = operand
+        memory = self.memory.memory
+        if a_from_memory:
+            a = memory[a]
+        if b_from_memory:
+            b = memory[b]
+        self.register_b = b
+        if opcode == ADD:
+            a += b
+        elif opcode == SUB:
+            a -= b
+        elif opcode == MUL:
+            a *= b
+        elif b == 0:
+            print("Warning: Division by zero. Result undefined.")
+            a = 0
+        else:
+            a //= b
+        self.register_a = a
+        memory[address] = a
+        self.pc += 4
+    
+    def _fused_branch(self, operand):
+        """Load A, load B, CMP, then JZ or JNZ."""
+        a_from_memory, a, b_from_memory, b, jump_if_zero, address = operand
+        memory = self.memory.memory
+        if a_from_memory:
+            a = memory[a]
+        if b_from_memory:
+            b = memory[b]
+        self.register_a = a
+        self.register_b = b
+        zero = a == b
+        self.zero_flag = zero
+        self.carry_flag = a < b
+        if zero == jump_if_zero:
+            self.pc = address
+        else:
+            self.pc += 4
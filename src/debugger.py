@@ -0,0 +1,361 @@
+"""
+SimpleScript Debugger
+
+A non-interactive debugger for programs that run too long to step through
+one instruction at a time. It is built on the computer's execution hooks
+(see hooks.py) and only installs them while the program runs under it.
+
+The debugger supports:
+- breakpoints on a program counter, a source line or a function entry,
+  optionally with a condition
+- watchpoints that stop after a store to a memory address
+- a ring buffer with the last N executed instructions, which is written to
+  the debugger's output when the program halts or raises an error
+
+Conditions are Python expressions over the registers and memory, such as
+"a > 10 and mem[16] == 0" or, given a symbol table, "x > y". They are
+compiled once, when the breakpoint is added, into a function that reads
+the registers and memory directly, so a condition costs one function call
+each time its breakpoint is reached. The names available are:
+- a, b: the registers
+- zero, carry: the flags
+- pc: the program counter
+- mem[address]: the value in memory at a constant or computed address
+- the program's variables, if a symbol table was given
+"""
+
+import ast
+import sys
+from collections import deque
+
+from src.compiler import format_location
+
+
+class Breakpoint:
+    """
+    A breakpoint added with Debugger.add_breakpoint().
+
+    Attributes:
+        pcs: The program counters the breakpoint stops at
+        condition: The source of the condition, or None
+        hits: The number of times the breakpoint stopped the program
+    """
+
+    def __init__(self, pcs, condition=None, test=None):
+        self.pcs = frozenset(pcs)
+        self.condition = condition
+        self.test = test
+        self.hits = 0
+
+
+class Stop:
+    """
+    Why a debugged program stopped.
+
+    Attributes:
+        reason: "breakpoint", "watchpoint", "halt" (HALT or the end of the
+            program was reached) or "steps" (max_steps ran out)
+        pc: The program counter when the program stopped; at a breakpoint,
+            the instruction at pc has not run yet
+        breakpoint: The Breakpoint that stopped the program, or None
+        store: For watchpoints, the program counter of the store
+        address, old, new: For watchpoints, the address written and its
+            value before and after the store
+    """
+
+    def __init__(self, reason, pc, breakpoint=None, store=None, address=None, old=None, new=None):
+        self.reason = reason
+        self.pc = pc
+        self.breakpoint = breakpoint
+        self.store = store
+        self.address = address
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return f"Stop({self.reason!r}, pc={self.pc})"
+
+
+# Names a condition can use and the expressions they compile to
+REGISTERS = {
+    "a": "cpu.register_a", "b": "cpu.register_b",
+    "zero": "cpu.zero_flag", "carry": "cpu.carry_flag", "pc": "cpu.pc",
+}
+
+# Syntax allowed in conditions
+CONDITION_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.Constant, ast.Name, ast.Load, ast.Subscript,
+)
+
+
+def compile_condition(condition, variables=None):
+    """
+    Compile a breakpoint condition into a function of the CPU.
+
+    Args:
+        condition: The condition as a Python expression (see module docstring)
+        variables: Optional mapping from variable name to memory address
+
+    Returns:
+        A function that takes the CPU and returns whether the condition holds
+
+    Raises:
+        ValueError: If the condition is not a valid expression or uses
+            unknown names or unsupported syntax
+    """
+    variables = variables or {}
+    try:
+        tree = ast.parse(condition, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition {condition!r}: {e.msg}") from None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, CONDITION_NODES):
+            raise ValueError(f"Unsupported syntax in condition {condition!r}: "
+                             f"{type(node).__name__}")
+        if isinstance(node, ast.Subscript) and not (
+                isinstance(node.value, ast.Name) and node.value.id == "mem"):
+            raise ValueError(f"Only mem[...] can be indexed in condition {condition!r}")
+        if (isinstance(node, ast.Name) and node.id != "mem"
+                and node.id not in REGISTERS and node.id not in variables):
+            raise ValueError(f"Unknown name {node.id!r} in condition {condition!r}")
+
+    class Rewrite(ast.NodeTransformer):
+        """Replace names with register and memory accesses."""
+
+        def visit_Subscript(self, node):
+            index = self.visit(node.slice)
+            return ast.Call(ast.Name("read", ast.Load()), [index], [])
+
+        def visit_Name(self, node):
+            if node.id in REGISTERS:
+                return ast.parse(REGISTERS[node.id], mode="eval").body
+            return ast.Call(ast.Name("read", ast.Load()), [ast.Constant(variables[node.id])], [])
+
+    body = Rewrite().visit(tree).body
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg("cpu"), ast.arg("read")],
+                              kwonlyargs=[], kw_defaults=[], defaults=[])
+    function = ast.Expression(ast.Lambda(arguments, body))
+    ast.fix_missing_locations(function)
+    test = eval(compile(function, "<condition>", "eval"), {"__builtins__": {}})
+    return lambda cpu: test(cpu, cpu.memory.read)
+
+
+class Debugger:
+    """
+    Runs a computer's loaded program with breakpoints, watchpoints and a
+    history of executed instructions.
+
+    Args:
+        computer: A Computer with a loaded program
+        history: Number of executed instructions to keep
+        symbols: Optional symbol table (see SimpleCompiler.symbol_table()),
+            so that conditions and watchpoints can use variable names
+        output: Stream the history is written to when the program halts or
+            raises an error (defaults to sys.stderr, None disables it)
+    """
+
+    def __init__(self, computer, history=100, symbols=None, output=sys.stderr):
+        self.computer = computer
+        self.history = deque(maxlen=history)
+        self.variables = symbols["variables"] if symbols else {}
+        self.output = output
+        self.breakpoints = []
+        self.watchpoints = {}  # Address -> last value seen
+        self.stop = None
+        self.resume_pc = None
+
+    def resolve(self, pc=None, line=None, function=None):
+        """
+        Return the program counters for a breakpoint location.
+
+        A source line resolves to the first instruction of each run of
+        instructions compiled from it, and a function to its first instruction.
+
+        Raises:
+            ValueError: If exactly one location is not given, or it needs a
+                source map the program does not have, or matches no instruction
+        """
+        if sum(location is not None for location in (pc, line, function)) != 1:
+            raise ValueError("A breakpoint needs exactly one of pc, line and function")
+        program = self.computer.program
+        if pc is not None:
+            if not 0 <= pc < len(program):
+                raise ValueError(f"Breakpoint pc {pc} is outside the program")
+            return [pc]
+
+        source_map = self.computer.source_map
+        if source_map is None:
+            raise ValueError("Line and function breakpoints need a source map")
+        if line is not None:
+            pcs = [i for i, location in enumerate(source_map)
+                   if location.line == line and (i == 0 or source_map[i - 1] != location)]
+        else:
+            pcs = [i for i, location in enumerate(source_map) if location.function == function][:1]
+        if not pcs:
+            raise ValueError(f"No instructions for breakpoint at "
+                             f"{'line ' + str(line) if line is not None else function}")
+        return pcs
+
+    def add_breakpoint(self, pc=None, line=None, function=None, condition=None):
+        """
+        Add a breakpoint.
+
+        Args:
+            pc: Program counter to stop at
+            line: Source line to stop at
+            function: Function to stop at the entry of
+            condition: Optional condition (see module docstring) or function
+                of the CPU; the breakpoint only stops when it holds
+
+        Returns:
+            The Breakpoint
+
+        Raises:
+            ValueError: If the location or condition is invalid
+        """
+        pcs = self.resolve(pc, line, function)
+        if condition is None or callable(condition):
+            breakpoint = Breakpoint(pcs, None, condition)
+        else:
+            breakpoint = Breakpoint(pcs, condition, compile_condition(condition, self.variables))
+        self.breakpoints.append(breakpoint)
+        return breakpoint
+
+    def remove_breakpoint(self, breakpoint):
+        """Remove a breakpoint added with add_breakpoint()."""
+        self.breakpoints.remove(breakpoint)
+
+    def watch(self, target):
+        """
+        Stop after every store that changes a memory address.
+
+        Args:
+            target: A memory address or, given a symbol table, a variable name
+
+        Raises:
+            ValueError: If the variable is unknown
+        """
+        if isinstance(target, str):
+            if target not in self.variables:
+                raise ValueError(f"Unknown variable: {target}")
+            target = self.variables[target]
+        self.watchpoints[target] = self.computer.memory.read(target)
+
+    def unwatch(self, target):
+        """Remove a watchpoint added with watch()."""
+        self.watchpoints.pop(self.variables.get(target, target))
+
+    def run(self, max_steps=None):
+        """
+        Run the loaded program from the beginning until it stops.
+
+        Returns:
+            A Stop
+        """
+        self.history.clear()
+        for address in self.watchpoints:
+            self.watchpoints[address] = self.computer.memory.read(address)
+        self.computer.start()
+        self.resume_pc = None
+        return self.cont(max_steps)
+
+    def cont(self, max_steps=None):
+        """
+        Continue running the program until it stops again.
+
+        A program stopped at a breakpoint continues with the instruction at
+        the breakpoint.
+
+        Args:
+            max_steps: Optional limit on the number of instructions to execute
+
+        Returns:
+            A Stop
+
+        Raises:
+            Any error raised by the program, after the history was written
+        """
+        computer = self.computer
+        cpu = computer.cpu
+        program = computer.program
+        history = self.history
+        by_pc = {}
+        for breakpoint in self.breakpoints:
+            for pc in breakpoint.pcs:
+                by_pc.setdefault(pc, []).append(breakpoint)
+        watchpoints = self.watchpoints
+        self.stop = None
+
+        def before(pc):
+            if pc in by_pc and pc != self.resume_pc:
+                for breakpoint in by_pc[pc]:
+                    if breakpoint.test is None or breakpoint.test(cpu):
+                        breakpoint.hits += 1
+                        self.stop = Stop("breakpoint", pc, breakpoint)
+                        cpu.running = False
+                        return
+            self.resume_pc = None
+            instruction, operand = program[pc]
+            history.append((pc, instruction, operand, cpu.register_a, cpu.register_b))
+
+        def write(pc, address, value):
+            if address in watchpoints and watchpoints[address] != value:
+                self.stop = Stop("watchpoint", cpu.pc, store=pc, address=address,
+                                 old=watchpoints[address], new=value)
+                watchpoints[address] = value
+                cpu.running = False
+
+        hooks = [("instruction", before)]
+        if watchpoints:
+            hooks.append(("write", write))
+        for event, callback in hooks:
+            computer.hooks.add(event, callback)
+        try:
+            steps = computer.resume(max_steps)
+        except Exception:
+            self.dump()
+            raise
+        finally:
+            for event, callback in hooks:
+                computer.hooks.remove(event, callback)
+
+        if self.stop is not None:
+            # The program only paused; continuing from a breakpoint runs the
+            # instruction at the breakpoint first
+            cpu.running = True
+            if self.stop.reason == "breakpoint":
+                self.resume_pc = cpu.pc
+            return self.stop
+        if max_steps is not None and steps == max_steps and not computer.is_finished():
+            return Stop("steps", cpu.pc)
+        self.dump()
+        return Stop("halt", cpu.pc)
+
+    def location(self, pc):
+        """Return an instruction's source location as text, if known."""
+        location = self.computer.location(pc)
+        return format_location(location) if location is not None else None
+
+    def format_history(self):
+        """Return the history of executed instructions as lines of text."""
+        lines = []
+        for pc, instruction, operand, a, b in self.history:
+            text = f"{pc:>6}: {instruction} {operand if operand is not None else ''}"
+            text = f"{text:<24} A={a} B={b}"
+            location = self.location(pc)
+            if location is not None:
+                text += f"  ({location})"
+            lines.append(text)
+        return lines
+
+    def dump(self):
+        """Write the history to the debugger's output."""
+        if self.output is None:
+            return
+        print(f"Last {len(self.history)} instructions:", file=self.output)
+        for line in self.format_history():
+            print(line, file=self.output)
@@ -0,0 +1,140 @@
+"""
+SimpleScript Superinstructions
+
+This module implements the load-time fusion pass that replaces common
+instruction sequences in a decoded program with single fused handlers.
+
+The patterns come from opcode n-gram counts over the compiled examples
+(run this module to print them). SimpleCompiler emits:
+- load A, STA                           for simple assignments
+- load A, load B, ADD|SUB|MUL|DIV, STA  for arithmetic assignments
+- load A, load B, CMP, JZ|JNZ           for if/while conditions
+
+A fused instruction is written at the position of the first instruction of
+its sequence and advances the program counter past the whole sequence. The
+remaining instructions are left in place, so jumps into the middle of a
+fused sequence still find the original instructions and no jump target has
+to be rewritten.
+"""
+
+from collections import Counter
+
+from src.bytecode import (
+    LDA, LDB, LDA_MEM, LDB_MEM, STA,
+    ADD, SUB, MUL, DIV, CMP, JZ, JNZ,
+    FUSED_MOVE, FUSED_ARITH, FUSED_BRANCH,
+)
+
+LOAD_A = {LDA: False, LDA_MEM: True}  # Map from load opcode to "reads memory"
+LOAD_B = {LDB: False, LDB_MEM: True}
+ARITHMETIC = frozenset((ADD, SUB, MUL, DIV))
+BRANCHES = {JZ: True, JNZ: False}  # Map from branch opcode to "jump if zero"
+
+
+def count_ngrams(programs, n):
+    """
+    Count instruction n-grams over compiled programs.
+
+    Args:
+        programs: An iterable of programs (lists of (instruction, operand) tuples)
+        n: The length of the sequences to count
+
+    Returns:
+        A Counter mapping tuples of instruction names to their number of occurrences
+    """
+    counts = Counter()
+    for program in programs:
+        names = [instruction for instruction, _ in program]
+        for i in range(len(names) - n + 1):
+            counts[tuple(names[i:i + n])] += 1
+    return counts
+
+
+def fuse(code, cpu):
+    """
+    Fuse common instruction sequences of a decoded program.
+
+    Only sequences whose memory operands are valid addresses of the CPU's
+    memory that are not mapped to an I/O device are fused, so a fused
+    handler can access memory directly and never fails halfway. Arithmetic
+    is not fused on fixed-width memory, where it has to wrap around.
+
+    Args:
+        code: The CodeObject to optimize (left unchanged)
+        cpu: The CPU the program is bound to
+
+    Returns:
+        A new CodeObject with fused instructions
+    """
+    fused = code.copy()
+    if not cpu.memory.flat:
+        # Fused handlers index the memory list, which sparse memory lacks
+        return fused
+    opcodes = code.opcodes
+    operands = code.operands
+    size = cpu.memory.size
+    bus = cpu.bus
+
+    def is_address(value):
+        return (isinstance(value, int) and 0 <= value < size
+                and (bus is None or bus.device_at(value) is None))
+
+    def is_load(loads, i):
+        return opcodes[i] in loads and (not loads[opcodes[i]] or is_address(operands[i]))
+
+    def is_store(i):
+        return opcodes[i] == STA and is_address(operands[i])
+
+    def replace(i, opcode, handler, operand):
+        fused.opcodes[i] = opcode
+        fused.handlers[i] = handler
+        fused.operands[i] = operand
+
+    n = len(opcodes)
+    i = 0
+    while i < n:
+        if i + 3 < n and is_load(LOAD_A, i) and is_load(LOAD_B, i + 1):
+            loads = (LOAD_A[opcodes[i]], operands[i], LOAD_B[opcodes[i + 1]], operands[i + 1])
+            if opcodes[i + 2] in ARITHMETIC and is_store(i + 3) and cpu.word_bits is None:
+                replace(i, FUSED_ARITH, cpu._fused_arith,
+                        loads + (opcodes[i + 2], operands[i + 3]))
+                i += 4
+                continue
+            if (opcodes[i + 2] == CMP and opcodes[i + 3] in BRANCHES
+                    and isinstance(operands[i + 3], int)):
+                replace(i, FUSED_BRANCH, cpu._fused_branch,
+                        loads + (BRANCHES[opcodes[i + 3]], operands[i + 3]))
+                i += 4
+                continue
+        if i + 1 < n and is_load(LOAD_A, i) and is_store(i + 1):
+            replace(i, FUSED_MOVE, cpu._fused_move,
+                    (LOAD_A[opcodes[i]], operands[i], operands[i + 1]))
+            i += 2
+            continue
+        i += 1
+
+    return fused
+
+
+def main():
+    """Print the most common instruction n-grams of the given SimpleScript files."""
+    import sys
+    from src.compiler import SimpleCompiler
+
+    programs = []
+    for path in sys.argv[1:]:
+        with open(path) as f:
+            source = f.read()
+        try:
+            programs.append(SimpleCompiler().compile(source))
+        except (SyntaxError, NameError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+
+    for n in (2, 3, 4):
+        print(f"\nMost common {n}-grams:")
+        for ngram, count in count_ngrams(programs, n).most_common(10):
+            print(f"{count:6}  {' '.join(ngram)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+SimpleScript Program Generator
+
+Generates synthetic SimpleScript programs of any size for stress testing and
+benchmarking the compiler and the virtual machine. The shape of a program is
+configurable: the number of variables, functions and statements, how deeply
+if and while blocks nest, and how many times each loop runs. Programs are
+generated from a seed, so the same options and seed always give the same
+source, and a slow or failing program can be reproduced from its header
+comment alone.
+
+Generated programs always terminate:
+- every while loop counts its own counter variable from 0 to trip_count,
+  and no other statement assigns a loop counter
+- functions only call functions defined before them, so there is no
+  recursion
+- division only divides by non-zero constants
+
+Variables are named v0, v1, ..., functions f0, f1, ..., loop counters i0,
+i1, ... by nesting depth (f3_i0, ... inside function f3) and parameters
+f3_p0, f3_p1, ..., so the compiled program uses more memory cells than
+there are variables.
+"""
+
+import argparse
+import random
+
+
+class ProgramGenerator:
+    """
+    Generates SimpleScript programs from a seed.
+
+    Args:
+        seed: Seed of the random number generator
+        variables: Number of global variables
+        functions: Number of functions
+        statements: Number of statements in the main program, counting the
+            if and while lines and the statements inside blocks (but not the
+            initialization of the variables)
+        function_statements: Number of statements in each function body,
+            counted in the same way and including its return
+        depth: Maximum nesting depth of if and while blocks (0 generates
+            straight-line code)
+        trip_count: Number of times every while loop runs
+        block_size: Maximum number of statements directly inside a block
+        block_probability: Probability that a statement starts a block, when
+            the depth and the remaining statements allow one
+        parameters: Maximum number of parameters of a function
+        operators: Arithmetic operators used in expressions; with "*", values
+            can grow very large in loops
+        constants: Constants in expressions are drawn from 0 to constants
+
+    Raises:
+        ValueError: If an option is out of range
+    """
+
+    def __init__(self, seed=0, variables=20, functions=0, statements=100,
+                 function_statements=8, depth=2, trip_count=5, block_size=4,
+                 block_probability=0.2, parameters=2, operators=("+", "-"), constants=10):
+        if variables < 1:
+            raise ValueError(f"A program needs at least one variable, got {variables}")
+        if min(functions, statements, depth, trip_count, parameters, constants) < 0:
+            raise ValueError("Counts must not be negative")
+        if function_statements < 1 or block_size < 1:
+            raise ValueError("Function bodies and blocks need at least one statement")
+        unknown = set(operators) - {"+", "-", "*", "/"}
+        if not operators or unknown:
+            raise ValueError(f"Invalid operators: {operators}")
+        self.seed = seed
+        self.variables = variables
+        self.functions = functions
+        self.statements = statements
+        self.function_statements = function_statements
+        self.depth = depth
+        self.trip_count = trip_count
+        self.block_size = block_size
+        self.block_probability = block_probability
+        self.parameters = parameters
+        self.operators = tuple(operators)
+        self.constants = constants
+        self.random = None
+        self.lines = None
+        self.arities = None
+        self.globals = None
+
+    def options(self):
+        """Return the options the generator was created with."""
+        return {
+            "seed": self.seed, "variables": self.variables, "functions": self.functions,
+            "statements": self.statements, "function_statements": self.function_statements,
+            "depth": self.depth, "trip_count": self.trip_count, "block_size": self.block_size,
+            "block_probability": self.block_probability, "parameters": self.parameters,
+            "operators": "".join(self.operators), "constants": self.constants,
+        }
+
+    def generate(self):
+        """
+        Generate a program.
+
+        Returns:
+            The source of the program; its first line is a comment with the
+            options that generate it
+        """
+        self.random = random.Random(self.seed)
+        options = " ".join(f"{name}={value}" for name, value in self.options().items())
+        self.lines = [f"# Generated by src/generator.py: {options}"]
+        self.arities = []
+        self.globals = [f"v{i}" for i in range(self.variables)]
+
+        for index in range(self.functions):
+            name = f"f{index}"
+            params = [f"{name}_p{i}" for i in range(self.random.randint(1, max(self.parameters, 1)))]
+            self.lines.append(f"def {name}({', '.join(params)})")
+            # The body leaves its last statement for the return
+            self.block(self.function_statements - 1, 1, 0, name, params)
+            self.lines.append(f"  return {self.expression(params + self.globals)}")
+            self.arities.append(len(params))
+
+        for i in range(self.variables):
+            self.lines.append(f"v{i} = {self.random.randint(0, self.constants)}")
+        self.block(self.statements, 0, 0, None, [])
+        return "\n".join(self.lines) + "\n"
+
+    def block(self, count, indent, depth, function, scope):
+        """
+        Append count statements at an indentation level.
+
+        Args:
+            count: Number of statements to append
+            indent: Indentation level
+            depth: Number of enclosing if and while blocks
+            function: Name of the enclosing function, or None
+            scope: Parameters and loop counters the statements can read,
+                besides the global variables
+        """
+        prefix = "  " * indent
+        names = scope + self.globals
+        rng = self.random
+        while count > 0:
+            # A while loop needs four statements (counter, while, body,
+            # increment), an if statement two
+            if depth < self.depth and count >= 2 and rng.random() < self.block_probability:
+                if count >= 4 and rng.random() < 0.5:
+                    size = rng.randint(1, min(self.block_size, count - 3))
+                    self.loop(size, indent, depth, function, scope)
+                    count -= size + 3
+                else:
+                    size = rng.randint(1, min(self.block_size, count - 1))
+                    self.condition(size, indent, depth, function, scope)
+                    count -= size + 1
+                continue
+            self.lines.append(prefix + self.statement(function, names))
+            count -= 1
+
+    def loop(self, size, indent, depth, function, scope):
+        """Append a while loop with size statements in its body."""
+        prefix = "  " * indent
+        counter = f"{function}_i{depth}" if function else f"i{depth}"
+        self.lines.append(f"{prefix}{counter} = 0")
+        self.lines.append(f"{prefix}while {counter} != {self.trip_count}")
+        # The counter is readable inside the loop but never assigned, as
+        # statements only assign the global variables
+        self.block(size, indent + 1, depth + 1, function, [counter] + scope)
+        self.lines.append(f"{prefix}  {counter} = {counter} + 1")
+
+    def condition(self, size, indent, depth, function, scope):
+        """Append an if statement with size statements, split between if and else."""
+        prefix = "  " * indent
+        names = scope + self.globals
+        left, right = self.operand(names), self.operand(names)
+        self.lines.append(f"{prefix}if {left} {self.random.choice(('==', '!='))} {right}")
+        then = self.random.randint(1, size)
+        self.block(then, indent + 1, depth + 1, function, scope)
+        if then < size:
+            self.lines.append(f"{prefix}else")
+            self.block(size - then, indent + 1, depth + 1, function, scope)
+
+    def statement(self, function, names):
+        """Return an assignment, print or call statement."""
+        rng = self.random
+        target = f"v{rng.randrange(self.variables)}"
+        # Functions can only call the functions defined before them
+        callable_count = int(function[1:]) if function else self.functions
+        kind = rng.random()
+        if callable_count and kind < 0.1:
+            index = rng.randrange(callable_count)
+            args = ", ".join(self.operand(names) for _ in range(self.arities[index]))
+            return f"{target} = f{index}({args})"
+        if kind < 0.25:
+            return f"print {self.operand(names)}"
+        return f"{target} = {self.expression(names)}"
+
+    def expression(self, names):
+        """Return an operand or a binary operation on two operands."""
+        rng = self.random
+        operator = rng.choice(self.operators)
+        if operator == "/":
+            return f"{self.operand(names)} / {rng.randint(1, max(self.constants, 1))}"
+        return f"{self.operand(names)} {operator} {self.operand(names)}"
+
+    def operand(self, names):
+        """Return a variable, parameter, loop counter or constant."""
+        rng = self.random
+        if rng.random() < 0.25:
+            return str(rng.randint(0, self.constants))
+        return rng.choice(names)
+
+
+def generate_program(seed=0, **options):
+    """
+    Generate a SimpleScript program.
+
+    Args:
+        seed: Seed of the random number generator
+        **options: Options of ProgramGenerator
+
+    Returns:
+        The source of the program
+    """
+    return ProgramGenerator(seed, **options).generate()
+
+
+def main():
+    """Write a generated program to standard output."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic SimpleScript program")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--variables", type=int, default=20)
+    parser.add_argument("--functions", type=int, default=0)
+    parser.add_argument("--statements", type=int, default=100)
+    parser.add_argument("--function-statements", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--trip-count", type=int, default=5)
+    parser.add_argument("--block-size", type=int, default=4)
+    parser.add_argument("--block-probability", type=float, default=0.2)
+    parser.add_argument("--parameters", type=int, default=2)
+    parser.add_argument("--operators", default="+-")
+    parser.add_argument("--constants", type=int, default=10)
+    args = parser.parse_args()
+    options = vars(args)
+    options["operators"] = tuple(options["operators"])
+    print(generate_program(**options), end="")
+
+
+if __name__ == "__main__":
+    main()
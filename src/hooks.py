@@ -0,0 +1,126 @@
+"""
+SimpleScript Execution Hooks
+
+A registry of callbacks that observe a running program, used by the
+debugger, the instruction tracer and the profiler.
+
+Callbacks are registered per event:
+- "instruction": callback(pc), before every instruction
+- "branch": callback(pc, target, taken), after every JMP, JZ and JNZ, with
+  the program counter it left the branch at
+- "write": callback(pc, address, value), after every STA and STB
+- "call": callback(pc, target), after every CALL
+- "return": callback(pc, target), after every RET, with the address it
+  returned to
+
+Computer.resume() only leaves its normal execution loop when at least one
+callback is registered, so programs run without hooks pay nothing for them.
+With hooks, the computer runs the unfused program one instruction at a
+time through run_hooked(), whatever its engine, so that every instruction
+is observed at its own program counter.
+
+An instruction callback can stop the program before the instruction runs
+by setting cpu.running to False, like a paused output device does.
+"""
+
+from src.bytecode import STA, STB, JMP, JZ, JNZ, CALL, RET
+
+EVENTS = ("instruction", "branch", "write", "call", "return")
+
+
+class Hooks:
+    """
+    A registry of execution callbacks by event.
+
+    A Hooks object is true if any callback is registered.
+    """
+
+    def __init__(self):
+        self.callbacks = {event: [] for event in EVENTS}
+
+    def __bool__(self):
+        return any(self.callbacks.values())
+
+    def add(self, event, callback):
+        """
+        Register a callback for an event.
+
+        Args:
+            event: One of EVENTS
+            callback: The function to call
+
+        Returns:
+            The callback, so that add() can be used as a decorator
+
+        Raises:
+            ValueError: If the event is unknown
+        """
+        if event not in self.callbacks:
+            raise ValueError(f"Unknown hook event: {event} (expected one of {', '.join(EVENTS)})")
+        self.callbacks[event].append(callback)
+        return callback
+
+    def remove(self, event, callback):
+        """Unregister a callback added with add()."""
+        self.callbacks[event].remove(callback)
+
+    def clear(self):
+        """Unregister all callbacks."""
+        for callbacks in self.callbacks.values():
+            callbacks.clear()
+
+
+def run_hooked(cpu, code, hooks, max_steps=None):
+    """
+    Run a decoded program one instruction at a time, calling hooks.
+
+    Args:
+        cpu: The CPU the program was decoded for
+        code: An unfused CodeObject
+        hooks: The Hooks to call
+        max_steps: Optional limit on the number of instructions to execute
+
+    Returns:
+        The number of instructions executed
+    """
+    handlers = code.handlers
+    operands = code.operands
+    opcodes = code.opcodes
+    end = len(handlers)
+
+    # The callback lists are copied, so hooks may add or remove hooks; the
+    # change takes effect the next time the program is resumed
+    before = tuple(hooks.callbacks["instruction"])
+    after = {}
+    for opcodes_, event in (((JMP, JZ, JNZ), "branch"), ((STA, STB), "write"),
+                            ((CALL,), "call"), ((RET,), "return")):
+        if hooks.callbacks[event]:
+            for opcode in opcodes_:
+                after[opcode] = tuple(hooks.callbacks[event])
+
+    steps = 0
+    while cpu.running and cpu.pc < end and (max_steps is None or steps < max_steps):
+        pc = cpu.pc
+        if before:
+            for callback in before:
+                callback(pc)
+            if not cpu.running:
+                break
+        handlers[pc](operands[pc])
+        steps += 1
+        opcode = opcodes[pc]
+        callbacks = after.get(opcode)
+        if callbacks is None:
+            continue
+        if opcode == STA or opcode == STB:
+            value = cpu.register_a if opcode == STA else cpu.register_b
+            for callback in callbacks:
+                callback(pc, operands[pc], value)
+        elif opcode == CALL or opcode == RET:
+            for callback in callbacks:
+                callback(pc, cpu.pc)
+        else:
+            taken = opcode == JMP or cpu.pc != pc + 1
+            for callback in callbacks:
+                callback(pc, cpu.pc, taken)
+    return steps
@@ -1,10 +1,46 @@
+from array import array
+
+# Number of words per page for snapshots
+PAGE_SIZE = 64
+
+# Map from word width in bits to the signed array typecode of that width
+WORD_TYPECODES = {8: "b", 16: "h", 32: "i", 64: "q"}
+
+
+class MemorySnapshot:
+    """
+    An immutable copy of memory, stored as one tuple per page.
+    
+    Snapshots taken from the same memory share the tuples of pages that did
+    not change between them.
+    """
+    
+    __slots__ = ("pages",)
+    
+    def __init__(self, pages):
+        self.pages = pages
+
+
 class Memory:
+    # Width of a memory word in bits, or None for unbounded Python integers
+    word_bits = None
+    
+    # Whether self.memory holds every word in one indexable sequence. Fused
+    # instructions and compiled code index it directly when it does.
+    flat = True
+    
     def __init__(self, size=256):
         self.size = size
         self.memory = [0] * size
         # Add a stack for function calls
         self.stack = []
         
+        # Copy-on-write snapshot state: the snapshot the contents were last
+        # taken from or restored to, and the pages written through write()
+        # since then
+        self.base = None
+        self.dirty_pages = set()
+        
     def read(self, address):
         """Read a value from memory at the given address."""
         if not 0 <= address < self.size:
@@ -16,6 +52,7 @@ class Memory:
         if not 0 <= address < self.size:
             raise IndexError(f"Memory address {address} out of bounds (0-{self.size-1})")
         self.memory[address] = value
+        self.dirty_pages.add(address // PAGE_SIZE)
         
     def push(self, value):
         """Push a value onto the stack."""
@@ -35,4 +72,220 @@ class Memory:
         
     def stack_size(self):
         """Return the current size of the stack."""
-        return len(self.stack)
\ No newline at end of file
+        return len(self.stack)
+        
+    def empty_copy(self):
+        """Return a new, zeroed memory of the same kind and size."""
+        return Memory(self.size)
+        
+    def page_count(self):
+        """Return the number of snapshot pages."""
+        return (self.size + PAGE_SIZE - 1) // PAGE_SIZE
+        
+    def save_page(self, page):
+        """Return an immutable copy of a page."""
+        return tuple(self.memory[page * PAGE_SIZE:(page + 1) * PAGE_SIZE])
+        
+    def load_page(self, page, data):
+        """Overwrite a page with data from a snapshot."""
+        self.memory[page * PAGE_SIZE:(page + 1) * PAGE_SIZE] = data
+        
+    def snapshot(self, pages_written=()):
+        """
+        Take a snapshot of memory.
+        
+        Only pages written since the last snapshot or restore are copied; all
+        other pages are shared with that snapshot. Writes that bypass write()
+        (such as program stores, which go to the memory list directly) must be
+        reported through pages_written.
+        
+        Args:
+            pages_written: Page numbers that may have been written directly
+            
+        Returns:
+            A MemorySnapshot
+        """
+        if self.base is None:
+            pages = [self.save_page(page) for page in range(self.page_count())]
+        else:
+            pages = list(self.base.pages)
+            for page in self.dirty_pages.union(pages_written):
+                pages[page] = self.save_page(page)
+        
+        self.base = MemorySnapshot(tuple(pages))
+        self.dirty_pages = set()
+        return self.base
+        
+    def restore(self, snapshot, pages_written=()):
+        """
+        Restore memory from a snapshot.
+        
+        Only pages that may differ from the snapshot are copied: pages written
+        since the last snapshot or restore, and pages that differ between that
+        snapshot and this one.
+        
+        Args:
+            snapshot: A MemorySnapshot taken from memory of the same size
+            pages_written: Page numbers that may have been written directly
+        """
+        if self.base is None:
+            changed = range(self.page_count())
+        else:
+            changed = self.dirty_pages.union(pages_written)
+            changed.update(page for page, (old, new) in enumerate(zip(self.base.pages, snapshot.pages))
+                           if old is not new)
+        
+        for page in changed:
+            self.load_page(page, snapshot.pages[page])
+        
+        self.base = snapshot
+        self.dirty_pages = set()
+
+
+class TypedMemory(Memory):
+    """
+    Memory of fixed-width signed words stored in a compact array.
+    
+    Each word takes word_bits / 8 bytes instead of a pointer to a Python int
+    object. Values written through write() wrap around to the word width,
+    and a CPU running on typed memory wraps the results of its arithmetic
+    the same way (see CPU._wrap_a), so every value that reaches memory fits.
+    
+    Args:
+        size: Number of words
+        word_bits: Word width in bits: 8, 16, 32 or 64
+    """
+    
+    def __init__(self, size=256, word_bits=64):
+        if word_bits not in WORD_TYPECODES:
+            raise ValueError(f"Unsupported word width: {word_bits} "
+                             f"(expected one of {', '.join(map(str, WORD_TYPECODES))})")
+        super().__init__(size)
+        self.word_bits = word_bits
+        self.typecode = WORD_TYPECODES[word_bits]
+        if array(self.typecode).itemsize * 8 != word_bits:  # pragma: no cover - platform dependent
+            raise ValueError(f"No {word_bits}-bit array type on this platform")
+        self.word_half = 1 << (word_bits - 1)
+        self.word_mask = (1 << word_bits) - 1
+        self.memory = array(self.typecode, bytes(size * word_bits // 8))
+        
+    def wrap(self, value):
+        """Wrap an integer around to the word width."""
+        return ((value + self.word_half) & self.word_mask) - self.word_half
+        
+    def write(self, address, value):
+        """Write a value, wrapped to the word width, to memory at the given address."""
+        if not 0 <= address < self.size:
+            raise IndexError(f"Memory address {address} out of bounds (0-{self.size-1})")
+        self.memory[address] = self.wrap(value)
+        self.dirty_pages.add(address // PAGE_SIZE)
+        
+    def empty_copy(self):
+        """Return a new, zeroed memory of the same kind, size and word width."""
+        return TypedMemory(self.size, self.word_bits)
+        
+    def load_page(self, page, data):
+        """Overwrite a page with data from a snapshot."""
+        self.memory[page * PAGE_SIZE:(page + 1) * PAGE_SIZE] = array(self.typecode, data)
+
+
+class PagedMemory(Memory):
+    """
+    A large, sparse address space made of lazily allocated pages.
+    
+    Pages of PAGE_SIZE words are created by the first write to them; reading
+    a page that was never written returns zeros. A program therefore only
+    costs memory for the pages it touches, however large the address space.
+    Snapshots hold only the allocated pages.
+    
+    Args:
+        size: Number of addressable words (defaults to 2^32)
+    """
+    
+    flat = False
+    
+    def __init__(self, size=1 << 32):
+        self.size = size
+        self.pages = {}  # Map from page number to list of words
+        self.memory = None
+        self.stack = []
+        self.base = None
+        self.dirty_pages = set()
+        
+    def read(self, address):
+        """Read a value from memory at the given address."""
+        if not 0 <= address < self.size:
+            raise IndexError(f"Memory address {address} out of bounds (0-{self.size-1})")
+        page = self.pages.get(address // PAGE_SIZE)
+        if page is None:
+            return 0
+        return page[address % PAGE_SIZE]
+        
+    def write(self, address, value):
+        """Write a value to memory at the given address, allocating its page if needed."""
+        if not 0 <= address < self.size:
+            raise IndexError(f"Memory address {address} out of bounds (0-{self.size-1})")
+        number = address // PAGE_SIZE
+        page = self.pages.get(number)
+        if page is None:
+            page = self.pages[number] = [0] * PAGE_SIZE
+        page[address % PAGE_SIZE] = value
+        self.dirty_pages.add(number)
+        
+    def empty_copy(self):
+        """Return a new, empty memory of the same size."""
+        return PagedMemory(self.size)
+        
+    def allocated_pages(self):
+        """Return the number of pages allocated so far."""
+        return len(self.pages)
+        
+    def save_page(self, page):
+        """Return an immutable copy of an allocated page."""
+        return tuple(self.pages[page])
+        
+    def load_page(self, page, data):
+        """Overwrite a page with data from a snapshot, or free it if data is None."""
+        if data is None:
+            self.pages.pop(page, None)
+        else:
+            self.pages[page] = list(data)
+        
+    def snapshot(self, pages_written=()):
+        """
+        Take a snapshot of the allocated pages.
+        
+        Works like Memory.snapshot(), except that the snapshot's pages are a
+        dictionary from page number to page contents.
+        """
+        if self.base is None:
+            pages = {page: self.save_page(page) for page in self.pages}
+        else:
+            pages = dict(self.base.pages)
+            for page in self.dirty_pages.union(pages_written):
+                if page in self.pages:
+                    pages[page] = self.save_page(page)
+        
+        self.base = MemorySnapshot(pages)
+        self.dirty_pages = set()
+        return self.base
+        
+    def restore(self, snapshot, pages_written=()):
+        """
+        Restore memory from a snapshot taken from a PagedMemory.
+        
+        Pages that were not allocated when the snapshot was taken are freed.
+        """
+        if self.base is None:
+            changed = set(self.pages).union(snapshot.pages)
+        else:
+            changed = self.dirty_pages.union(pages_written)
+            old_pages = self.base.pages
+            changed.update(page for page in set(old_pages).union(snapshot.pages)
+                           if old_pages.get(page) is not snapshot.pages.get(page))
+        
+        for page in changed:
+            self.load_page(page, snapshot.pages.get(page))
+        
+        self.base = snapshot
+        self.dirty_pages = set()
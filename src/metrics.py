@@ -0,0 +1,116 @@
+"""
+SimpleScript Execution Metrics
+
+Deterministic measures of how much work a program does, for catching
+changes to the compiler that make its code bigger or slower without
+changing its outputs. Unlike timings, they do not depend on the machine,
+the engine or how busy the host is:
+- instructions: the number of instructions executed, one per original
+  instruction (as counted by the hooked loop, see hooks.py)
+- stack_high_water: the largest number of values on the call stack
+- memory_touched: the number of distinct memory addresses read or written
+  by LDA_MEM, LDB_MEM, STA and STB, including memory-mapped devices
+
+Run this module on source files to print their metrics:
+
+    python3 -m src.metrics examples/fibonacci.txt examples/functions.ss
+"""
+
+import argparse
+import contextlib
+import io
+from collections import namedtuple
+
+# Metrics of a run; halted is False if the run stopped at max_steps
+Metrics = namedtuple("Metrics", ("instructions", "stack_high_water", "memory_touched", "halted"))
+
+# Instructions whose operand is the memory address they access
+MEMORY_INSTRUCTIONS = ("LDA_MEM", "LDB_MEM", "STA", "STB")
+
+
+def measure(computer, max_steps=None):
+    """
+    Run a computer's loaded program from the beginning and measure it.
+
+    Args:
+        computer: A Computer with a loaded program
+        max_steps: Optional limit on the number of instructions to execute
+
+    Returns:
+        The Metrics of the run
+
+    Raises:
+        Any error raised by the program, as Computer.resume()
+    """
+    addresses = {pc: operand for pc, (instruction, operand) in enumerate(computer.program)
+                 if instruction in MEMORY_INSTRUCTIONS}
+    stack = computer.memory.stack
+    touched = set()
+    steps = 0
+    high_water = len(stack)
+
+    # The stack only grows by CALL and PUSH, so its size before each
+    # instruction (and at the end) covers its largest size
+    def count(pc):
+        nonlocal steps, high_water
+        steps += 1
+        if len(stack) > high_water:
+            high_water = len(stack)
+        if pc in addresses:
+            touched.add(addresses[pc])
+
+    computer.start()
+    computer.hooks.add("instruction", count)
+    try:
+        computer.resume(max_steps)
+    finally:
+        computer.hooks.remove("instruction", count)
+    high_water = max(high_water, len(stack))
+    return Metrics(steps, high_water, len(touched), computer.is_finished())
+
+
+def measure_source(source, max_steps=None, filename="<source>"):
+    """
+    Compile a SimpleScript source and measure a run of it.
+
+    The program's output is discarded.
+
+    Args:
+        source: The SimpleScript source
+        max_steps: Optional limit on the number of instructions to execute
+        filename: Name of the source file, for compile errors
+
+    Returns:
+        The Metrics of the run
+    """
+    from src.compiler import SimpleCompiler
+    from src.computer import Computer
+
+    computer = Computer()
+    computer.load_program(SimpleCompiler().compile(source, filename))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return measure(computer, max_steps)
+
+
+def main():
+    """Print the metrics of the given SimpleScript files."""
+    parser = argparse.ArgumentParser(description="Print execution metrics of SimpleScript programs")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="stop programs after this many instructions")
+    args = parser.parse_args()
+    for path in args.files:
+        with open(path) as f:
+            source = f.read()
+        try:
+            metrics = measure_source(source, args.max_steps, path)
+        except (SyntaxError, NameError, ValueError) as e:
+            print(f"{path}: {type(e).__name__}: {e}")
+            continue
+        print(f"{path}: {metrics.instructions} instructions, stack high water "
+              f"{metrics.stack_high_water}, {metrics.memory_touched} memory cells"
+              f"{'' if metrics.halted else ' (did not halt)'}")
+
+
+if __name__ == "__main__":
+    main()
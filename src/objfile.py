@@ -0,0 +1,198 @@
+"""
+SimpleScript Object Files
+
+Reads and writes compiled programs in the binary .ssb format, so that a
+program can be run again without recompiling its source.
+
+An .ssb file consists of a fixed header followed by these sections, each
+starting at a multiple of 8 bytes:
+- opcode table: the instruction names, newline-separated, in the order of
+  the opcode numbers used in the file
+- opcodes: one byte per instruction, the index into the opcode table, with
+  the high bit set if the instruction has no operand
+- operands: one little-endian signed 64-bit integer per instruction
+- symbol table: JSON with the program's variables and functions
+- source map (optional): JSON with one (file, line, function) entry per
+  instruction
+
+Files are read through mmap, and the opcode and operand sections are
+decoded straight from memoryviews over the mapping, without copying them
+into intermediate buffers.
+"""
+
+import json
+import mmap
+import struct
+import sys
+
+from src.bytecode import OPCODE_NAMES
+from src.compiler import SourceLocation
+
+MAGIC = b"SSB\x00"
+VERSION = 1
+
+# Header: magic, version, flags, instruction count, opcode table length,
+# symbol table length, source map length
+HEADER = struct.Struct("<4sHHIIII")
+
+FLAG_SOURCE_MAP = 1
+NO_OPERAND = 0x80
+
+OPERAND_MIN = -(1 << 63)
+OPERAND_MAX = (1 << 63) - 1
+
+
+class ObjectFile:
+    """
+    A program loaded from an .ssb file.
+
+    Attributes:
+        program: The list of (instruction, operand) tuples
+        symbols: The symbol table (see SimpleCompiler.symbol_table())
+        source_map: The SourceLocation of each instruction, or None
+    """
+
+    def __init__(self, program, symbols, source_map=None):
+        self.program = program
+        self.symbols = symbols
+        self.source_map = source_map
+
+
+def _padding(length):
+    """Return the number of bytes that align length to 8."""
+    return -length % 8
+
+
+def write_ssb(path, program, symbols=None, source_map=None):
+    """
+    Write a compiled program to an .ssb file.
+
+    Args:
+        path: Path of the file to write
+        program: A list of (instruction, operand) tuples with resolved labels
+        symbols: Optional symbol table to store with the program
+        source_map: Optional list with the SourceLocation of each instruction
+
+    Raises:
+        ValueError: If an instruction is unknown, an operand is not an integer
+            or does not fit in 64 bits, or the source map has the wrong length
+    """
+    if source_map is not None and len(source_map) != len(program):
+        raise ValueError(f"Source map has {len(source_map)} entries for {len(program)} instructions")
+
+    numbers = {name: number for number, name in enumerate(OPCODE_NAMES)}
+    opcodes = bytearray()
+    operands = []
+    for i, (instruction, operand) in enumerate(program):
+        if instruction not in numbers:
+            raise ValueError(f"Unknown instruction: {instruction} at position {i}")
+        if operand is None:
+            opcodes.append(numbers[instruction] | NO_OPERAND)
+            operands.append(0)
+        elif isinstance(operand, int) and OPERAND_MIN <= operand <= OPERAND_MAX:
+            opcodes.append(numbers[instruction])
+            operands.append(operand)
+        else:
+            raise ValueError(f"Operand {operand!r} cannot be stored at position {i}")
+
+    table = "\n".join(OPCODE_NAMES).encode()
+    symbol_data = json.dumps(symbols or {"variables": {}, "functions": {}}).encode()
+    map_data = json.dumps(source_map).encode() if source_map is not None else b""
+    flags = FLAG_SOURCE_MAP if source_map is not None else 0
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, len(program), len(table),
+                            len(symbol_data), len(map_data)))
+        f.write(bytes(_padding(HEADER.size)))
+        for section in (table, bytes(opcodes)):
+            f.write(section)
+            f.write(bytes(_padding(len(section))))
+        f.write(struct.pack(f"<{len(operands)}q", *operands))
+        f.write(symbol_data)
+        f.write(bytes(_padding(len(symbol_data))))
+        f.write(map_data)
+
+
+def is_ssb(path):
+    """Check whether a file starts with the .ssb magic number."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def read_ssb(path):
+    """
+    Read a program from an .ssb file.
+
+    Args:
+        path: Path of the file to read
+
+    Returns:
+        An ObjectFile
+
+    Raises:
+        ValueError: If the file is not a valid .ssb file of a supported version
+    """
+    with open(path, "rb") as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"Not a SimpleScript object file: {path}") from None
+    with mapping:
+        view = memoryview(mapping)
+        try:
+            return _decode(view, path)
+        finally:
+            view.release()
+
+
+def _decode(view, path):
+    """Decode the contents of an .ssb file from a memoryview."""
+    if len(view) < HEADER.size:
+        raise ValueError(f"Not a SimpleScript object file: {path}")
+    magic, version, flags, count, table_length, symbols_length, map_length = \
+        HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"Not a SimpleScript object file: {path}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported object file version {version} in {path}")
+
+    offset = HEADER.size + _padding(HEADER.size)
+    names = bytes(view[offset:offset + table_length]).decode().split("\n")
+    offset += table_length + _padding(table_length)
+    opcodes_offset = offset
+    offset += count + _padding(count)
+    operands_offset = offset
+    offset += 8 * count
+    symbols_offset = offset
+    offset += symbols_length + _padding(symbols_length)
+    map_offset = offset
+    if map_offset + map_length > len(view):
+        raise ValueError(f"Truncated object file: {path}")
+
+    opcodes = view[opcodes_offset:opcodes_offset + count]
+    if sys.byteorder == "little":
+        operands = view[operands_offset:operands_offset + 8 * count].cast("q")
+    else:  # pragma: no cover - depends on the platform
+        operands = struct.unpack_from(f"<{count}q", view, operands_offset)
+
+    program = []
+    try:
+        for opcode, operand in zip(opcodes, operands):
+            name = names[opcode & ~NO_OPERAND]
+            program.append((name, None if opcode & NO_OPERAND else operand))
+    except IndexError:
+        raise ValueError(f"Invalid opcode in object file: {path}") from None
+    finally:
+        if isinstance(operands, memoryview):
+            operands.release()
+        opcodes.release()
+
+    symbols = json.loads(bytes(view[symbols_offset:symbols_offset + symbols_length]))
+    source_map = None
+    if flags & FLAG_SOURCE_MAP:
+        entries = json.loads(bytes(view[map_offset:map_offset + map_length]))
+        source_map = [SourceLocation(*entry) for entry in entries]
+    return ObjectFile(program, symbols, source_map)
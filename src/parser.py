@@ -0,0 +1,359 @@
+"""
+SimpleScript Parser
+
+Turns SimpleScript source code into an abstract syntax tree in two linear
+passes: the tokenizer scans every line once, and a recursive-descent parser
+reads the tokens once, building nested blocks from the INDENT and DEDENT
+tokens the tokenizer emits when the indentation changes.
+
+The grammar, with blocks indented by any consistent amount:
+
+    program    := (function | statement)*
+    function   := "def" NAME "(" [NAME ("," NAME)*] ")" [":"] NEWLINE block
+    block      := INDENT statement+ DEDENT
+    statement  := "if" condition [":"] NEWLINE block ["else" [":"] NEWLINE block]
+                | "while" condition [":"] NEWLINE block
+                | "print" expression NEWLINE
+                | "return" [expression] NEWLINE
+                | NAME "=" expression NEWLINE
+                | call NEWLINE
+    condition  := expression ("==" | "!=") expression
+    expression := term (("+" | "-") term)*
+    term       := factor (("*" | "/") factor)*
+    factor     := NUMBER | "-" NUMBER | NAME | call | "(" expression ")"
+    call       := NAME "(" [expression ("," expression)*] ")"
+
+Comments start with # and run to the end of the line. Functions can only be
+defined at the top level, but can be called before their definition.
+"""
+
+import re
+from collections import namedtuple
+
+# A token is a (kind, value, line) tuple. Keywords and operators are their
+# own kind; names and numbers have the kinds NAME and NUMBER.
+KEYWORDS = frozenset(("def", "if", "else", "while", "print", "return"))
+
+# Tokens are numbers, names, two-character operators and single characters,
+# which are operators or invalid; whitespace matches nothing and is skipped
+TOKEN_PATTERN = re.compile(r"[0-9]+|[A-Za-z_][A-Za-z0-9_]*|==|!=|<=|>=|\S")
+
+# Tokens that are their own kind
+OPERATORS = frozenset(("==", "!=", "<=", ">=", "+", "-", "*", "/", "=", "(", ")", "<", ">", ",", ":"))
+SPECIAL = {token: token for token in KEYWORDS | OPERATORS}
+DIGITS = frozenset("0123456789")
+NAME_START = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_")
+
+# Binary operators by precedence
+PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2}
+
+# Abstract syntax tree. Every node records the source line it starts on.
+Program = namedtuple("Program", ("functions", "body"))
+FunctionDef = namedtuple("FunctionDef", ("name", "params", "body", "line"))
+Assign = namedtuple("Assign", ("target", "value", "line"))
+Print = namedtuple("Print", ("value", "line"))
+Return = namedtuple("Return", ("value", "line"))
+ExprStatement = namedtuple("ExprStatement", ("value", "line"))
+If = namedtuple("If", ("test", "body", "orelse", "line"))
+While = namedtuple("While", ("test", "body", "line"))
+Compare = namedtuple("Compare", ("op", "left", "right", "line"))
+BinaryOp = namedtuple("BinaryOp", ("op", "left", "right", "line"))
+Call = namedtuple("Call", ("name", "args", "line"))
+Number = namedtuple("Number", ("value", "line"))
+Name = namedtuple("Name", ("name", "line"))
+
+
+def syntax_error(message, filename, line, text=None):
+    """Return a SyntaxError for a source line."""
+    return SyntaxError(message, (filename, line, None, text))
+
+
+def tokenize(source, filename="<source>"):
+    """
+    Split SimpleScript source code into tokens.
+
+    Every non-blank line ends with a NEWLINE token, and changes of
+    indentation between lines produce INDENT and DEDENT tokens. The first
+    line of code sets the base indentation, so a whole program may be
+    indented.
+
+    Args:
+        source: The source code
+        filename: Name of the source file, for error messages
+
+    Returns:
+        A list of (kind, value, line) tuples ending with an EOF token
+
+    Raises:
+        SyntaxError: If a line contains an invalid character or dedents to
+            an indentation that does not match an enclosing block
+    """
+    tokens = []
+    append = tokens.append
+    findall = TOKEN_PATTERN.findall
+    special = SPECIAL
+    indents = None
+    last = 1  # The last line of code
+    for number, text in enumerate(source.split("\n"), 1):
+        code = text.split("#", 1)[0].rstrip()
+        stripped = code.lstrip()
+        if not stripped:
+            continue
+
+        indent = len(code) - len(stripped)
+        if indents is None:
+            indents = [indent]
+        if indent > indents[-1]:
+            indents.append(indent)
+            append(("INDENT", None, number))
+        elif indent < indents[-1]:
+            while len(indents) > 1 and indent < indents[-1]:
+                indents.pop()
+                append(("DEDENT", None, number))
+            if indent != indents[-1]:
+                raise syntax_error("Indentation does not match any enclosing block",
+                                   filename, number, text)
+
+        for token in findall(stripped):
+            kind = special.get(token)
+            if kind is not None:
+                append((kind, token, number))
+            elif token[0] in DIGITS:
+                append(("NUMBER", int(token), number))
+            elif token[0] in NAME_START:
+                append(("NAME", token, number))
+            else:
+                raise syntax_error(f"Invalid character {token!r}", filename, number, text)
+        append(("NEWLINE", None, number))
+        last = number
+
+    for _ in range(len(indents or ()) - 1):
+        append(("DEDENT", None, last))
+    append(("EOF", None, last))
+    return tokens
+
+
+class Parser:
+    """
+    Recursive-descent parser for SimpleScript.
+
+    Args:
+        source: The source code
+        filename: Name of the source file, for error messages
+    """
+
+    def __init__(self, source, filename="<source>"):
+        self.filename = filename
+        self.lines = source.split("\n")
+        self.tokens = tokenize(source, filename)
+        self.position = 0
+
+    def error(self, message, line=None):
+        """Return a SyntaxError at a line (by default the current token's)."""
+        if line is None:
+            line = self.tokens[self.position][2]
+        text = self.lines[line - 1] if 0 < line <= len(self.lines) else None
+        return syntax_error(message, self.filename, line, text)
+
+    def peek(self):
+        """Return the kind of the current token."""
+        return self.tokens[self.position][0]
+
+    def advance(self):
+        """Return the current token and move to the next."""
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, kind):
+        """Consume a token of a kind and return it."""
+        token = self.tokens[self.position]
+        if token[0] != kind:
+            raise self.error(f"Expected {self.describe(kind)}, found {self.describe(token[0], token[1])}")
+        self.position += 1
+        return token
+
+    @staticmethod
+    def describe(kind, value=None):
+        """Describe a token for an error message."""
+        if kind == "NAME":
+            return f"name {value!r}" if value is not None else "a name"
+        if kind == "NUMBER":
+            return f"number {value}" if value is not None else "a number"
+        if kind in ("NEWLINE", "EOF"):
+            return "end of line" if kind == "NEWLINE" else "end of file"
+        if kind in ("INDENT", "DEDENT"):
+            return "indentation" if kind == "INDENT" else "end of block"
+        return repr(kind)
+
+    def parse(self):
+        """
+        Parse the whole source.
+
+        Returns:
+            A Program
+
+        Raises:
+            SyntaxError: If the source is not valid SimpleScript
+        """
+        functions = []
+        body = []
+        tokens = self.tokens
+        while True:
+            kind = tokens[self.position][0]
+            if kind == "EOF":
+                return Program(functions, body)
+            if kind == "def":
+                functions.append(self.function())
+            elif kind == "INDENT":
+                raise self.error("Unexpected indentation")
+            else:
+                body.append(self.statement())
+
+    def function(self):
+        """Parse a function definition."""
+        line = self.advance()[2]
+        name = self.expect("NAME")[1]
+        self.expect("(")
+        params = []
+        if self.peek() != ")":
+            params.append(self.expect("NAME")[1])
+            while self.peek() == ",":
+                self.advance()
+                params.append(self.expect("NAME")[1])
+        self.expect(")")
+        if len(set(params)) != len(params):
+            raise self.error(f"Duplicate parameter in function {name}", line)
+        return FunctionDef(name, params, self.block(), line)
+
+    def block(self):
+        """Parse the end of a block header and the indented block after it."""
+        if self.peek() == ":":
+            self.advance()
+        self.expect("NEWLINE")
+        if self.peek() != "INDENT":
+            raise self.error("Expected an indented block")
+        self.advance()
+        body = []
+        tokens = self.tokens
+        while True:
+            kind = tokens[self.position][0]
+            if kind == "DEDENT":
+                self.position += 1
+                return body
+            if kind == "def":
+                raise self.error("Functions can only be defined at the top level")
+            if kind == "INDENT":
+                raise self.error("Unexpected indentation")
+            body.append(self.statement())
+
+    def statement(self):
+        """Parse a statement."""
+        tokens = self.tokens
+        kind, value, line = tokens[self.position]
+        if kind == "NAME" and tokens[self.position + 1][0] == "=":
+            self.position += 2
+            statement = Assign(value, self.expression(), line)
+        elif kind == "if":
+            self.advance()
+            test = self.condition()
+            body = self.block()
+            orelse = []
+            if self.peek() == "else":
+                self.advance()
+                orelse = self.block()
+            return If(test, body, orelse, line)
+        elif kind == "while":
+            self.advance()
+            test = self.condition()
+            return While(test, self.block(), line)
+        elif kind == "print":
+            self.advance()
+            statement = Print(self.expression(), line)
+        elif kind == "return":
+            self.advance()
+            statement = Return(None if self.peek() == "NEWLINE" else self.expression(), line)
+        elif kind == "NAME" and tokens[self.position + 1][0] == "(":
+            statement = ExprStatement(self.expression(), line)
+            if not isinstance(statement.value, Call):
+                raise self.error("Expected a statement", line)
+        elif kind == "else":
+            raise self.error("'else' without a matching 'if'")
+        else:
+            raise self.error(f"Expected a statement, found {self.describe(kind, value)}")
+        if self.tokens[self.position][0] != "NEWLINE":
+            self.expect("NEWLINE")
+        self.position += 1
+        return statement
+
+    def condition(self):
+        """Parse a comparison."""
+        left = self.expression()
+        kind, _, line = self.advance()
+        if kind not in ("==", "!="):
+            if kind in ("<", ">", "<=", ">="):
+                raise self.error(f"Unsupported comparison {kind!r}: only == and != are supported", line)
+            raise self.error(f"Expected '==' or '!=', found {self.describe(kind)}", line)
+        return Compare(kind, left, self.expression(), line)
+
+    def expression(self, precedence=1):
+        """
+        Parse an expression by precedence climbing.
+
+        Args:
+            precedence: The lowest precedence of the operators to consume
+                (operators are left-associative)
+        """
+        node = self.factor()
+        tokens = self.tokens
+        while True:
+            op, _, line = tokens[self.position]
+            level = PRECEDENCE.get(op)
+            if level is None or level < precedence:
+                return node
+            self.position += 1
+            node = BinaryOp(op, node, self.expression(level + 1), line)
+
+    def factor(self):
+        """Parse a number, name, call or parenthesized expression."""
+        kind, value, line = self.tokens[self.position]
+        self.position += 1
+        if kind == "NAME":
+            if self.tokens[self.position][0] != "(":
+                return Name(value, line)
+            self.position += 1
+            args = []
+            if self.peek() != ")":
+                args.append(self.expression())
+                while self.peek() == ",":
+                    self.advance()
+                    args.append(self.expression())
+            self.expect(")")
+            return Call(value, args, line)
+        if kind == "NUMBER":
+            return Number(value, line)
+        if kind == "-" and self.peek() == "NUMBER":
+            return Number(-self.advance()[1], line)
+        if kind == "(":
+            node = self.expression()
+            self.expect(")")
+            return node
+        self.position -= 1
+        raise self.error(f"Expected an expression, found {self.describe(kind, value)}")
+
+
+def parse(source, filename="<source>"):
+    """
+    Parse SimpleScript source code into a Program.
+
+    Args:
+        source: The source code
+        filename: Name of the source file, for error messages
+
+    Returns:
+        A Program
+
+    Raises:
+        SyntaxError: If the source is not valid SimpleScript
+    """
+    return Parser(source, filename).parse()
@@ -0,0 +1,287 @@
+"""
+SimpleScript Profiler
+
+Counts the instructions a program executes and attributes them to program
+counters, opcodes, source lines and functions.
+
+The profiler is built on the computer's execution hooks (see hooks.py), so
+every instruction is counted at its own program counter, whatever engine
+the computer was created with. It keeps a shadow call stack that CALL
+pushes the called function onto and RET pops, and counts instructions per
+call stack.
+From these counts a Profile derives:
+- exclusive counts: instructions executed in a function's own body
+- inclusive counts: instructions executed while the function was anywhere
+  on the call stack, including its callees (recursive calls count once)
+- collapsed stacks ("<main>;f;file:line count" lines) for flamegraph tools
+
+Functions are named after the source map entry of their first instruction,
+or after their address for programs without a source map.
+
+A sampler thread additionally records the call stack and program counter
+at a fixed wall-clock interval, so the report can show where wall time went
+as well as where instructions went. Samples are only taken when the
+interpreter thread releases the GIL, so the effective interval is at least
+the interpreter's switch interval (see sys.getswitchinterval()).
+"""
+
+import threading
+import time
+from collections import Counter
+
+from src.compiler import format_location
+
+MAIN = "<main>"
+
+
+class Profile:
+    """
+    The result of a profiled run.
+
+    Attributes:
+        program: The profiled program
+        source_map: Its source map, or None
+        stacks: Dictionary from call stack (a tuple of function names) to a
+            list of instruction counts per program counter
+        samples: Counter of (call stack, pc) pairs seen by the sampler
+        sample_interval: Seconds between samples
+        wall_time: Seconds the run took
+    """
+
+    def __init__(self, program, source_map, stacks, samples, sample_interval, wall_time):
+        self.program = program
+        self.source_map = source_map
+        self.stacks = stacks
+        self.samples = samples
+        self.sample_interval = sample_interval
+        self.wall_time = wall_time
+
+    @property
+    def total(self):
+        """The number of instructions executed."""
+        return sum(sum(counts) for counts in self.stacks.values())
+
+    def pc_counts(self):
+        """Return the number of times each instruction was executed."""
+        totals = [0] * len(self.program)
+        for counts in self.stacks.values():
+            for pc, count in enumerate(counts):
+                totals[pc] += count
+        return totals
+
+    def opcode_counts(self):
+        """Return a Counter of instructions executed per instruction name."""
+        counter = Counter()
+        for (instruction, _), count in zip(self.program, self.pc_counts()):
+            if count:
+                counter[instruction] += count
+        return counter
+
+    def line_of(self, pc, function=True):
+        """
+        Return the source location of an instruction as text.
+
+        Args:
+            pc: Index of the instruction
+            function: Include the name of the enclosing function
+        """
+        if pc >= len(self.program):
+            return "<end>"
+        if self.source_map is None:
+            return f"pc {pc}"
+        location = self.source_map[pc]
+        if not function:
+            location = location._replace(function=None)
+        return format_location(location)
+
+    def line_counts(self):
+        """
+        Return a Counter of instructions executed per source line.
+
+        Without a source map, each program counter is its own line.
+        """
+        counter = Counter()
+        for pc, count in enumerate(self.pc_counts()):
+            if count:
+                counter[self.line_of(pc)] += count
+        return counter
+
+    def function_counts(self):
+        """
+        Return the inclusive and exclusive instruction counts per function.
+
+        Returns:
+            A tuple of two Counters (inclusive, exclusive) keyed by function name
+        """
+        inclusive = Counter()
+        exclusive = Counter()
+        for stack, counts in self.stacks.items():
+            count = sum(counts)
+            exclusive[stack[-1]] += count
+            for function in set(stack):
+                inclusive[function] += count
+        return inclusive, exclusive
+
+    def sample_counts(self):
+        """Return a Counter of wall-clock samples per source line."""
+        counter = Counter()
+        for (_, pc), count in self.samples.items():
+            counter[self.line_of(pc)] += count
+        return counter
+
+    def collapsed(self, samples=False):
+        """
+        Return the profile as collapsed stacks for flamegraph tools.
+
+        Each line holds the semicolon-separated call stack, ending in the
+        source line, and a count.
+
+        Args:
+            samples: Weigh stacks by wall-clock samples instead of
+                instruction counts
+
+        Returns:
+            A list of lines, sorted by stack
+        """
+        weights = Counter()
+        if samples:
+            for (stack, pc), count in self.samples.items():
+                weights[";".join(stack + (self.line_of(pc, False),))] += count
+        else:
+            for stack, counts in self.stacks.items():
+                for pc, count in enumerate(counts):
+                    if count:
+                        weights[";".join(stack + (self.line_of(pc, False),))] += count
+        return [f"{stack} {count}" for stack, count in sorted(weights.items())]
+
+    def write_collapsed(self, path, samples=False):
+        """Write the collapsed stacks (see collapsed()) to a file."""
+        with open(path, "w") as f:
+            for line in self.collapsed(samples):
+                f.write(line + "\n")
+
+    def report(self, limit=20):
+        """
+        Format the profile as a text report.
+
+        Args:
+            limit: Maximum number of rows per table
+
+        Returns:
+            The report as a string
+        """
+        total = self.total or 1
+        total_samples = sum(self.samples.values())
+        inclusive, exclusive = self.function_counts()
+        lines = [f"Profile: {self.total} instructions in {self.wall_time:.4f}s, "
+                 f"{total_samples} samples"]
+
+        lines.append("\nFunctions (by exclusive instructions):")
+        lines.append(f"{'exclusive':>10} {'%':>6} {'inclusive':>10} {'%':>6}  function")
+        for function, count in exclusive.most_common(limit):
+            lines.append(f"{count:>10} {100 * count / total:>6.1f} {inclusive[function]:>10} "
+                         f"{100 * inclusive[function] / total:>6.1f}  {function}")
+
+        samples = self.sample_counts()
+        lines.append("\nLines (by instructions):")
+        lines.append(f"{'count':>10} {'%':>6} {'samples':>8} {'time':>9}  line")
+        for line, count in self.line_counts().most_common(limit):
+            seconds = self.wall_time * samples[line] / total_samples if total_samples else 0
+            lines.append(f"{count:>10} {100 * count / total:>6.1f} {samples[line]:>8} "
+                         f"{seconds:>8.4f}s  {line}")
+
+        lines.append("\nOpcodes (by instructions):")
+        lines.append(f"{'count':>10} {'%':>6}  opcode")
+        for instruction, count in self.opcode_counts().most_common(limit):
+            lines.append(f"{count:>10} {100 * count / total:>6.1f}  {instruction}")
+        return "\n".join(lines)
+
+
+class Profiler:
+    """
+    Runs a computer's loaded program and records a Profile.
+
+    Args:
+        computer: A Computer with a loaded program
+        sample_interval: Seconds between wall-clock samples
+    """
+
+    def __init__(self, computer, sample_interval=0.001):
+        if sample_interval <= 0:
+            raise ValueError(f"Sample interval must be positive, got {sample_interval}")
+        self.computer = computer
+        self.sample_interval = sample_interval
+        # The current call stack, read by the sampler thread
+        self.stack = (MAIN,)
+
+    def function_name(self, address):
+        """Return the name of the function starting at an address."""
+        source_map = self.computer.source_map
+        if source_map is not None and address < len(source_map):
+            function = source_map[address].function
+            if function is not None:
+                return function
+        return f"<{address}>"
+
+    def run(self, max_steps=None):
+        """
+        Run the loaded program from the current program counter.
+
+        Args:
+            max_steps: Optional limit on the number of instructions to execute
+
+        Returns:
+            A Profile
+
+        Raises:
+            Any error raised by the program, as Computer.resume()
+        """
+        computer = self.computer
+        cpu = computer.cpu
+        end = len(computer.program)
+
+        stacks = {self.stack: [0] * end}
+        frames = [self.stack]
+        counts = stacks[self.stack]
+        samples = Counter()
+        done = threading.Event()
+
+        def count(pc):
+            counts[pc] += 1
+
+        def enter(stack):
+            nonlocal counts
+            self.stack = stack
+            counts = stacks.get(stack)
+            if counts is None:
+                counts = stacks[stack] = [0] * end
+
+        def call(pc, target):
+            frames.append(frames[-1] + (self.function_name(target),))
+            enter(frames[-1])
+
+        def ret(pc, target):
+            if len(frames) > 1:
+                frames.pop()
+                enter(frames[-1])
+
+        def sample():
+            while not done.wait(self.sample_interval):
+                samples[(self.stack, cpu.pc)] += 1
+
+        hooks = (("instruction", count), ("call", call), ("return", ret))
+        for event, callback in hooks:
+            computer.hooks.add(event, callback)
+        sampler = threading.Thread(target=sample, daemon=True)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            computer.resume(max_steps)
+        finally:
+            done.set()
+            sampler.join()
+            for event, callback in hooks:
+                computer.hooks.remove(event, callback)
+        wall_time = time.perf_counter() - start
+        return Profile(computer.program, computer.source_map, stacks, samples,
+                       self.sample_interval, wall_time)
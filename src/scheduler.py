@@ -0,0 +1,141 @@
+"""
+SimpleScript Scheduler
+
+Runs many Computers in one process by time slicing.
+
+Each job runs for at most one quantum of instructions before the scheduler
+moves on to the next ready job, so a program that never halts only delays
+the others by one quantum per turn. Jobs are taken in round-robin order, or
+by priority (highest first, round-robin among equal priorities), and can be
+suspended and resumed at any time.
+"""
+
+import heapq
+import itertools
+
+# Job states
+READY = "ready"
+SUSPENDED = "suspended"
+FINISHED = "finished"
+FAILED = "failed"
+
+
+class Job:
+    """
+    A Computer managed by a Scheduler.
+
+    Attributes:
+        computer: The Computer running the job's program
+        name: Name of the job
+        priority: Scheduling priority (higher runs first with the priority policy)
+        state: One of READY, SUSPENDED, FINISHED or FAILED
+        steps: Instructions executed so far
+        slices: Number of quanta the job has run for
+        error: The exception that failed the job, if any
+    """
+
+    def __init__(self, computer, name, priority):
+        self.computer = computer
+        self.name = name
+        self.priority = priority
+        self.state = READY
+        self.steps = 0
+        self.slices = 0
+        self.error = None
+        self.queued = False  # Whether the job has an entry in the ready queue
+
+    def __repr__(self):
+        return f"Job({self.name!r}, state={self.state}, steps={self.steps})"
+
+
+class Scheduler:
+    """
+    Time-sliced scheduler for many Computers.
+
+    Args:
+        quantum: Instructions a job runs before the next job gets a turn
+        policy: "round_robin" or "priority"
+    """
+
+    POLICIES = ("round_robin", "priority")
+
+    def __init__(self, quantum=1000, policy="round_robin"):
+        if quantum < 1:
+            raise ValueError(f"Quantum must be at least 1, got {quantum}")
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy: {policy} (expected one of {', '.join(self.POLICIES)})")
+        self.quantum = quantum
+        self.policy = policy
+        self.jobs = []
+        self.ready = []  # Heap of (sort key, sequence number, job)
+        self.sequence = itertools.count()
+
+    def add(self, computer, name=None, priority=0):
+        """
+        Add a computer with a loaded program and start it from the beginning.
+
+        Returns:
+            The new Job
+        """
+        computer.start()
+        job = Job(computer, name if name is not None else f"job-{len(self.jobs)}", priority)
+        self.jobs.append(job)
+        self.enqueue(job)
+        return job
+
+    def enqueue(self, job):
+        """Put a ready job at the back of its priority level."""
+        key = -job.priority if self.policy == "priority" else 0
+        heapq.heappush(self.ready, (key, next(self.sequence), job))
+        job.queued = True
+
+    def suspend(self, job):
+        """Stop scheduling a job until it is resumed."""
+        if job.state == READY:
+            job.state = SUSPENDED
+
+    def resume(self, job):
+        """Make a suspended job ready again."""
+        if job.state == SUSPENDED:
+            job.state = READY
+            if not job.queued:
+                self.enqueue(job)
+
+    def step(self):
+        """
+        Run the next ready job for one quantum.
+
+        Returns:
+            The job that ran, or None if no job is ready
+        """
+        while self.ready:
+            _, _, job = heapq.heappop(self.ready)
+            job.queued = False
+            # Suspended jobs are dropped from the queue here and re-queued on resume
+            if job.state != READY:
+                continue
+
+            computer = job.computer
+            try:
+                job.steps += computer.resume(max_steps=self.quantum)
+            except Exception as e:
+                job.state = FAILED
+                job.error = e
+                return job
+            job.slices += 1
+
+            if computer.is_finished():
+                job.state = FINISHED
+            else:
+                self.enqueue(job)
+            return job
+        return None
+
+    def run(self):
+        """Run jobs until none is ready (all finished, failed or suspended)."""
+        while self.step() is not None:
+            pass
+
+    def active_jobs(self):
+        """Return the jobs that are ready or suspended."""
+        return [job for job in self.jobs if job.state in (READY, SUSPENDED)]
@@ -0,0 +1,177 @@
+"""
+SimpleScript Time-Travel Debugging
+
+Records a run of a program so that it can later be moved to any step,
+forwards or backwards, without restarting it.
+
+While recording, the computer takes a checkpoint (see Computer.snapshot())
+every interval instructions and logs every memory write in between. Going
+to step N restores the last checkpoint at or before N and re-executes the
+instructions from there, so any step is reached by re-executing fewer than
+interval instructions. Snapshots share unchanged memory pages and earlier
+outputs, so a checkpoint only costs the pages and outputs written since
+the previous one.
+
+The write log answers "when was this address last written" without
+re-executing anything. It is kept in typed arrays, four integers per write.
+
+Steps count instructions as the hooked loop executes them (see hooks.py),
+one per original instruction, so step numbers do not depend on the engine
+or on instruction fusion.
+"""
+
+from array import array
+from bisect import bisect_right
+
+from src.hooks import run_hooked
+
+
+class Recording:
+    """
+    A recorded run of a computer's loaded program.
+
+    Args:
+        computer: A Computer with a loaded program
+        interval: Instructions between checkpoints
+
+    Attributes:
+        checkpoints: Snapshots taken at steps 0, interval, 2 * interval, ...
+        steps: The number of instructions recorded
+        position: The step the computer is currently at
+    """
+
+    def __init__(self, computer, interval=1000):
+        if interval < 1:
+            raise ValueError(f"Checkpoint interval must be at least 1, got {interval}")
+        self.computer = computer
+        self.interval = interval
+        self.checkpoints = []
+        self.steps = 0
+        self.position = 0
+        # The write log: the step, pc, address and value of every store
+        self.write_steps = array("q")
+        self.write_pcs = array("q")
+        self.write_addresses = array("q")
+        self.write_values = array("q")
+
+    def record(self, max_steps=None):
+        """
+        Run the loaded program from the beginning, recording it.
+
+        Args:
+            max_steps: Optional limit on the number of instructions to record
+
+        Returns:
+            The number of instructions recorded
+
+        Raises:
+            Any error raised by the program, as Computer.resume(); the steps
+            before the failing instruction stay recorded
+        """
+        computer = self.computer
+
+        # The instruction hook counts each instruction before it runs, so
+        # the store being logged is the instruction at step steps - 1
+        def write(pc, address, value):
+            self.write_steps.append(self.steps - 1)
+            self.write_pcs.append(pc)
+            self.write_addresses.append(address)
+            # Values that do not fit a machine word are logged as 0
+            self.write_values.append(value if -(1 << 63) <= value < (1 << 63) else 0)
+
+        def count(pc):
+            self.steps += 1
+
+        computer.start()
+        self.checkpoints = []
+        self.steps = 0
+        del self.write_steps[:], self.write_pcs[:], self.write_addresses[:], self.write_values[:]
+        computer.hooks.add("write", write)
+        computer.hooks.add("instruction", count)
+        try:
+            while not computer.is_finished() and (max_steps is None or self.steps < max_steps):
+                if self.steps % self.interval == 0:
+                    self.checkpoints.append(computer.snapshot())
+                limit = self.interval - self.steps % self.interval
+                if max_steps is not None:
+                    limit = min(limit, max_steps - self.steps)
+                start = self.steps
+                computer.resume(limit)
+                if self.steps == start:
+                    break
+        except Exception:
+            # The instruction that raised was counted but did not complete
+            self.steps -= 1
+            raise
+        finally:
+            computer.hooks.remove("write", write)
+            computer.hooks.remove("instruction", count)
+            self.position = self.steps
+        return self.steps
+
+    def goto(self, step):
+        """
+        Move the computer to the state before the instruction at a step.
+
+        Step 0 is the start of the program and step `steps` the end of the
+        recording. At most interval - 1 instructions are re-executed.
+
+        Args:
+            step: The step to go to
+
+        Raises:
+            ValueError: If the step lies outside the recording
+        """
+        if not 0 <= step <= self.steps:
+            raise ValueError(f"Step {step} is outside the recording (0-{self.steps})")
+        computer = self.computer
+        # A recording that ends on a multiple of the interval has no
+        # checkpoint at its last step
+        index = min(step // self.interval, len(self.checkpoints) - 1)
+        if step < self.position or index > self.position // self.interval:
+            # Restore the last checkpoint at or before the step, unless the
+            # current position is between it and the step already
+            computer.restore(self.checkpoints[index])
+            self.position = index * self.interval
+        remaining = step - self.position
+        if remaining:
+            self.position += run_hooked(computer.cpu, computer.plain_code, computer.hooks, remaining)
+
+    def step_back(self, count=1):
+        """Go back count instructions (see goto())."""
+        self.goto(max(self.position - count, 0))
+
+    def step(self, count=1):
+        """Go forward count instructions within the recording (see goto())."""
+        self.goto(min(self.position + count, self.steps))
+
+    def writes(self, address):
+        """
+        Return the logged writes to an address.
+
+        Returns:
+            A list of (step, pc, value) tuples in the order of the writes, where
+            step is the step of the store instruction
+        """
+        return [(self.write_steps[i], self.write_pcs[i], self.write_values[i])
+                for i, logged in enumerate(self.write_addresses) if logged == address]
+
+    def last_write(self, address, step=None):
+        """
+        Return the last write to an address before a step.
+
+        Args:
+            address: The memory address
+            step: The step (defaults to the current position)
+
+        Returns:
+            A (step, pc, value) tuple, or None if the address was not written
+        """
+        if step is None:
+            step = self.position
+        # Writes are logged in step order, so only those before the step count
+        end = bisect_right(self.write_steps, step - 1)
+        for i in range(end - 1, -1, -1):
+            if self.write_addresses[i] == address:
+                return (self.write_steps[i], self.write_pcs[i], self.write_values[i])
+        return None
@@ -0,0 +1,258 @@
+"""
+SimpleScript Tracing Engine
+
+An execution engine that interprets a program and compiles its hot loops.
+
+The interpreter counts how often each backward jump lands on its target
+(a loop head). When a loop head crosses the hotness threshold, one iteration
+of the loop is recorded instruction by instruction, and the recorded path is
+compiled into a Python function that runs the loop body repeatedly. Every
+conditional branch on the path becomes a guard: when a branch goes the other
+way than it did while recording, the trace writes the registers back and
+returns the program counter where the interpreter has to continue. If an
+instruction in a trace raises, the trace writes back the registers and the
+pc of that instruction before the error propagates, as blocks do.
+
+Traces that would contain CALL, RET, HALT or a load from an input device, or
+that grow longer than MAX_TRACE_LENGTH instructions, are abandoned and the
+loop stays interpreted. Its backward jumps are then no longer counted, so
+the engine runs the loop in a plain dispatch loop like the interpreter's.
+"""
+
+import sys
+
+from src.bytecode import (
+    JMP, JZ, JNZ, HALT, CALL, RET, STA, STB,
+)
+from src.blocks import CodeGenerator, REGISTERS, live_registers
+
+# Backward jumps to a loop head before the loop is traced
+HOT_THRESHOLD = 50
+
+# Longest loop body that is traced
+MAX_TRACE_LENGTH = 1000
+
+# Instructions that end a recording without producing a trace
+UNTRACEABLE = frozenset((HALT, CALL, RET))
+
+
+class TracingEngine:
+    """
+    Runs a program on a CPU, compiling hot loops into traces.
+
+    Attributes:
+        threshold: Backward jumps to a loop head before it is traced
+        traces_compiled: Number of traces compiled
+        traces_entered: Number of times a trace was entered
+        trace_bailouts: Number of times a guard failed and a trace was left
+        traces_aborted: Number of recordings abandoned
+    """
+
+    def __init__(self, cpu, code, threshold=HOT_THRESHOLD):
+        self.cpu = cpu
+        self.code = code
+        self.threshold = threshold
+        bus = cpu.bus
+        io_addresses = frozenset(bus.devices) if bus is not None else frozenset()
+        read_addresses = bus.read_addresses() if bus is not None else frozenset()
+        self.generator = CodeGenerator(cpu.memory.size, io_addresses, read_addresses,
+                                       cpu.word_bits, cpu.memory.flat)
+
+        n = len(code)
+        self.counts = [0] * n  # Backward jumps landing on each pc
+        self.traces = [None] * n  # Compiled trace by loop head pc
+        self.backward = [
+            opcode in (JMP, JZ, JNZ) and isinstance(operand, int) and operand <= pc
+            for pc, (opcode, operand) in enumerate(zip(code.opcodes, code.operands))
+        ]
+        # Program counters the run loop has to look at: trace heads, counted
+        # backward jumps and the end of the program
+        self.watched = self.backward + [True]
+
+        self.traces_compiled = 0
+        self.traces_entered = 0
+        self.trace_bailouts = 0
+        self.traces_aborted = 0
+
+    def stats(self):
+        """Return the trace counters as a dictionary."""
+        return {
+            "traces_compiled": self.traces_compiled,
+            "traces_entered": self.traces_entered,
+            "trace_bailouts": self.trace_bailouts,
+            "traces_aborted": self.traces_aborted,
+        }
+
+    def run(self, max_steps=None):
+        """
+        Run from the CPU's current program counter.
+
+        Args:
+            max_steps: Optional limit on the number of instructions to execute
+
+        Returns:
+            The number of instructions executed if max_steps was given, else None
+        """
+        cpu = self.cpu
+        memory = cpu.memory
+        mem = memory.memory
+        stack = memory.stack
+        bus = cpu.bus
+        handlers = self.code.handlers
+        operands = self.code.operands
+        traces = self.traces
+        counts = self.counts
+        backward = self.backward
+        threshold = self.threshold
+        end = len(handlers)
+        budget = sys.maxsize if max_steps is None else max_steps
+
+        watched = self.watched
+        steps = 0
+        pc = cpu.pc
+        while steps < budget and cpu.running and pc < end:
+            if not watched[pc]:
+                # Plain dispatch up to the next watched pc
+                if max_steps is None:
+                    while cpu.running and not watched[pc]:
+                        handlers[pc](operands[pc])
+                        pc = cpu.pc
+                else:
+                    while steps < budget and cpu.running and not watched[pc]:
+                        handlers[pc](operands[pc])
+                        steps += 1
+                        pc = cpu.pc
+                continue
+
+            trace = traces[pc]
+            if trace is not None:
+                function, length = trace
+                iterations = (budget - steps) // length
+                if iterations:
+                    self.traces_entered += 1
+                    pc, executed, bailed = function(cpu, mem, memory, stack, bus, iterations)
+                    cpu.pc = pc
+                    steps += executed
+                    self.trace_bailouts += bailed
+                    continue
+
+            handlers[pc](operands[pc])
+            steps += 1
+            target = cpu.pc
+            if backward[pc] and target <= pc:
+                counts[target] += 1
+                if counts[target] == threshold:
+                    steps += self.record(target, budget - steps)
+            pc = cpu.pc
+
+        return None if max_steps is None else steps
+
+    def record(self, head, budget):
+        """
+        Record one iteration of the loop at head and compile it.
+
+        The recorded instructions are executed as they are recorded.
+
+        Returns:
+            The number of instructions executed while recording
+        """
+        cpu = self.cpu
+        code = self.code
+        path = []  # (pc, branch taken) for each recorded instruction
+
+        while len(path) < min(budget, MAX_TRACE_LENGTH) and cpu.running:
+            pc = cpu.pc
+            if (code.opcodes[pc] in UNTRACEABLE
+                    or self.generator.is_device_load(code.opcodes[pc], code.operands[pc])):
+                break
+            code.handlers[pc](code.operands[pc])
+            path.append((pc, cpu.pc != pc + 1))
+            if cpu.pc == head:
+                self.traces[head] = (self.compile_trace(head, path), len(path))
+                self.traces_compiled += 1
+                self.watched[head] = True
+                self.stop_counting(head)
+                return len(path)
+            if not 0 <= cpu.pc < len(code):
+                break
+
+        self.traces_aborted += 1
+        if len(path) < budget:
+            self.stop_counting(head)
+        else:
+            # Out of budget: record the loop again when it gets hot again
+            self.counts[head] = 0
+        return len(path)
+
+    def stop_counting(self, head):
+        """Stop counting the backward jumps to a loop head."""
+        for pc, operand in enumerate(self.code.operands):
+            if self.backward[pc] and operand == head:
+                self.backward[pc] = False
+                self.watched[pc] = self.traces[pc] is not None
+
+    def compile_trace(self, head, path):
+        """Generate and compile the Python function for a recorded loop."""
+        opcodes = self.code.opcodes
+        operands = self.code.operands
+        generator = self.generator
+        length = len(path)
+
+        loaded, stored = live_registers([opcodes[pc] for pc, _ in path], generator.writes)
+        # Registers written by the loop are loaded too, so that a guard failing
+        # before they are first assigned still writes back defined values
+        loaded += "".join(register for register in stored if register not in loaded)
+        writeback = [f"        cpu.{REGISTERS[register]} = {register}" for register in stored]
+
+        def exit_to(pc, executed, bailed):
+            return writeback + [f"        return {pc}, n * {length} + {executed}, {bailed}"]
+
+        lines = [f"def trace_{head}(cpu, mem, memory, stack, bus, iterations):"]
+        for register in loaded:
+            lines.append(f"    {register} = cpu.{REGISTERS[register]}")
+        body = lines
+        lines = ["    for n in range(iterations):"]
+
+        # The local p holds the pc of the last instruction that can raise,
+        # for the error handler below
+        faulting = False
+        for index, (pc, taken) in enumerate(path):
+            opcode = opcodes[pc]
+            operand = operands[pc]
+            if opcode in (JZ, JNZ):
+                # Leave the trace when the branch goes the other way
+                jumps_if = "z" if opcode == JZ else "not z"
+                if taken:
+                    lines.append(f"        if not ({jumps_if}):")
+                    lines.extend("    " + line for line in exit_to(pc + 1, index + 1, True))
+                else:
+                    lines.append(f"        if {jumps_if}:")
+                    lines.extend("    " + line for line in exit_to(operand, index + 1, True))
+            elif opcode != JMP:
+                if generator.can_raise(opcode, operand):
+                    lines.append(f"        p = {pc}")
+                    faulting = True
+                lines.extend(generator.emit(opcode, operand, "        "))
+                if opcode in (STA, STB) and generator.is_device_store(opcode, operand):
+                    # A device may stop the CPU
+                    lines.append("        if not cpu.running:")
+                    lines.extend("    " + line for line in exit_to(pc + 1, index + 1, False))
+
+        if faulting:
+            # Every register the trace writes is loaded on entry, so all of
+            # them are bound when an instruction raises
+            body.append("    try:")
+            body.extend("    " + line for line in lines)
+            body.append("    except BaseException:")
+            body.extend(writeback)
+            body.append("        cpu.pc = p")
+            body.append("        raise")
+        else:
+            body.extend(lines)
+        lines = body
+        lines.extend(line[4:] for line in writeback)
+        lines.append(f"    return {head}, iterations * {length}, False")
+
+        namespace = {}
+        exec(compile("\n".join(lines) + "\n", f"<trace {head}>", "exec"), namespace)
+        return namespace[f"trace_{head}"]
@@ -0,0 +1,262 @@
+"""
+SimpleScript Vector Engine
+
+Runs one program over many inputs in lockstep using NumPy.
+
+A VectorComputer holds N independent machines ("lanes"). Registers, flags,
+the program counter, every memory cell and the call stack are NumPy int64
+(or bool) arrays with one element per lane, and each instruction is executed
+for all lanes with a single array operation.
+
+While every lane is at the same program counter the machine runs in uniform
+mode, tracking a single program counter. When a conditional branch or RET
+sends lanes to different places, the lanes are split into groups by program
+counter: each step executes the instruction at the smallest program counter
+for the lanes that are there, masking out the others, until the lanes meet
+again.
+
+Values are 64-bit integers, so arithmetic wraps around instead of growing
+like Python integers. NumPy is an optional dependency that is only needed
+for this module.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from src.bytecode import (
+    OPCODES, LDA, LDB, LDA_MEM, LDB_MEM, STA, STB,
+    ADD, SUB, MUL, DIV, CMP, JMP, JZ, JNZ, HALT,
+    CALL, RET, PUSH, POP_PARAM, POP_RET,
+)
+from src.verifier import verify
+
+# Maximum call stack depth of each lane
+STACK_DEPTH = 1024
+
+
+class VectorComputer:
+    """
+    A SimpleScript machine that runs one program over a vector of inputs.
+
+    Attributes:
+        lanes: Number of lanes
+        memory: Memory cells, shape (memory_size, lanes)
+        register_a, register_b: Registers, one element per lane
+        zero_flag, carry_flag: Flags, one element per lane
+        pc: Program counters, one element per lane
+        running: Whether each lane is still running
+    """
+
+    def __init__(self, lanes, memory_size=256):
+        if np is None:
+            raise ImportError("VectorComputer requires NumPy (pip install numpy)")
+        if lanes < 1:
+            raise ValueError(f"Number of lanes must be at least 1, got {lanes}")
+
+        self.lanes = lanes
+        self.memory_size = memory_size
+        self.memory = np.zeros((memory_size, lanes), dtype=np.int64)
+        self.stack = np.zeros((STACK_DEPTH, lanes), dtype=np.int64)
+        self.stack_pointer = np.zeros(lanes, dtype=np.int64)
+
+        self.register_a = np.zeros(lanes, dtype=np.int64)
+        self.register_b = np.zeros(lanes, dtype=np.int64)
+        self.zero_flag = np.zeros(lanes, dtype=bool)
+        self.carry_flag = np.zeros(lanes, dtype=bool)
+        self.pc = np.zeros(lanes, dtype=np.int64)
+        self.running = np.ones(lanes, dtype=bool)
+
+        # Same memory-mapped I/O addresses as Computer
+        self.IO_INPUT_BUFFER = 0xF0
+        self.IO_OUTPUT_BUFFER = 0xF1
+        self.IO_OUTPUT_COUNT = 0xF2
+
+        # Output events as (lane selection, values), assembled per lane on demand
+        self.output_events = []
+        self.all_lanes = np.arange(lanes)
+        self.program = []
+
+    def load_program(self, program):
+        """
+        Load a program.
+
+        Raises:
+            VerificationError: If the program fails verification (see verifier.py)
+        """
+        verify(program, self.memory_size)
+        self.program = program
+        self.code = [(OPCODES[instruction], operand) for instruction, operand in program]
+
+    def set_input(self, values):
+        """Set the input buffer of every lane (a scalar or one value per lane)."""
+        self.memory[self.IO_INPUT_BUFFER] = values
+
+    def get_all_outputs(self):
+        """Return the list of outputs of every lane."""
+        outputs = [[] for _ in range(self.lanes)]
+        for selection, values in self.output_events:
+            for lane, value in zip(self.all_lanes[selection].tolist(), values.tolist()):
+                outputs[lane].append(value)
+        return outputs
+
+    def run(self, max_steps=None):
+        """
+        Run the loaded program from the beginning on every lane.
+
+        Args:
+            max_steps: Optional limit on the number of vector steps
+
+        Returns:
+            The number of vector steps executed (one instruction for one group of lanes)
+        """
+        code = self.code
+        end = len(code)
+        self.pc[:] = 0
+        self.running[:] = True
+
+        steps = 0
+        pc = None  # Common program counter in uniform mode, else None
+        while max_steps is None or steps < max_steps:
+            if pc is not None:
+                if pc >= end:
+                    self.pc[:] = pc
+                    break
+                selection = slice(None)
+            else:
+                active = self.running & (self.pc < end)
+                if not active.any():
+                    break
+                pc = int(self.pc[active].min())
+                selection = active & (self.pc == pc)
+                if selection.all():
+                    selection = slice(None)
+                else:
+                    # Run this group only, then pick the next group
+                    target = self.execute(pc, selection)
+                    if target is not None:
+                        self.pc[selection] = target
+                    pc = None
+                    steps += 1
+                    continue
+
+            target = self.execute(pc, selection)
+            if target is None:
+                # Lanes went to different places; self.pc holds each lane's pc
+                pc = None
+            else:
+                pc = target
+            steps += 1
+        else:
+            if pc is not None:
+                self.pc[:] = pc
+
+        return steps
+
+    def execute(self, pc, selection):
+        """
+        Execute the instruction at pc for the selected lanes.
+
+        Returns:
+            The next program counter if it is the same for every selected lane,
+            otherwise None after storing each lane's next pc in self.pc
+        """
+        opcode, operand = self.code[pc]
+        a = self.register_a
+        b = self.register_b
+
+        if opcode == LDA:
+            a[selection] = operand
+        elif opcode == LDB:
+            b[selection] = operand
+        elif opcode == LDA_MEM:
+            a[selection] = self.memory[operand, selection]
+        elif opcode == LDB_MEM:
+            b[selection] = self.memory[operand, selection]
+        elif opcode in (STA, STB):
+            values = (a if opcode == STA else b)[selection]
+            if operand == self.IO_OUTPUT_BUFFER:
+                self.output_events.append((selection, values.copy()))
+                self.memory[self.IO_OUTPUT_COUNT, selection] += 1
+            else:
+                self.memory[operand, selection] = values
+        elif opcode == ADD:
+            a[selection] += b[selection]
+        elif opcode == SUB:
+            a[selection] -= b[selection]
+        elif opcode == MUL:
+            a[selection] *= b[selection]
+        elif opcode == DIV:
+            divisor = b[selection]
+            by_zero = divisor == 0
+            if by_zero.any():
+                print("Warning: Division by zero. Result undefined.")
+            a[selection] = np.where(by_zero, 0, a[selection] // np.where(by_zero, 1, divisor))
+        elif opcode == CMP:
+            self.zero_flag[selection] = a[selection] == b[selection]
+            self.carry_flag[selection] = a[selection] < b[selection]
+        elif opcode == JMP:
+            return operand
+        elif opcode in (JZ, JNZ):
+            jump = self.zero_flag[selection]
+            if opcode == JNZ:
+                jump = ~jump
+            if jump.all():
+                return operand
+            if not jump.any():
+                return pc + 1
+            self.pc[selection] = np.where(jump, operand, pc + 1)
+            return None
+        elif opcode == HALT:
+            self.running[selection] = False
+            self.pc[selection] = pc + 1
+            return None
+        elif opcode == CALL:
+            self.push(selection, pc + 1)
+            return operand
+        elif opcode == RET:
+            return self.ret(pc, selection)
+        elif opcode == PUSH:
+            self.push(selection, a[selection])
+        elif opcode == POP_PARAM:
+            a[selection] = self.pop(selection)
+        elif opcode == POP_RET:
+            self.pop(selection)
+        return pc + 1
+
+    def push(self, selection, values):
+        """Push values onto the stacks of the selected lanes."""
+        lanes = self.all_lanes[selection]
+        pointers = self.stack_pointer[lanes]
+        if pointers.max() >= STACK_DEPTH:
+            raise IndexError("Stack overflow")
+        self.stack[pointers, lanes] = values
+        self.stack_pointer[lanes] = pointers + 1
+
+    def pop(self, selection):
+        """Pop a value off the stacks of the selected lanes."""
+        lanes = self.all_lanes[selection]
+        pointers = self.stack_pointer[lanes] - 1
+        if pointers.min() < 0:
+            raise IndexError("Stack underflow")
+        self.stack_pointer[lanes] = pointers
+        return self.stack[pointers, lanes]
+
+    def ret(self, pc, selection):
+        """Return from a function on the selected lanes; lanes with an empty stack halt."""
+        lanes = self.all_lanes[selection]
+        pointers = self.stack_pointer[lanes]
+        underflow = pointers == 0
+        if underflow.any():
+            print("Warning: Stack underflow during return. Halting.")
+            self.running[lanes[underflow]] = False
+            self.pc[lanes[underflow]] = pc
+            lanes = lanes[~underflow]
+            pointers = pointers[~underflow]
+        targets = self.stack[pointers - 1, lanes]
+        self.stack_pointer[lanes] = pointers - 1
+        if not underflow.any() and (targets == targets[0]).all():
+            return int(targets[0])
+        self.pc[lanes] = targets
+        return None
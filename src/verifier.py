@@ -0,0 +1,70 @@
+"""
+SimpleScript Bytecode Verifier
+
+Checks a compiled program once, when it is loaded, so that the virtual
+machine does not have to check every instruction while it runs.
+
+A program is valid if:
+- every instruction is known
+- no operand is an unresolved (string) label
+- every LDA_MEM/LDB_MEM/STA/STB address lies inside memory
+- every JMP/JZ/JNZ/CALL target lies inside the program (a target equal to
+  the program length ends the program, like running off its end)
+
+Verified programs are decoded with handlers that index the memory list
+directly instead of going through the range checks of Memory.read/write.
+"""
+
+from src.bytecode import OPCODES, LDA_MEM, LDB_MEM, STA, STB, JUMP_OPCODES
+
+MEMORY_OPCODES = frozenset((LDA_MEM, LDB_MEM, STA, STB))
+
+
+class VerificationError(ValueError):
+    """
+    Raised when a program fails verification.
+
+    Attributes:
+        reason: "instruction", "label", "address" or "target"
+        position: Position of the offending instruction
+    """
+
+    def __init__(self, message, reason, position):
+        super().__init__(message)
+        self.reason = reason
+        self.position = position
+
+
+def verify(program, memory_size):
+    """
+    Verify a compiled program.
+
+    Unresolved labels are looked for in the whole program first, so that a
+    program with labels is always reported as such.
+
+    Args:
+        program: A list of (instruction, operand) tuples
+        memory_size: Number of addressable memory words
+
+    Raises:
+        VerificationError: Describing the first problem found
+    """
+    for i, (_, operand) in enumerate(program):
+        if isinstance(operand, str):
+            raise VerificationError(f"Unresolved label in program: {operand} at position {i}",
+                                    "label", i)
+
+    end = len(program)
+    for i, (instruction, operand) in enumerate(program):
+        opcode = OPCODES.get(instruction)
+        if opcode is None:
+            raise VerificationError(f"Unknown instruction: {instruction} at position {i}",
+                                    "instruction", i)
+        if opcode in MEMORY_OPCODES:
+            if not isinstance(operand, int) or not 0 <= operand < memory_size:
+                raise VerificationError(f"Memory address {operand} out of bounds at position {i}",
+                                        "address", i)
+        elif opcode in JUMP_OPCODES:
+            if not isinstance(operand, int) or not 0 <= operand <= end:
+                raise VerificationError(f"Jump target {operand} out of range at position {i}",
+                                        "target", i)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Unit tests for running SimpleScript programs with asyncio.
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.memory import TypedMemory
+
+# Read values until 0 is read, printing each value doubled
+DOUBLER = [
+    ("LDA_MEM", 0xF0),
+    ("LDB", 0),
+    ("CMP", None),
+    ("JZ", 8),
+    ("LDB", 2),
+    ("MUL", None),
+    ("STA", 0xF1),
+    ("JMP", 0),
+    ("HALT", None),
+]
+
+# Count down from 1000 without reading input
+COUNTDOWN = [
+    ("LDA", 1000),
+    ("STA", 16),
+    ("LDA_MEM", 16),
+    ("LDB", 1),
+    ("SUB", None),
+    ("STA", 16),
+    ("LDB", 0),
+    ("CMP", None),
+    ("JNZ", 2),
+    ("HALT", None),
+]
+
+
+class TestRunAsync(unittest.TestCase):
+    """Tests for Computer.run_async."""
+
+    def test_queued_input(self):
+        """Every read of the input buffer takes the next queued value."""
+        for engine in Computer.ENGINES:
+            with self.subTest(engine=engine):
+                async def main():
+                    computer = Computer(engine=engine)
+                    computer.load_program(DOUBLER)
+                    inputs = asyncio.Queue()
+                    for value in (3, 5, 7, 0):
+                        inputs.put_nowait(value)
+                    return await computer.run_async(inputs)
+
+                self.assertEqual(asyncio.run(main()), [6, 10, 14])
+
+    def test_queued_input_on_typed_memory(self):
+        """Queued values are wrapped to the word width, as with set_input()."""
+        for engine in Computer.ENGINES:
+            with self.subTest(engine=engine):
+                async def main():
+                    computer = Computer(engine=engine, memory=TypedMemory(256, 8))
+                    computer.load_program(DOUBLER)
+                    inputs = asyncio.Queue()
+                    for value in (1000, 0):
+                        inputs.put_nowait(value)
+                    return await computer.run_async(inputs)
+
+                # 1000 wraps to -24, doubled to -48
+                self.assertEqual(asyncio.run(main()), [-48])
+
+    def test_waits_for_input(self):
+        """The program waits for input while other tasks keep running."""
+        async def main():
+            computer = Computer()
+            computer.load_program(DOUBLER)
+            inputs = asyncio.Queue()
+            outputs = asyncio.Queue()
+            task = asyncio.create_task(computer.run_async(inputs, outputs))
+
+            received = []
+            for value in (1, 2, 0):
+                await inputs.put(value)
+                if value:
+                    received.append(await outputs.get())
+            await task
+            return received
+
+        self.assertEqual(asyncio.run(main()), [2, 4])
+
+    def test_coroutine_sink(self):
+        """Outputs can be sent to a coroutine function."""
+        received = []
+
+        async def sink(value):
+            received.append(value)
+
+        async def main():
+            computer = Computer()
+            computer.load_program(DOUBLER)
+            inputs = asyncio.Queue()
+            for value in (4, 0):
+                inputs.put_nowait(value)
+            await computer.run_async(inputs, sink)
+
+        asyncio.run(main())
+        self.assertEqual(received, [8])
+
+    def test_yields_between_slices(self):
+        """A long computation lets other tasks run between slices."""
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def main():
+            computer = Computer(fuse_instructions=False)
+            computer.load_program(COUNTDOWN)
+            task = asyncio.create_task(ticker())
+            await computer.run_async(slice_size=100)
+            task.cancel()
+            return computer.memory.read(16)
+
+        self.assertEqual(asyncio.run(main()), 0)
+        self.assertGreater(len(ticks), 10)
+
+    def test_set_input_without_queue(self):
+        """Without an input queue reads return the value set with set_input."""
+        async def main():
+            computer = Computer()
+            computer.load_program([("LDA_MEM", 0xF0), ("STA", 0xF1), ("HALT", None)])
+            computer.set_input(9)
+            return await computer.run_async()
+
+        self.assertEqual(asyncio.run(main()), [9])
+
+    def test_input_device_left_unqueued(self):
+        """A synchronous run after run_async reads the stored input again."""
+        computer = Computer()
+        computer.load_program([("LDA_MEM", 0xF0), ("STA", 0xF1), ("HALT", None)])
+        inputs = asyncio.Queue()
+        inputs.put_nowait(5)
+        asyncio.run(computer.run_async(inputs))
+        computer.run()
+        self.assertEqual(computer.get_all_outputs(), [5, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
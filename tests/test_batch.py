@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript batch runner.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.batch import run_batch, run_job
+
+# Prints the input value and its square
+SQUARE = [
+    ("LDA_MEM", 0xF0),
+    ("STA", 0xF1),
+    ("LDB_MEM", 0xF0),
+    ("MUL", None),
+    ("STA", 0xF1),
+    ("HALT", None),
+]
+
+
+class TestBatch(unittest.TestCase):
+    """Tests for run_job and run_batch."""
+
+    def test_run_job(self):
+        """A single job returns the program's outputs."""
+        self.assertEqual(run_job(SQUARE, 6), [6, 36])
+
+    def test_in_process_batch(self):
+        """One worker runs the jobs in the calling process."""
+        results = list(run_batch(SQUARE, [1, 2, 3], workers=1))
+        self.assertEqual(results, [[1, 1], [2, 4], [3, 9]])
+
+    def test_process_pool_batch_keeps_order(self):
+        """Results from worker processes come back in input order."""
+        inputs = list(range(50))
+        results = list(run_batch(SQUARE, inputs, workers=2, chunksize=7))
+        self.assertEqual(results, [[value, value * value] for value in inputs])
+
+    def test_step_limit_and_engine_options(self):
+        """Step limits and Computer options are applied to every job."""
+        endless = [("LDA_MEM", 0xF0), ("STA", 0xF1), ("JMP", 0)]
+        results = list(run_batch(endless, [4, 5], workers=2, max_steps=8, engine="tracing"))
+        self.assertEqual(results, [[4, 4, 4], [5, 5, 5]])
+
+    def test_invalid_arguments_raise_at_call_time(self):
+        """Invalid arguments are rejected when run_batch is called, not when iterated."""
+        for options in ({"workers": 0}, {"workers": 2, "chunksize": 0}):
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    run_batch(SQUARE, [1], **options)
+
+
+if __name__ == "__main__":
+    unittest.main()
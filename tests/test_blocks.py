@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript block engine.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.blocks import block_set
+from src.compiler import SimpleCompiler
+from src.computer import Computer
+from src.memory import TypedMemory
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+COUNTDOWN = [
+    ("LDA", 5),
+    ("STA", 16),
+    ("LDA_MEM", 16),       # Loop head
+    ("STA", 0xF1),
+    ("LDB", 1),
+    ("SUB", None),
+    ("STA", 16),
+    ("LDB", 0),
+    ("CMP", None),
+    ("JNZ", 2),
+    ("HALT", None),
+]
+
+CALLS = [
+    ("JMP", 6),
+    ("POP_PARAM", None),   # square(n): pops n, returns n * n
+    ("STA", 20),
+    ("LDB_MEM", 20),
+    ("MUL", None),
+    ("RET", None),
+    ("LDA", 7),            # Main program
+    ("CALL", 9),
+    ("JMP", 12),
+    ("PUSH", None),        # Helper that pushes A and calls square
+    ("CALL", 1),
+    ("RET", None),
+    ("STA", 0xF1),
+    ("LDA", 9),
+    ("LDB", 0),
+    ("DIV", None),         # Division by zero yields 0
+    ("STA", 0xF1),
+    ("RET", None),         # Stack underflow halts
+    ("LDA", 1),
+]
+
+
+def run_with(engine, program):
+    """Run a program on a fresh computer with the given engine."""
+    computer = Computer(engine=engine)
+    computer.load_program(program)
+    computer.run()
+    return computer
+
+
+class TestBlockEngine(unittest.TestCase):
+    """Tests that the block engine matches the interpreter."""
+
+    def assertSameAsInterpreter(self, program):
+        expected = run_with("interpreter", program)
+        actual = run_with("blocks", program)
+        self.assertEqual(actual.outputs, expected.outputs)
+        self.assertEqual(actual.memory.memory, expected.memory.memory)
+        self.assertEqual(actual.memory.stack, expected.memory.stack)
+        for name in ("register_a", "register_b", "zero_flag", "carry_flag", "pc", "running"):
+            self.assertEqual(getattr(actual.cpu, name), getattr(expected.cpu, name), name)
+
+    def test_unknown_engine(self):
+        """Unknown engines are rejected."""
+        with self.assertRaises(ValueError):
+            Computer(engine="turbo")
+
+    def test_loop(self):
+        """A counting loop produces the same state."""
+        self.assertSameAsInterpreter(COUNTDOWN)
+
+    def test_calls_and_returns(self):
+        """Calls, returns, division by zero and stack underflow match."""
+        self.assertSameAsInterpreter(CALLS)
+
+    def test_compiled_examples(self):
+        """Compiled examples produce the same state."""
+        for name in ("simple_test.txt", "division_test.ss"):
+            with open(os.path.join(EXAMPLES, name)) as f:
+                program = SimpleCompiler().compile(f.read())
+            with self.subTest(example=name):
+                self.assertSameAsInterpreter(program)
+
+    def test_error_state(self):
+        """An error inside a block leaves the pc and registers of the failing instruction."""
+        programs = [
+            # Pops from an empty stack after a store and a pop
+            [("LDA", 5), ("PUSH", None), ("LDA", 7), ("STA", 100), ("POP_PARAM", None),
+             ("POP_PARAM", None)],
+            # Stores past the end of memory
+            [("LDA", 2), ("LDB", 3), ("ADD", None), ("CMP", None), ("STB", 300), ("LDA", 0)],
+            # Fails at the start of the block after a jump
+            [("LDA", 4), ("JMP", 2), ("LDA_MEM", 999), ("HALT", None)],
+        ]
+        for program in programs:
+            with self.subTest(program=program):
+                computers = {}
+                for engine in ("interpreter", "blocks"):
+                    computer = Computer(engine=engine)
+                    computer.load_program(program)
+                    with self.assertRaises(IndexError):
+                        computer.run()
+                    computers[engine] = computer
+                for name in ("register_a", "register_b", "zero_flag", "carry_flag", "pc"):
+                    self.assertEqual(getattr(computers["blocks"].cpu, name),
+                                     getattr(computers["interpreter"].cpu, name), name)
+                self.assertEqual(computers["blocks"].memory.memory,
+                                 computers["interpreter"].memory.memory)
+
+    def test_store_error_on_typed_memory(self):
+        """A store of a value that does not fit a word reports its own pc."""
+        program = [("LDA", 1), ("STA", 16), ("STB", 17), ("HALT", None)]
+        for engine in ("interpreter", "blocks"):
+            with self.subTest(engine=engine):
+                computer = Computer(engine=engine, memory=TypedMemory(256, 8))
+                computer.load_program(program)
+                computer.start()
+                computer.cpu.register_b = 1000
+                with self.assertRaises(OverflowError):
+                    computer.resume()
+                self.assertEqual(computer.cpu.pc, 2)
+                self.assertEqual(computer.cpu.register_a, 1)
+                self.assertEqual(computer.memory.read(16), 1)
+
+    def test_blocks_are_cached_per_program(self):
+        """Computers running the same program share compiled blocks."""
+        first = Computer(engine="blocks")
+        first.load_program(COUNTDOWN)
+        second = Computer(engine="blocks")
+        second.load_program(list(COUNTDOWN))
+        self.assertIs(first.block_engine.blocks, second.block_engine.blocks)
+
+    def test_leaders(self):
+        """Blocks start at jump targets and after control transfers and device stores."""
+        blocks = block_set(COUNTDOWN, 256, {0xF0, 0xF1, 0xF2})
+        self.assertEqual(blocks.leaders, {0, 2, 4, 10, 11})
+
+    def test_step_budget(self):
+        """A step budget stops an endless loop at a block boundary."""
+        computer = Computer(engine="blocks")
+        computer.load_program([("LDA", 1), ("JMP", 0)])
+        steps = computer.run(max_steps=101)
+        self.assertEqual(steps, 102)
+        self.assertEqual(computer.cpu.pc, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript I/O bus and devices.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.bus import Device, IOBus
+from src.computer import Computer
+
+
+class RecordingDevice(Device):
+    """A device that remembers every store it receives."""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, address, value):
+        self.writes.append((address, value))
+
+
+class TestIOBus(unittest.TestCase):
+    """Tests for the IOBus and the standard devices."""
+
+    def setUp(self):
+        self.computer = Computer()
+
+    def test_map_range(self):
+        """A device owns every address of its range."""
+        bus = IOBus()
+        device = RecordingDevice()
+        bus.map(device, 10, 12)
+        self.assertIs(bus.device_at(10), device)
+        self.assertIs(bus.device_at(12), device)
+        self.assertIsNone(bus.device_at(13))
+
+    def test_overlapping_map_rejected(self):
+        """Two devices cannot share an address."""
+        bus = IOBus()
+        bus.map(RecordingDevice(), 10, 12)
+        with self.assertRaises(ValueError):
+            bus.map(RecordingDevice(), 12)
+
+    def test_output_device_records_values(self):
+        """Stores to the output buffer are recorded and counted."""
+        program = [
+            ("LDA", 42),
+            ("STA", 0xF1),
+            ("LDB", 7),
+            ("STB", 0xF1),
+            ("HALT", None),
+        ]
+        self.computer.load_program(program)
+        self.computer.run()
+
+        self.assertEqual(self.computer.get_all_outputs(), [42, 7])
+        self.assertEqual(self.computer.memory.read(0xF2), 2)
+
+    def test_zero_is_printed(self):
+        """Printing zero produces an output."""
+        self.computer.load_program([("LDA", 0), ("STA", 0xF1), ("HALT", None)])
+        self.computer.run()
+        self.assertEqual(self.computer.get_all_outputs(), [0])
+
+    def test_only_mapped_stores_reach_devices(self):
+        """Stores to unmapped addresses go to plain memory."""
+        device = RecordingDevice()
+        self.computer.bus.map(device, 100)
+        program = [
+            ("LDA", 5),
+            ("STA", 99),
+            ("STA", 100),
+            ("HALT", None),
+        ]
+        self.computer.load_program(program)
+        self.computer.run()
+
+        self.assertEqual(device.writes, [(100, 5)])
+        self.assertEqual(self.computer.memory.read(99), 5)
+        self.assertEqual(self.computer.memory.read(100), 0)
+
+    def test_set_input(self):
+        """set_input makes the value readable at the input address."""
+        self.computer.set_input(9)
+        self.computer.load_program([("LDA_MEM", 0xF0), ("STA", 0xF1), ("HALT", None)])
+        self.computer.run()
+        self.assertEqual(self.computer.get_all_outputs(), [9])
+
+
+if __name__ == "__main__":
+    unittest.main()
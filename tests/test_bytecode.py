@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript bytecode decoder.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.bytecode import decode, OPCODES, OPCODE_NAMES, LDA, STA, HALT
+from src.computer import Computer
+
+
+class TestDecode(unittest.TestCase):
+    """Tests for decoding programs into CodeObjects."""
+
+    def setUp(self):
+        self.computer = Computer()
+
+    def test_opcode_table_round_trip(self):
+        """Every opcode name maps to its position in the table."""
+        for opcode, name in enumerate(OPCODE_NAMES):
+            self.assertEqual(OPCODES[name], opcode)
+
+    def test_decode_builds_parallel_arrays(self):
+        """Decoding produces integer opcodes, operands and bound handlers."""
+        program = [("LDA", 7), ("STA", 20), ("HALT", None)]
+        code = decode(program, self.computer.cpu)
+
+        self.assertEqual(len(code), 3)
+        self.assertEqual(code.opcodes, [LDA, STA, HALT])
+        self.assertEqual(code.operands, [7, 20, None])
+        self.assertEqual(code.handlers[0], self.computer.cpu._lda)
+
+    def test_unknown_instruction_rejected_at_load(self):
+        """Unknown instructions are reported when the program is loaded."""
+        with self.assertRaises(ValueError):
+            self.computer.load_program([("NOP", None), ("HALT", None)])
+
+    def test_run_with_step_limit(self):
+        """run(max_steps=...) stops after the given number of instructions."""
+        self.computer.load_program([("JMP", 0)])
+        self.assertEqual(self.computer.run(max_steps=100), 100)
+        self.assertTrue(self.computer.cpu.running)
+
+    def test_run_decoded_program(self):
+        """A decoded program produces the same registers as direct execution."""
+        program = [
+            ("LDA", 6),
+            ("LDB", 7),
+            ("MUL", None),
+            ("STA", 20),
+            ("HALT", None),
+        ]
+        self.computer.load_program(program)
+        self.computer.run()
+
+        self.assertEqual(self.computer.cpu.register_a, 42)
+        self.assertEqual(self.computer.memory.read(20), 42)
+        self.assertFalse(self.computer.cpu.running)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the on-disk compile cache.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import cache as cache_module
+from src.cache import CompileCache, cache_directory, source_key
+from src.compiler import SimpleCompiler
+
+SOURCE = "x = 5\ny = x + 2\nprint y\n"
+
+
+class TestCompileCache(unittest.TestCase):
+    """Tests for CompileCache."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = CompileCache(os.path.join(self.directory.name, "__sscache__"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def entries(self):
+        return sorted(entry for entry in os.listdir(self.cache.directory) if entry.endswith(".ssb"))
+
+    def test_miss_then_hit(self):
+        """The second lookup of the same source is a hit with the same program."""
+        first = self.cache.compile(SOURCE, "test.ss")
+        second = self.cache.compile(SOURCE, "test.ss")
+        self.assertEqual(first.program, SimpleCompiler().compile(SOURCE))
+        self.assertEqual(second.program, first.program)
+        self.assertEqual(second.symbols, first.symbols)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_hit_skips_compiler(self):
+        """A hit does not run the compiler."""
+        self.cache.compile(SOURCE, "test.ss")
+        with mock.patch.object(cache_module, "SimpleCompiler") as compiler:
+            self.cache.compile(SOURCE, "test.ss")
+        compiler.assert_not_called()
+
+    def test_changed_source_replaces_entry(self):
+        """A changed source is recompiled and its old entry removed."""
+        self.cache.compile(SOURCE, "test.ss")
+        self.cache.compile(SOURCE + "print x\n", "test.ss")
+        self.cache.compile(SOURCE, "other.ss")
+        self.assertEqual(self.cache.misses, 3)
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_compiler_version_in_key(self):
+        """Changing the compiler version changes the key."""
+        key = source_key(SOURCE)
+        with mock.patch.object(cache_module, "COMPILER_VERSION", "test"):
+            self.assertNotEqual(source_key(SOURCE), key)
+
+    def test_corrupt_entry_recompiled(self):
+        """An unreadable entry is a miss and is replaced."""
+        self.cache.compile(SOURCE, "test.ss")
+        path = os.path.join(self.cache.directory, self.entries()[0])
+        with open(path, "wb") as f:
+            f.write(b"garbage")
+        obj = self.cache.compile(SOURCE, "test.ss")
+        self.assertEqual(obj.program, SimpleCompiler().compile(SOURCE))
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_persistent_stats(self):
+        """Hit and miss counts are shared by every cache on the directory."""
+        self.cache.compile(SOURCE, "test.ss")
+        CompileCache(self.cache.directory).compile(SOURCE, "test.ss")
+        stats = CompileCache(self.cache.directory).stats()
+        self.assertEqual(stats, {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_files_use_default_mode(self):
+        """Entries and stats get the default file mode, so the cache can be shared."""
+        umask = os.umask(0o022)
+        try:
+            self.cache.compile(SOURCE, "test.ss")
+        finally:
+            os.umask(umask)
+        for entry in self.entries() + ["stats.json"]:
+            mode = os.stat(os.path.join(self.cache.directory, entry)).st_mode & 0o777
+            self.assertEqual(mode, 0o644, entry)
+
+    @unittest.skipIf(cache_module.fcntl is None, "No file locking on this platform")
+    def test_concurrent_stats(self):
+        """Concurrent lookups do not lose counts."""
+        def lookups():
+            cache = CompileCache(self.cache.directory)
+            for _ in range(25):
+                cache.record(hit=False)
+
+        threads = [threading.Thread(target=lookups) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.stats()["misses"], 200)
+
+    def test_compile_errors_not_cached(self):
+        """Compile errors propagate and leave no entry."""
+        with self.assertRaises(NameError):
+            self.cache.compile("x = y(1)\n", "bad.ss")
+        self.assertFalse(os.path.exists(self.cache.directory) and self.entries())
+
+    def test_cache_directory(self):
+        """The cache lives next to the source file."""
+        self.assertEqual(cache_directory("/a/b/prog.ss"), os.path.join("/a/b", "__sscache__"))
+
+
+if __name__ == '__main__':
+    unittest.main()
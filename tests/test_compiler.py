@@ -10,6 +10,7 @@ import os
 # Add the parent directory to the Python path so we can import from src
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.compiler import SimpleCompiler
+from src.computer import Computer
 
 
 class TestSimpleCompiler(unittest.TestCase):
@@ -67,7 +68,6 @@ print x
         # Check program termination
         self.assertEqual(instructions[4][0], "HALT", "Expected HALT instruction")
 
-    @unittest.skip("Arithmetic operations need to be fixed in the compiler")
     def test_arithmetic_addition(self):
         """Test addition operation."""
         source = """
@@ -91,7 +91,6 @@ print x
         
         self.assertTrue(add_found, "ADD instruction not found in the compiled program")
 
-    @unittest.skip("Arithmetic operations need to be fixed in the compiler")
     def test_arithmetic_subtraction(self):
         """Test subtraction operation."""
         source = """
@@ -115,7 +114,6 @@ print x
         
         self.assertTrue(sub_found, "SUB instruction not found in the compiled program")
 
-    @unittest.skip("Conditional logic needs to be fixed in the compiler")
     def test_if_statement(self):
         """Test if statement compilation."""
         source = """
@@ -149,7 +147,7 @@ print x
         
         self.assertTrue(jump_found, "Jump instruction not found in the compiled program")
 
-    @unittest.skip("Loop functionality needs to be fixed in the compiler")
+    @unittest.skip("The CPU has no jump for < and > comparisons")
     def test_while_loop(self):
         """Test while loop compilation."""
         source = """
@@ -181,5 +179,142 @@ print x
         self.assertTrue(jump_found, "JMP instruction not found in the compiled program")
 
 
+class TestCompiledPrograms(unittest.TestCase):
+    """Tests that compiled programs run correctly."""
+
+    def run_source(self, source):
+        """Compile and run a source and return its outputs."""
+        self.compiler = SimpleCompiler()
+        self.program = self.compiler.compile(source)
+        computer = Computer()
+        computer.load_program(self.program)
+        computer.run(max_steps=100_000)
+        self.assertTrue(computer.is_finished(), "The program did not halt")
+        return computer.get_all_outputs()
+
+    def test_no_jump_without_functions(self):
+        """Programs without functions start with their first statement."""
+        self.assertEqual(SimpleCompiler().compile("print 1\n"), [("LDA", 1), ("STA", 0xF1), ("HALT", None)])
+
+    def test_nested_blocks(self):
+        source = """
+i = 0
+while i != 4
+  j = 0
+  while j != i
+    if j == 1
+      print 10 + i
+    else
+      print i
+    j = j + 1
+  i = i + 1
+print 99
+"""
+        self.assertEqual(self.run_source(source), [1, 2, 12, 3, 13, 3, 99])
+
+    def test_loop_branches_once_per_iteration(self):
+        """A while loop tests its condition at the bottom, with one branch per iteration."""
+        self.run_source("i = 0\nwhile i != 3\n  i = i + 1\n")
+        opcodes = [instruction for instruction, _ in self.program]
+        self.assertEqual(opcodes, ["LDA", "STA", "JMP", "LDA_MEM", "LDB", "ADD", "STA",
+                                   "LDA_MEM", "LDB", "CMP", "JNZ", "HALT"])
+        self.assertEqual(self.program[10][1], 3)
+
+    def test_expressions(self):
+        """Expressions follow the usual precedence and may use calls."""
+        source = """
+def double(n)
+  return n + n
+x = 3
+print 1 + x * 4 - 6 / 2
+print (1 + x) * (x - 1)
+print 10 - double(x) - double(1)
+print -2 * double(x + 1)
+"""
+        self.assertEqual(self.run_source(source), [10, 8, 2, -16])
+
+    def test_functions(self):
+        source = """
+print add(square(3), 4)
+greet()
+def square(n)
+  return n * n
+def add(a, b)
+  sum = a + b
+  return sum
+def greet()
+  print 42
+"""
+        self.assertEqual(self.run_source(source), [13, 42])
+        functions = self.compiler.symbol_table()["functions"]
+        self.assertEqual(functions["add"]["params"], ["a", "b"])
+        # The program jumps over the functions to the main program
+        self.assertEqual(self.program[0][0], "JMP")
+        self.assertEqual(functions["square"]["address"], 1)
+        self.assertEqual(self.compiler.source_map[self.program[0][1]].line, 2)
+
+    def test_mutual_recursion(self):
+        source = """
+def even(n)
+  if n == 0
+    return 1
+  return odd(n - 1)
+def odd(n)
+  if n == 0
+    return 0
+  return even(n - 1)
+print even(10)
+print odd(7)
+"""
+        self.assertEqual(self.run_source(source), [1, 1])
+
+    def test_global_variables(self):
+        """Parameters and variables assigned in a function are global."""
+        source = """
+def f(x)
+  y = x + total
+  return y
+total = 5
+y = 1
+print f(2)
+print y
+print x
+"""
+        self.assertEqual(self.run_source(source), [7, 7, 2])
+        self.assertNotIn("f.y", self.compiler.variables)
+
+    def test_arguments_are_evaluated_first(self):
+        """All arguments are evaluated before the parameters are stored."""
+        source = """
+def sub(a, b)
+  return a - b
+a = 10
+b = 3
+print sub(b, a)
+"""
+        self.assertEqual(self.run_source(source), [-7])
+
+    def test_source_map(self):
+        source = "x = 1\nwhile x != 3\n  x = f(x)\ndef f(n)\n  return n + 1\n"
+        self.run_source(source)
+        lines = [(location.line, location.function) for location in self.compiler.source_map]
+        self.assertEqual(lines[:3], [(None, None), (5, "f"), (5, "f")])
+        self.assertIn((2, None), lines)
+        self.assertEqual(lines[-1], (None, None))
+
+    def test_errors(self):
+        cases = [
+            ("x = f(1)\n", NameError),
+            ("def f(a)\n  return a\nx = f(1, 2)\n", ValueError),
+            ("return 1\n", SyntaxError),
+            ("def f()\n  return 1\ndef f()\n  return 2\n", SyntaxError),
+            ("if x > 1\n  print x\n", SyntaxError),
+        ]
+        for source, error in cases:
+            with self.subTest(source=source):
+                with self.assertRaises(error):
+                    SimpleCompiler().compile(source)
+
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
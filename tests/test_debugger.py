@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript debugger.
+"""
+
+import io
+import os
+import sys
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.compiler import SourceLocation
+from src.computer import Computer
+from src.debugger import Debugger, compile_condition
+
+# Counts n at address 16 down from 3, calling f (which prints 7) each time
+PROGRAM = [
+    ("LDA", 3), ("STA", 16),                                   # 0-1   line 1
+    ("CALL", 11),                                              # 2     line 2
+    ("LDA_MEM", 16), ("LDB", 1), ("SUB", None), ("STA", 16),   # 3-6   line 3
+    ("LDB", 0), ("CMP", None), ("JNZ", 2),                     # 7-9   line 4
+    ("HALT", None),                                            # 10
+    ("LDA", 7), ("STA", 0xF1), ("RET", None),                  # 11-13 f, line 6
+]
+LINES = [1, 1, 2, 3, 3, 3, 3, 4, 4, 4, None, 6, 6, 6]
+SOURCE_MAP = [SourceLocation("t.ss", line, "f" if i >= 11 else None)
+              for i, line in enumerate(LINES)]
+SYMBOLS = {"variables": {"n": 16}, "functions": {}}
+
+
+class TestDebugger(unittest.TestCase):
+    """Tests for breakpoints, watchpoints and the instruction history."""
+
+    def setUp(self):
+        self.computer = Computer()
+        self.computer.load_program(PROGRAM, SOURCE_MAP)
+        self.output = io.StringIO()
+        self.debugger = Debugger(self.computer, history=4, symbols=SYMBOLS, output=self.output)
+
+    def stops(self, first=None):
+        """Run to the end and return the (reason, pc) of every stop after first."""
+        stops = [first or self.debugger.run()]
+        while stops[-1].reason != "halt":
+            stops.append(self.debugger.cont())
+        return [(stop.reason, stop.pc) for stop in stops]
+
+    def test_pc_breakpoint(self):
+        """A pc breakpoint stops before the instruction, every time it is reached."""
+        self.debugger.add_breakpoint(pc=3)
+        stop = self.debugger.run()
+        self.assertEqual((stop.reason, stop.pc), ("breakpoint", 3))
+        self.assertEqual(self.computer.get_all_outputs(), [7])
+        self.assertEqual(self.stops(stop), [("breakpoint", 3)] * 3 + [("halt", 11)])
+        self.assertEqual(self.computer.get_all_outputs(), [7, 7, 7])
+
+    def test_line_and_function_breakpoints(self):
+        """Line and function breakpoints resolve through the source map."""
+        line = self.debugger.add_breakpoint(line=4)
+        function = self.debugger.add_breakpoint(function="f")
+        self.assertEqual(line.pcs, {7})
+        self.assertEqual(function.pcs, {11})
+        self.assertEqual(self.stops()[:3], [("breakpoint", 11), ("breakpoint", 7), ("breakpoint", 11)])
+        self.assertEqual((line.hits, function.hits), (3, 3))
+
+    def test_conditional_breakpoint(self):
+        """A breakpoint with a condition only stops when it holds."""
+        self.debugger.add_breakpoint(pc=3, condition="n == 1 and mem[16] < 2")
+        self.assertEqual(self.stops(), [("breakpoint", 3), ("halt", 11)])
+        self.assertEqual(self.computer.get_all_outputs(), [7, 7, 7])
+
+    def test_callable_condition(self):
+        """Conditions can be functions of the CPU."""
+        self.debugger.add_breakpoint(pc=12, condition=lambda cpu: cpu.register_a == 7)
+        self.assertEqual(self.stops()[0], ("breakpoint", 12))
+
+    def test_watchpoint(self):
+        """A watchpoint stops after every store that changes the address."""
+        self.debugger.watch("n")
+        stop = self.debugger.run()
+        self.assertEqual((stop.reason, stop.store, stop.old, stop.new), ("watchpoint", 1, 0, 3))
+        self.assertEqual(self.stops(stop), [("watchpoint", 2), ("watchpoint", 7), ("watchpoint", 7),
+                                        ("watchpoint", 7), ("halt", 11)])
+
+    def test_history(self):
+        """The last instructions are kept and written when the program halts."""
+        self.assertEqual(self.stops(), [("halt", 11)])
+        self.assertEqual([entry[0] for entry in self.debugger.history], [7, 8, 9, 10])
+        text = self.output.getvalue()
+        self.assertIn("Last 4 instructions:", text)
+        self.assertIn("HALT", text)
+        self.assertIn("(t.ss:4)", text)
+
+    def test_history_on_error(self):
+        """The history is written when the program raises an error."""
+        computer = Computer()
+        computer.load_program([("LDA", 1), ("STA", 300), ("HALT", None)])
+        debugger = Debugger(computer, output=self.output)
+        with self.assertRaises(IndexError):
+            debugger.run()
+        self.assertIn("STA 300", self.output.getvalue())
+
+    def test_max_steps(self):
+        """Running out of steps is a stop of its own."""
+        stop = self.debugger.run(max_steps=5)
+        self.assertEqual((stop.reason, stop.pc), ("steps", 13))
+
+    def test_hooks_removed(self):
+        """The debugger only installs hooks while the program runs."""
+        self.debugger.add_breakpoint(pc=3)
+        self.debugger.run()
+        self.assertFalse(self.computer.hooks)
+
+    def test_invalid_breakpoints(self):
+        """Breakpoints need one valid location."""
+        for kwargs in ({}, {"pc": 1, "line": 1}, {"pc": 99}, {"line": 5}, {"function": "g"}):
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(ValueError):
+                    self.debugger.add_breakpoint(**kwargs)
+
+
+class TestConditions(unittest.TestCase):
+    """Tests for compile_condition()."""
+
+    def test_registers_and_memory(self):
+        computer = Computer()
+        computer.cpu.register_a = 4
+        computer.memory.write(20, 9)
+        self.assertTrue(compile_condition("a * 2 == 8 and mem[16 + 4] > a")(computer.cpu))
+        self.assertTrue(compile_condition("x == 9", {"x": 20})(computer.cpu))
+        self.assertFalse(compile_condition("not zero and carry")(computer.cpu))
+
+    def test_rejects_unsafe_conditions(self):
+        for condition in ("__import__('os')", "a.__class__", "y > 1", "a ==", "[a]"):
+            with self.subTest(condition=condition):
+                with self.assertRaises(ValueError):
+                    compile_condition(condition)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript superinstruction fusion pass.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.bytecode import decode, FUSED_MOVE, FUSED_ARITH, FUSED_BRANCH, LDA_MEM, STA
+from src.compiler import SimpleCompiler
+from src.computer import Computer
+from src.fusion import count_ngrams, fuse
+
+
+def run_program(program, fuse_instructions):
+    """Run a program and return the resulting computer."""
+    computer = Computer(fuse_instructions=fuse_instructions)
+    computer.load_program(program)
+    computer.run()
+    return computer
+
+
+class TestFusion(unittest.TestCase):
+    """Tests for fuse() and its effect on execution."""
+
+    def assertSameState(self, program):
+        """Running with and without fusion leaves the same machine state."""
+        plain = run_program(program, False)
+        fused = run_program(program, True)
+        self.assertEqual(fused.outputs, plain.outputs)
+        self.assertEqual(fused.memory.memory, plain.memory.memory)
+        self.assertEqual(fused.memory.stack, plain.memory.stack)
+        for name in ("register_a", "register_b", "zero_flag", "carry_flag", "pc"):
+            self.assertEqual(getattr(fused.cpu, name), getattr(plain.cpu, name), name)
+
+    def test_count_ngrams(self):
+        """n-grams are counted per program."""
+        program = [("LDA", 1), ("STA", 16), ("LDA", 2), ("STA", 17)]
+        counts = count_ngrams([program], 2)
+        self.assertEqual(counts[("LDA", "STA")], 2)
+        self.assertEqual(counts[("STA", "LDA")], 1)
+
+    def test_patterns_are_fused(self):
+        """Assignment, arithmetic and condition sequences become superinstructions."""
+        program = [
+            ("LDA", 5), ("STA", 16),
+            ("LDA_MEM", 16), ("LDB", 3), ("MUL", None), ("STA", 17),
+            ("LDA_MEM", 17), ("LDB", 15), ("CMP", None), ("JZ", 13),
+            ("LDA_MEM", 17), ("STA", 0xF1),
+            ("HALT", None),
+            ("HALT", None),
+        ]
+        computer = Computer()
+        code = fuse(decode(program, computer.cpu), computer.cpu)
+
+        self.assertEqual(code.opcodes[0], FUSED_MOVE)
+        self.assertEqual(code.opcodes[2], FUSED_ARITH)
+        self.assertEqual(code.opcodes[6], FUSED_BRANCH)
+        # Stores to I/O devices are not fused
+        self.assertEqual(code.opcodes[10], LDA_MEM)
+        self.assertEqual(code.opcodes[11], STA)
+        self.assertSameState(program)
+
+    def test_jump_into_fused_sequence(self):
+        """A jump into the middle of a fused sequence runs the original instructions."""
+        program = [
+            ("JMP", 2),
+            ("LDA", 1),
+            ("LDB", 2),
+            ("ADD", None),
+            ("STA", 16),
+            ("LDA_MEM", 16),
+            ("STA", 0xF1),
+            ("HALT", None),
+        ]
+        self.assertEqual(run_program(program, True).outputs, [2])
+        self.assertSameState(program)
+
+    def test_compiled_examples_unchanged(self):
+        """Compiled example programs behave the same with and without fusion."""
+        examples = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+        for name in ("simple_test.txt", "division_test.ss"):
+            with open(os.path.join(examples, name)) as f:
+                program = SimpleCompiler().compile(f.read())
+            with self.subTest(example=name):
+                self.assertSameState(program)
+
+
+if __name__ == "__main__":
+    unittest.main()
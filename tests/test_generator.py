@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript program generator.
+"""
+
+import os
+import re
+import sys
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.compiler import SimpleCompiler
+from src.computer import Computer
+from src.generator import ProgramGenerator, generate_program
+
+
+def statements(source):
+    """Return the statement lines of a generated program, without else lines."""
+    return [line for line in source.splitlines()[1:] if line.strip() != "else"]
+
+
+class TestGenerator(unittest.TestCase):
+    """Tests for the shape and reproducibility of generated programs."""
+
+    def test_deterministic(self):
+        """The same seed and options always give the same program."""
+        options = dict(functions=3, statements=200, depth=3)
+        self.assertEqual(generate_program(7, **options), generate_program(7, **options))
+        self.assertNotEqual(generate_program(7, **options), generate_program(8, **options))
+
+    def test_header(self):
+        """The first line records the seed and options."""
+        header = generate_program(42, variables=5).splitlines()[0]
+        self.assertTrue(header.startswith("#"))
+        self.assertIn("seed=42", header)
+        self.assertIn("variables=5", header)
+
+    def test_statement_count(self):
+        """The main program has the requested number of statements."""
+        for depth in (0, 1, 4):
+            with self.subTest(depth=depth):
+                source = generate_program(1, variables=10, statements=500, depth=depth)
+                self.assertEqual(len(statements(source)), 10 + 500)
+
+    def test_function_statement_count(self):
+        """Every function body has the requested number of statements."""
+        source = generate_program(2, functions=4, function_statements=6, statements=0)
+        bodies = re.split(r"^def .*\n", source, flags=re.MULTILINE)[1:]
+        self.assertEqual(len(bodies), 4)
+        for body in bodies:
+            body = [line for line in statements("\n" + body) if line.startswith("  ")]
+            self.assertEqual(len(body), 6)
+            self.assertTrue(body[-1].startswith("  return "))
+
+    def test_depth(self):
+        """Blocks nest up to the requested depth and no deeper."""
+        source = generate_program(3, statements=2000, depth=3, block_probability=0.5)
+        indents = {(len(line) - len(line.lstrip())) // 2 for line in source.splitlines()}
+        self.assertEqual(max(indents), 3)
+        flat = generate_program(3, statements=2000, depth=0)
+        self.assertNotRegex(flat, r"(?m)^\s*(if|while|else)\b")
+
+    def test_loops_terminate(self):
+        """Every loop counts its own counter, which nothing else assigns."""
+        source = generate_program(4, functions=3, statements=1000, depth=3,
+                                  block_probability=0.5, trip_count=9)
+        loops = re.findall(r"(?m)^ *while (\w+) != (\d+)$", source)
+        self.assertTrue(loops)
+        for counter, trips in loops:
+            self.assertEqual(trips, "9")
+            self.assertRegex(counter, r"^(f\d+_)?i\d+$")
+        assignments = re.findall(r"(?m)^ *(\w+) = (.*)$", source)
+        for target, value in assignments:
+            if re.match(r"^(f\d+_)?i\d+$", target):
+                self.assertIn(value, ("0", f"{target} + 1"))
+
+    def test_calls_only_earlier_functions(self):
+        """Functions only call the functions defined before them."""
+        source = generate_program(5, functions=6, function_statements=20, statements=100)
+        current = None
+        for line in source.splitlines():
+            definition = re.match(r"def f(\d+)\(", line)
+            if definition:
+                current = int(definition.group(1))
+            elif not line.startswith(" "):
+                current = None
+            for called in re.findall(r"\bf(\d+)\(", line if not definition else ""):
+                if current is not None:
+                    self.assertLess(int(called), current)
+
+    def test_straight_line_program_runs(self):
+        """Straight-line programs compile and print once per print statement."""
+        source = generate_program(6, variables=30, statements=400, depth=0)
+        computer = Computer()
+        computer.load_program(SimpleCompiler().compile(source))
+        computer.run()
+        prints = sum(line.startswith("print ") for line in source.splitlines())
+        self.assertGreater(prints, 0)
+        self.assertEqual(len(computer.get_all_outputs()), prints)
+
+    def test_programs_run(self):
+        """Programs with functions and nested blocks compile and halt."""
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                source = generate_program(seed, functions=4, statements=150, depth=3,
+                                          trip_count=3, operators="+-*/")
+                computer = Computer()
+                computer.load_program(SimpleCompiler().compile(source))
+                computer.run(max_steps=1_000_000)
+                self.assertTrue(computer.is_finished())
+                self.assertEqual(computer.memory.stack_size(), 0)
+
+    def test_division_by_constants(self):
+        """Division only divides by non-zero constants."""
+        source = generate_program(7, statements=500, operators="/")
+        for divisor in re.findall(r" / (\S+)", source):
+            self.assertGreater(int(divisor), 0)
+
+    def test_invalid_options(self):
+        for options in ({"variables": 0}, {"statements": -1}, {"block_size": 0},
+                        {"operators": "%"}, {"operators": ""}):
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    ProgramGenerator(**options)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Unit tests for execution hooks.
+"""
+
+import io
+import os
+import sys
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.hooks import Hooks
+
+# Calls a function that prints 7, then loops until the counter at 16 is zero
+PROGRAM = [
+    ("LDA", 2), ("STA", 16),                                   # 0-1
+    ("CALL", 11),                                              # 2
+    ("LDA_MEM", 16), ("LDB", 1), ("SUB", None), ("STA", 16),   # 3-6
+    ("LDB", 0), ("CMP", None), ("JNZ", 2),                     # 7-9
+    ("HALT", None),                                            # 10
+    ("LDA", 7), ("STA", 0xF1), ("RET", None),                  # 11-13
+]
+
+
+class TestHooks(unittest.TestCase):
+    """Tests for the hook registry and the hooked execution loop."""
+
+    def setUp(self):
+        self.computer = Computer()
+        self.computer.load_program(PROGRAM)
+        self.events = []
+
+    def record(self, event):
+        def callback(*args):
+            self.events.append((event,) + args)
+        self.computer.hooks.add(event, callback)
+        return callback
+
+    def test_instruction_hook(self):
+        """Instruction hooks see every instruction, unfused, in order."""
+        self.record("instruction")
+        self.computer.run()
+        pcs = [pc for _, pc in self.events]
+        self.assertEqual(pcs[:6], [0, 1, 2, 11, 12, 13])
+        self.assertEqual(len(pcs), 2 + 2 * 11 + 1)
+        self.assertEqual(self.computer.get_all_outputs(), [7, 7])
+
+    def test_branch_hook(self):
+        """Branch hooks report the target and whether the branch was taken."""
+        self.record("branch")
+        self.computer.run()
+        self.assertEqual(self.events, [("branch", 9, 2, True), ("branch", 9, 10, False)])
+
+    def test_write_hook(self):
+        """Write hooks see stores to memory and to devices."""
+        self.record("write")
+        self.computer.run()
+        self.assertEqual(self.events[:3], [("write", 1, 16, 2), ("write", 12, 0xF1, 7),
+                                           ("write", 6, 16, 1)])
+
+    def test_call_and_return_hooks(self):
+        """Call and return hooks report where control went."""
+        self.record("call")
+        self.record("return")
+        self.computer.run()
+        self.assertEqual(self.events[:2], [("call", 2, 11), ("return", 13, 3)])
+        self.assertEqual(len(self.events), 4)
+
+    def test_stop_before_instruction(self):
+        """An instruction hook can stop the program before an instruction runs."""
+        def stop(pc):
+            if pc == 12:
+                self.computer.cpu.running = False
+        self.computer.hooks.add("instruction", stop)
+        self.computer.run()
+        self.assertEqual(self.computer.cpu.pc, 12)
+        self.assertEqual(self.computer.get_all_outputs(), [])
+
+    def test_max_steps(self):
+        """The hooked loop counts every instruction towards max_steps."""
+        self.record("instruction")
+        self.assertEqual(self.computer.run(max_steps=4), 4)
+        self.assertEqual(len(self.events), 4)
+
+    def test_engines(self):
+        """With hooks, every engine runs the program on the hooked loop."""
+        for engine in Computer.ENGINES:
+            with self.subTest(engine=engine):
+                computer = Computer(engine=engine)
+                computer.load_program(PROGRAM)
+                pcs = []
+                computer.hooks.add("instruction", pcs.append)
+                computer.run()
+                self.assertEqual(len(pcs), 25)
+                self.assertEqual(computer.get_all_outputs(), [7, 7])
+
+    def test_remove(self):
+        """Removing the last hook returns to the normal loop."""
+        callback = self.record("instruction")
+        self.assertTrue(self.computer.hooks)
+        self.computer.hooks.remove("instruction", callback)
+        self.assertFalse(self.computer.hooks)
+        self.computer.run()
+        self.assertEqual(self.events, [])
+
+    def test_unknown_event(self):
+        """Only known events can be hooked."""
+        with self.assertRaises(ValueError):
+            Hooks().add("jump", print)
+
+    def test_trace(self):
+        """trace() prints every instruction and output and removes its hooks."""
+        out = io.StringIO()
+        self.computer.trace(file=out)
+        text = out.getvalue()
+        self.assertEqual(text.count("Executing:"), 25)
+        self.assertIn("PC: 11, Executing: LDA 7", text)
+        self.assertEqual(text.count("Output: 7"), 2)
+        self.assertFalse(self.computer.hooks)
+
+
+if __name__ == '__main__':
+    unittest.main()
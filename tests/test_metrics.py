@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Unit tests for execution metrics, and the recorded metrics of the examples.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.metrics import Metrics, measure, measure_source
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+# Metrics of the examples. Update them when a compiler change is meant to
+# change the generated code (python3 -m src.metrics examples/...), and check
+# why they changed when it is not. calculator.ss is written in another
+# dialect (endif, < and >), and functions.ss compares with >; neither
+# compiles.
+EXPECTED = {
+    "calculator.txt": Metrics(instructions=37, stack_high_water=0, memory_touched=5, halted=True),
+    "division_test.ss": Metrics(instructions=47, stack_high_water=0, memory_touched=14, halted=True),
+    "example_program.txt": Metrics(instructions=109, stack_high_water=0, memory_touched=7, halted=True),
+    "fibonacci.txt": Metrics(instructions=162, stack_high_water=0, memory_touched=5, halted=True),
+    "function_test.ss": Metrics(instructions=64, stack_high_water=1, memory_touched=11, halted=True),
+    "if_test.txt": Metrics(instructions=21, stack_high_water=0, memory_touched=4, halted=True),
+    "nested_test.txt": Metrics(instructions=214, stack_high_water=0, memory_touched=7, halted=True),
+    "simple_test.txt": Metrics(instructions=15, stack_high_water=0, memory_touched=4, halted=True),
+    "while_test.txt": Metrics(instructions=60, stack_high_water=0, memory_touched=2, halted=True),
+}
+
+# Calls a function that pushes a value and prints 7, twice
+PROGRAM = [
+    ("LDA", 2), ("STA", 16),                                   # 0-1
+    ("CALL", 11),                                              # 2
+    ("LDA_MEM", 16), ("LDB", 1), ("SUB", None), ("STA", 16),   # 3-6
+    ("LDB", 0), ("CMP", None), ("JNZ", 2),                     # 7-9
+    ("HALT", None),                                            # 10
+    ("PUSH", None), ("POP_PARAM", None),                       # 11-12
+    ("LDA", 7), ("STA", 0xF1), ("RET", None),                  # 13-15
+]
+
+
+class TestMeasure(unittest.TestCase):
+    """Tests for measure()."""
+
+    def test_metrics(self):
+        computer = Computer()
+        computer.load_program(PROGRAM)
+        metrics = measure(computer)
+        self.assertEqual(metrics, Metrics(2 + 2 * 13 + 1, 2, 2, True))
+        self.assertEqual(computer.get_all_outputs(), [7, 7])
+        self.assertFalse(computer.hooks)
+
+    def test_engines(self):
+        """Metrics do not depend on the engine or on fusion."""
+        for engine in Computer.ENGINES:
+            with self.subTest(engine=engine):
+                computer = Computer(engine=engine)
+                computer.load_program(PROGRAM)
+                self.assertEqual(measure(computer).instructions, 29)
+
+    def test_max_steps(self):
+        computer = Computer()
+        computer.load_program(PROGRAM)
+        self.assertEqual(measure(computer, max_steps=3), Metrics(3, 1, 1, False))
+
+
+class TestExampleMetrics(unittest.TestCase):
+    """Checks that the code generated for the examples does not grow unnoticed."""
+
+    def test_examples(self):
+        for name, expected in EXPECTED.items():
+            with self.subTest(example=name):
+                with open(os.path.join(EXAMPLES, name)) as f:
+                    metrics = measure_source(f.read())
+                self.assertEqual(metrics, expected,
+                                 f"{name} now runs with {metrics}; if the change is intended, "
+                                 f"update EXPECTED in tests/test_metrics.py")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the .ssb object file format.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.objfile import write_ssb, read_ssb, is_ssb
+from src.compiler import SimpleCompiler
+from src.computer import Computer
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+
+class TestObjectFile(unittest.TestCase):
+    """Tests for writing and reading .ssb files."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "program.ssb")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """A compiled program and its symbols survive a round trip."""
+        compiler = SimpleCompiler()
+        with open(os.path.join(EXAMPLES, "simple_test.txt")) as f:
+            program = compiler.compile(f.read())
+        write_ssb(self.path, program, compiler.symbol_table())
+
+        obj = read_ssb(self.path)
+        self.assertEqual(obj.program, program)
+        self.assertEqual(obj.symbols["variables"], compiler.variables)
+        self.assertIsNone(obj.source_map)
+
+    def test_operand_range(self):
+        """None, negative and 64-bit operands are stored exactly."""
+        program = [("LDA", -5), ("LDB", (1 << 63) - 1), ("LDA", -(1 << 63)), ("HALT", None)]
+        write_ssb(self.path, program)
+        self.assertEqual(read_ssb(self.path).program, program)
+
+    def test_source_map(self):
+        """An optional source map is stored with the program."""
+        program = [("LDA", 1), ("HALT", None)]
+        write_ssb(self.path, program, source_map=[["a.ss", 1, None], ["a.ss", 2, None]])
+        self.assertEqual(read_ssb(self.path).source_map, [("a.ss", 1, None), ("a.ss", 2, None)])
+
+    def test_rejects_unstorable_programs(self):
+        """Labels, big integers and unknown instructions cannot be written."""
+        for program in ([("JMP", "L0")], [("LDA", 1 << 64)], [("NOP", None)]):
+            with self.subTest(program=program):
+                with self.assertRaises(ValueError):
+                    write_ssb(self.path, program)
+
+    def test_rejects_other_files(self):
+        """Files without the magic number are not object files."""
+        with open(self.path, "w") as f:
+            f.write("x = 1\n")
+        self.assertFalse(is_ssb(self.path))
+        with self.assertRaises(ValueError):
+            read_ssb(self.path)
+
+    def test_empty_file(self):
+        """An empty file is not an object file."""
+        open(self.path, "wb").close()
+        with self.assertRaises(ValueError):
+            read_ssb(self.path)
+
+    def test_computer_load_file(self):
+        """A computer runs a program loaded from an object file."""
+        program = [("LDA", 6), ("LDB", 7), ("MUL", None), ("STA", 0xF1), ("HALT", None)]
+        write_ssb(self.path, program)
+        self.assertTrue(is_ssb(self.path))
+        computer = Computer()
+        computer.load_file(self.path)
+        computer.run()
+        self.assertEqual(computer.get_all_outputs(), [42])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Unit tests for streaming outputs and output sinks.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.bus import OutputBuffer
+from src.computer import Computer
+
+# Print the numbers from 1 to 5
+COUNT_UP = [
+    ("LDA", 0),
+    ("STA", 16),
+    ("LDA_MEM", 16),
+    ("LDB", 1),
+    ("ADD", None),
+    ("STA", 16),
+    ("STA", 0xF1),
+    ("LDB", 5),
+    ("CMP", None),
+    ("JNZ", 2),
+    ("HALT", None),
+]
+
+# Print 1, 2, 3, ... forever
+FOREVER = [
+    ("LDA", 0),
+    ("STA", 16),
+    ("LDA_MEM", 16),
+    ("LDB", 1),
+    ("ADD", None),
+    ("STA", 16),
+    ("STA", 0xF1),
+    ("JMP", 2),
+]
+
+
+class TestIterOutputs(unittest.TestCase):
+    """Tests for Computer.iter_outputs."""
+
+    def test_yields_every_output(self):
+        """Every output is yielded in order, with every engine."""
+        for engine in Computer.ENGINES:
+            with self.subTest(engine=engine):
+                computer = Computer(engine=engine)
+                computer.load_program(COUNT_UP)
+                self.assertEqual(list(computer.iter_outputs()), [1, 2, 3, 4, 5])
+                self.assertFalse(computer.cpu.running)
+
+    def test_stops_after_each_output(self):
+        """The program does not run ahead of the consumer."""
+        computer = Computer()
+        computer.load_program(COUNT_UP)
+        outputs = computer.iter_outputs()
+        self.assertEqual(next(outputs), 1)
+        self.assertEqual(computer.memory.read(16), 1)
+        self.assertEqual(next(outputs), 2)
+        self.assertEqual(computer.memory.read(16), 2)
+
+    def test_endless_program(self):
+        """Outputs of a program that never halts can be consumed one by one."""
+        for engine in Computer.ENGINES:
+            with self.subTest(engine=engine):
+                computer = Computer(engine=engine, output_sink=OutputBuffer(0))
+                computer.load_program(FOREVER)
+                values = []
+                for value in computer.iter_outputs():
+                    values.append(value)
+                    if len(values) == 100:
+                        break
+                self.assertEqual(values, list(range(1, 101)))
+                self.assertEqual(len(computer.get_all_outputs()), 0)
+
+    def test_resume_after_close(self):
+        """Closing the generator leaves the computer ready to resume."""
+        computer = Computer()
+        computer.load_program(COUNT_UP)
+        outputs = computer.iter_outputs()
+        next(outputs)
+        outputs.close()
+        self.assertFalse(computer.is_finished())
+        computer.resume()
+        self.assertEqual(computer.get_all_outputs(), [1, 2, 3, 4, 5])
+
+    def test_run_does_not_pause(self):
+        """A plain run after iter_outputs runs to completion."""
+        computer = Computer()
+        computer.load_program(COUNT_UP)
+        list(computer.iter_outputs())
+        computer.run()
+        self.assertEqual(computer.get_all_outputs(), [1, 2, 3, 4, 5] * 2)
+
+
+class TestOutputBuffer(unittest.TestCase):
+    """Tests for the bounded output sink."""
+
+    def test_keeps_most_recent(self):
+        """Only the most recent values are kept."""
+        buffer = OutputBuffer(3)
+        buffer.extend(range(10))
+        self.assertEqual(list(buffer), [7, 8, 9])
+        self.assertEqual(buffer[-1], 9)
+        self.assertEqual(buffer.total, 10)
+
+    def test_drain(self):
+        """Draining returns and removes the kept values."""
+        buffer = OutputBuffer(5)
+        buffer.extend([1, 2])
+        self.assertEqual(buffer.drain(), [1, 2])
+        self.assertEqual(len(buffer), 0)
+
+    def test_computer_sink(self):
+        """A computer writes its outputs to the given sink."""
+        buffer = OutputBuffer(2)
+        computer = Computer(output_sink=buffer)
+        computer.load_program(COUNT_UP)
+        computer.run()
+        self.assertEqual(list(computer.get_all_outputs()), [4, 5])
+        self.assertEqual(computer.get_output(), 5)
+        self.assertEqual(buffer.total, 5)
+
+    def test_negative_length(self):
+        """A negative maximum length is rejected."""
+        with self.assertRaises(ValueError):
+            OutputBuffer(-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
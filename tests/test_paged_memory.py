@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the sparse paged memory and the compiler's data segment.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.memory import PagedMemory, PAGE_SIZE
+from src.compiler import SimpleCompiler
+from src.computer import Computer
+
+
+def many_variables_source(count):
+    """A program that assigns count variables and prints their sum."""
+    lines = [f"v{i} = {i}" for i in range(count)]
+    lines.append("total = 0")
+    lines.extend(f"total = total + v{i}" for i in range(count))
+    lines.append("print total")
+    return "\n".join(lines)
+
+
+class TestPagedMemory(unittest.TestCase):
+    """Tests for PagedMemory."""
+
+    def test_lazy_pages(self):
+        """Pages are allocated by the first write only."""
+        memory = PagedMemory()
+        self.assertEqual(memory.size, 1 << 32)
+        self.assertEqual(memory.read(123456789), 0)
+        self.assertEqual(memory.allocated_pages(), 0)
+        memory.write(123456789, 7)
+        memory.write(123456790, 8)
+        self.assertEqual(memory.allocated_pages(), 1)
+        self.assertEqual(memory.read(123456789), 7)
+        memory.write((1 << 32) - 1, 9)
+        self.assertEqual(memory.allocated_pages(), 2)
+
+    def test_bounds(self):
+        """Addresses outside the address space raise IndexError."""
+        memory = PagedMemory(1 << 20)
+        with self.assertRaises(IndexError):
+            memory.read(1 << 20)
+        with self.assertRaises(IndexError):
+            memory.write(-1, 0)
+
+    def test_snapshot_restore(self):
+        """Restoring frees pages allocated after the snapshot."""
+        memory = PagedMemory()
+        memory.write(10, 1)
+        snapshot = memory.snapshot()
+        memory.write(10, 2)
+        memory.write(10 * PAGE_SIZE, 3)
+        memory.restore(snapshot)
+        self.assertEqual(memory.read(10), 1)
+        self.assertEqual(memory.read(10 * PAGE_SIZE), 0)
+        self.assertEqual(memory.allocated_pages(), 1)
+
+    def test_snapshots_share_pages(self):
+        """Consecutive snapshots share pages that did not change."""
+        memory = PagedMemory()
+        memory.write(0, 1)
+        memory.write(PAGE_SIZE, 2)
+        first = memory.snapshot()
+        memory.write(PAGE_SIZE, 3)
+        second = memory.snapshot()
+        self.assertIs(first.pages[0], second.pages[0])
+        self.assertIsNot(first.pages[1], second.pages[1])
+
+
+class TestDataSegment(unittest.TestCase):
+    """Tests for compiling into a configurable data segment."""
+
+    def test_default_segment_full(self):
+        """The default segment stops below the I/O addresses."""
+        with self.assertRaises(ValueError):
+            SimpleCompiler().compile(many_variables_source(300))
+
+    def test_overlapping_segment(self):
+        """A data segment may not overlap the I/O addresses."""
+        with self.assertRaises(ValueError):
+            SimpleCompiler(data_start=0x80, data_end=0x100)
+        with self.assertRaises(ValueError):
+            SimpleCompiler(data_start=16, data_end=16)
+
+    def test_large_program_on_paged_memory(self):
+        """A program with many variables runs on paged memory with every engine."""
+        compiler = SimpleCompiler(data_start=0x10000000, data_end=1 << 32)
+        program = compiler.compile(many_variables_source(1000))
+        for engine in Computer.ENGINES:
+            with self.subTest(engine=engine):
+                computer = Computer(engine=engine, memory=PagedMemory())
+                computer.load_program(program)
+                computer.run()
+                self.assertEqual(computer.get_all_outputs(), [sum(range(1000))])
+                # 1001 variables plus the page holding the I/O addresses
+                self.assertLessEqual(computer.memory.allocated_pages(), 1001 // PAGE_SIZE + 2)
+
+    def test_fork_keeps_paged_memory(self):
+        """Snapshots and forks work on paged memory."""
+        computer = Computer(memory=PagedMemory())
+        computer.load_program([("LDA", 5), ("STA", 1 << 31), ("HALT", None)])
+        computer.run()
+        child = computer.fork()
+        self.assertIsInstance(child.memory, PagedMemory)
+        self.assertEqual(child.memory.read(1 << 31), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
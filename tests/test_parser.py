@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript tokenizer and parser.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.parser import (
+    parse, tokenize, Assign, BinaryOp, Call, Compare, ExprStatement, FunctionDef,
+    If, Name, Number, Print, Return, While,
+)
+
+
+class TestTokenizer(unittest.TestCase):
+    """Tests for tokenize()."""
+
+    def kinds(self, source):
+        return [kind for kind, _, _ in tokenize(source)]
+
+    def test_tokens(self):
+        tokens = tokenize("x = y1 + 42  # comment\n")
+        self.assertEqual(tokens, [("NAME", "x", 1), ("=", "=", 1), ("NAME", "y1", 1),
+                                  ("+", "+", 1), ("NUMBER", 42, 1), ("NEWLINE", None, 1),
+                                  ("EOF", None, 1)])
+
+    def test_keywords(self):
+        self.assertEqual(self.kinds("while x != 0\n  print x\n")[:4], ["while", "NAME", "!=", "NUMBER"])
+
+    def test_indentation(self):
+        """Indentation changes become INDENT and DEDENT, blank lines and comments are skipped."""
+        source = "if a == 1\n  if b == 2\n\n    # note\n    x = 1\ny = 2\n"
+        kinds = self.kinds(source)
+        self.assertEqual(kinds.count("INDENT"), 2)
+        self.assertEqual(kinds.count("DEDENT"), 2)
+        self.assertEqual(kinds[-7:], ["DEDENT", "DEDENT", "NAME", "=", "NUMBER", "NEWLINE", "EOF"])
+        self.assertEqual(tokenize(source)[-2], ("NEWLINE", None, 6))
+
+    def test_blocks_closed_at_end(self):
+        self.assertEqual(self.kinds("while x != 0\n  x = 0")[-3:], ["NEWLINE", "DEDENT", "EOF"])
+
+    def test_indented_program(self):
+        """The first line of code sets the base indentation."""
+        self.assertEqual(self.kinds("    x = 1\n    print x\n").count("INDENT"), 0)
+
+    def test_line_numbers(self):
+        self.assertEqual(tokenize("\n\n# c\nprint 1\n")[0], ("print", "print", 4))
+
+    def test_errors(self):
+        for source in ("x = 1 $ 2\n", "if x == 1\n    x = 1\n  x = 2\n", "  x = 1\ny = 2\n"):
+            with self.subTest(source=source):
+                with self.assertRaises(SyntaxError):
+                    tokenize(source)
+
+
+class TestParser(unittest.TestCase):
+    """Tests for parse()."""
+
+    def test_statements(self):
+        program = parse("x = 1\nprint x\nf(x)\n")
+        self.assertEqual(program.body, [
+            Assign("x", Number(1, 1), 1),
+            Print(Name("x", 2), 2),
+            ExprStatement(Call("f", [Name("x", 3)], 3), 3),
+        ])
+
+    def test_precedence(self):
+        """* and / bind tighter than + and -, and operators are left-associative."""
+        value = parse("x = 1 - 2 - 3 * (4 + y) / -5\n").body[0].value
+        self.assertEqual(value, BinaryOp(
+            "-", BinaryOp("-", Number(1, 1), Number(2, 1), 1),
+            BinaryOp("/", BinaryOp("*", Number(3, 1),
+                                   BinaryOp("+", Number(4, 1), Name("y", 1), 1), 1),
+                     Number(-5, 1), 1), 1))
+
+    def test_nested_blocks(self):
+        source = """
+i = 0
+while i != 3
+  if i == 1
+    print 1
+  else
+    if i == 2
+      print 2
+  i = i + 1
+print 9
+"""
+        program = parse(source)
+        self.assertEqual(len(program.body), 3)
+        loop = program.body[1]
+        self.assertIsInstance(loop, While)
+        self.assertEqual(loop.test, Compare("!=", Name("i", 3), Number(3, 3), 3))
+        condition, increment = loop.body
+        self.assertIsInstance(condition, If)
+        self.assertEqual(condition.body, [Print(Number(1, 5), 5)])
+        self.assertIsInstance(condition.orelse[0], If)
+        self.assertEqual(condition.orelse[0].orelse, [])
+        self.assertEqual(increment.line, 9)
+        self.assertEqual(program.body[2], Print(Number(9, 10), 10))
+
+    def test_functions(self):
+        source = "def add(a, b)\n  return a + b\nprint add(1, 2)\ndef none():\n  return\n"
+        program = parse(source)
+        self.assertEqual(program.functions[0], FunctionDef(
+            "add", ["a", "b"], [Return(BinaryOp("+", Name("a", 2), Name("b", 2), 2), 2)], 1))
+        self.assertEqual(program.functions[1].params, [])
+        self.assertEqual(program.functions[1].body, [Return(None, 5)])
+        self.assertEqual(program.body, [Print(Call("add", [Number(1, 3), Number(2, 3)], 3), 3)])
+
+    def test_optional_colons(self):
+        program = parse("if x == 1:\n    y = 1\nelse:\n    y = 2\n")
+        self.assertEqual(len(program.body[0].orelse), 1)
+
+    def test_errors(self):
+        """Syntax errors carry the line they were found on."""
+        cases = {
+            "x = 1\nif x < 2\n  x = 1\n": 2,
+            "x = 1\nelse\n  x = 2\n": 2,
+            "if x == 1\nx = 2\n": 2,
+            "if x == 1\n  def f()\n    return 1\n": 2,
+            "x = (1 + 2\n": 1,
+            "x = 1 +\n": 1,
+            "x + 1\n": 1,
+            "f(x) + 1\n": 1,
+            "x = 1\n  y = 2\n": 2,
+            "def f(a, a)\n  return a\n": 1,
+        }
+        for source, line in cases.items():
+            with self.subTest(source=source):
+                with self.assertRaises(SyntaxError) as context:
+                    parse(source, "bad.ss")
+                self.assertEqual(context.exception.lineno, line)
+                self.assertEqual(context.exception.filename, "bad.ss")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript profiler.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.compiler import SourceLocation
+from src.computer import Computer
+from src.profiler import MAIN
+
+
+def countdown(count):
+    """Return a program that calls f count times, and its source map."""
+    program = [
+        ("LDA", count), ("STA", 16),                            # 1: n = count
+        ("CALL", 11),                                           # 2: f()
+        ("LDA_MEM", 16), ("LDB", 1), ("SUB", None), ("STA", 16),  # 3: n = n - 1
+        ("LDB", 0), ("CMP", None), ("JNZ", 2),                  # 4: while n != 0
+        ("HALT", None),
+        ("LDA", 7), ("STA", 0xF1),                              # 6: print 7
+        ("RET", None),                                          # 7: end of f
+    ]
+    lines = [1, 1, 2, 3, 3, 3, 3, 4, 4, 4, None, 6, 6, 7]
+    functions = [None] * 11 + ["f"] * 3
+    source_map = [SourceLocation("t.ss", line, function)
+                  for line, function in zip(lines, functions)]
+    return program, source_map
+
+
+class TestProfiler(unittest.TestCase):
+    """Tests for Computer.run(profile=True)."""
+
+    def setUp(self):
+        self.computer = Computer()
+        self.computer.load_program(*countdown(3))
+        self.profile = self.computer.run(profile=True)
+
+    def test_program_runs(self):
+        """Profiling does not change what the program does."""
+        self.assertEqual(self.computer.get_all_outputs(), [7, 7, 7])
+        self.assertEqual(self.profile.total, 2 + 3 * 11 + 1)
+
+    def test_pc_and_opcode_counts(self):
+        """Instructions are counted per pc and per opcode."""
+        counts = self.profile.pc_counts()
+        self.assertEqual(counts[0], 1)
+        self.assertEqual(counts[2], 3)
+        self.assertEqual(counts[13], 3)
+        opcodes = self.profile.opcode_counts()
+        self.assertEqual(opcodes["CALL"], 3)
+        self.assertEqual(opcodes["STA"], 1 + 3 + 3)
+
+    def test_line_counts(self):
+        """Instructions are counted per source line."""
+        lines = self.profile.line_counts()
+        self.assertEqual(lines["t.ss:3"], 12)
+        self.assertEqual(lines["t.ss:6 in f"], 6)
+
+    def test_function_counts(self):
+        """Callees count towards the caller's inclusive total only."""
+        inclusive, exclusive = self.profile.function_counts()
+        self.assertEqual(exclusive["f"], 9)
+        self.assertEqual(inclusive["f"], 9)
+        self.assertEqual(exclusive[MAIN], self.profile.total - 9)
+        self.assertEqual(inclusive[MAIN], self.profile.total)
+
+    def test_collapsed_stacks(self):
+        """Collapsed stacks list the call stack and source line of every count."""
+        lines = self.profile.collapsed()
+        self.assertIn(f"{MAIN};f;t.ss:6 6", lines)
+        self.assertIn(f"{MAIN};t.ss:3 12", lines)
+        self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines), self.profile.total)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.folded")
+            self.profile.write_collapsed(path)
+            with open(path) as f:
+                self.assertEqual(f.read().splitlines(), lines)
+
+    def test_report(self):
+        """The report lists functions, lines and opcodes."""
+        report = self.profile.report()
+        self.assertIn("t.ss:3", report)
+        self.assertIn("CALL", report)
+        self.assertIn(" f\n", report)
+
+    def test_without_source_map(self):
+        """Without a source map, functions are named after their address."""
+        computer = Computer(engine="blocks")
+        computer.load_program(countdown(2)[0])
+        profile = computer.run(profile=True)
+        self.assertEqual(profile.function_counts()[1]["<11>"], 6)
+        self.assertEqual(profile.line_counts()["pc 2"], 2)
+
+    def test_wall_clock_samples(self):
+        """The sampler records where a long run spends its time."""
+        computer = Computer()
+        computer.load_program(*countdown(20000))
+        computer.start()
+        profile = computer.profile(sample_interval=0.0005)
+        self.assertGreater(sum(profile.samples.values()), 0)
+        self.assertTrue(all(stack[0] == MAIN for stack, _ in profile.samples))
+
+    def test_max_steps(self):
+        """The profiler stops after max_steps instructions."""
+        computer = Computer()
+        computer.load_program(*countdown(3))
+        self.assertEqual(computer.run(max_steps=5, profile=True).total, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript scheduler.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.scheduler import Scheduler, READY, SUSPENDED, FINISHED, FAILED
+
+ENDLESS = [("LDA", 1), ("JMP", 0)]
+
+
+def counter_program(count):
+    """Print count, count - 1, ..., 1 and halt."""
+    return [
+        ("LDA", count),
+        ("STA", 16),
+        ("LDA_MEM", 16),   # 2: loop head
+        ("STA", 0xF1),
+        ("LDB", 1),
+        ("SUB", None),
+        ("STA", 16),
+        ("LDB", 0),
+        ("CMP", None),
+        ("JNZ", 2),
+        ("HALT", None),
+    ]
+
+
+def computer_for(program):
+    computer = Computer(fuse_instructions=False)
+    computer.load_program(program)
+    return computer
+
+
+class TestScheduler(unittest.TestCase):
+    """Tests for time slicing, priorities and suspension."""
+
+    def test_jobs_run_to_completion(self):
+        """All jobs finish with the same outputs as running them alone."""
+        scheduler = Scheduler(quantum=5)
+        jobs = [scheduler.add(computer_for(counter_program(n))) for n in (3, 10, 1)]
+        scheduler.run()
+
+        for job, n in zip(jobs, (3, 10, 1)):
+            self.assertEqual(job.state, FINISHED)
+            self.assertEqual(job.computer.outputs, list(range(n, 0, -1)))
+        self.assertGreater(jobs[1].slices, jobs[2].slices)
+
+    def test_runaway_job_does_not_starve_others(self):
+        """An endless program only gets one quantum per turn."""
+        scheduler = Scheduler(quantum=10)
+        runaway = scheduler.add(computer_for(ENDLESS), name="runaway")
+        job = scheduler.add(computer_for(counter_program(5)))
+
+        while job.state != FINISHED:
+            scheduler.step()
+
+        self.assertEqual(runaway.state, READY)
+        self.assertLessEqual(runaway.slices, job.slices + 1)
+        self.assertEqual(runaway.steps, runaway.slices * 10)
+
+    def test_priority_policy(self):
+        """Higher priority jobs run first."""
+        scheduler = Scheduler(quantum=1000, policy="priority")
+        low = scheduler.add(computer_for(counter_program(2)), priority=0)
+        high = scheduler.add(computer_for(counter_program(2)), priority=5)
+        self.assertIs(scheduler.step(), high)
+        self.assertEqual(high.state, FINISHED)
+        self.assertEqual(low.slices, 0)
+
+    def test_suspend_and_resume(self):
+        """Suspended jobs are skipped until resumed."""
+        scheduler = Scheduler(quantum=4)
+        job = scheduler.add(computer_for(counter_program(4)))
+        scheduler.step()
+        scheduler.suspend(job)
+        scheduler.run()
+        self.assertEqual(job.state, SUSPENDED)
+        self.assertEqual(job.slices, 1)
+
+        scheduler.resume(job)
+        scheduler.resume(job)
+        scheduler.run()
+        self.assertEqual(job.state, FINISHED)
+        self.assertEqual(job.computer.outputs, [4, 3, 2, 1])
+
+    def test_failing_job(self):
+        """A job raising an error is marked failed and the others continue."""
+        scheduler = Scheduler(quantum=10)
+        bad = scheduler.add(computer_for([("LDA_MEM", 999), ("HALT", None)]))
+        good = scheduler.add(computer_for(counter_program(2)))
+        scheduler.run()
+        self.assertEqual(bad.state, FAILED)
+        self.assertIsInstance(bad.error, IndexError)
+        self.assertEqual(good.state, FINISHED)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            Scheduler(quantum=0)
+        with self.assertRaises(ValueError):
+            Scheduler(policy="lottery")
+
+
+if __name__ == "__main__":
+    unittest.main()
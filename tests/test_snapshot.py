@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit tests for SimpleScript computer snapshots and forks.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.memory import Memory, PAGE_SIZE
+
+# Adds the input to a running total three times, printing the total each time
+ACCUMULATE = [
+    ("LDA", 3),
+    ("STA", 16),
+    ("LDA_MEM", 17),       # 2: loop head
+    ("LDB_MEM", 0xF0),
+    ("ADD", None),
+    ("STA", 17),
+    ("STA", 0xF1),
+    ("LDA_MEM", 16),
+    ("LDB", 1),
+    ("SUB", None),
+    ("STA", 16),
+    ("LDB", 0),
+    ("CMP", None),
+    ("JNZ", 2),
+    ("HALT", None),
+]
+
+
+class TestMemorySnapshot(unittest.TestCase):
+    """Tests for page-granular memory snapshots."""
+
+    def test_unchanged_pages_are_shared(self):
+        """A second snapshot copies only the pages written in between."""
+        memory = Memory(4 * PAGE_SIZE)
+        first = memory.snapshot()
+        memory.write(PAGE_SIZE + 3, 7)
+        second = memory.snapshot()
+
+        self.assertIsNot(second.pages[1], first.pages[1])
+        for page in (0, 2, 3):
+            self.assertIs(second.pages[page], first.pages[page])
+        self.assertEqual(second.pages[1][3], 7)
+
+    def test_restore(self):
+        """Restoring undoes writes made after the snapshot."""
+        memory = Memory(2 * PAGE_SIZE)
+        memory.write(5, 1)
+        snapshot = memory.snapshot()
+        memory.write(5, 2)
+        memory.write(PAGE_SIZE, 3)
+        memory.restore(snapshot)
+
+        self.assertEqual(memory.read(5), 1)
+        self.assertEqual(memory.read(PAGE_SIZE), 0)
+
+
+class TestComputerSnapshot(unittest.TestCase):
+    """Tests for Computer.snapshot(), restore() and fork()."""
+
+    def setUp(self):
+        # Without fusion, step limits count individual instructions
+        self.computer = Computer(fuse_instructions=False)
+        self.computer.load_program(ACCUMULATE)
+        self.computer.set_input(5)
+
+    def test_restore_and_resume(self):
+        """Resuming from a restored snapshot repeats the same execution."""
+        self.computer.run(max_steps=10)
+        snapshot = self.computer.snapshot()
+        self.computer.resume()
+        first_outputs = list(self.computer.outputs)
+        first_memory = list(self.computer.memory.memory)
+
+        self.computer.restore(snapshot)
+        self.assertEqual(self.computer.cpu.pc, 10)
+        self.computer.resume()
+
+        self.assertEqual(self.computer.outputs, first_outputs)
+        self.assertEqual(self.computer.memory.memory, first_memory)
+        self.assertEqual(first_outputs, [5, 10, 15])
+
+    def test_snapshots_save_new_outputs(self):
+        """A snapshot saves only the outputs written since the previous one."""
+        self.computer.run(max_steps=10)
+        first = self.computer.snapshot()
+        self.computer.resume(max_steps=12)
+        second = self.computer.snapshot()
+        self.assertEqual(first.outputs.values, (5,))
+        self.assertEqual(second.outputs.values, (10,))
+        self.assertIs(second.outputs.previous, first.outputs)
+
+    def test_restore_resets_output_count(self):
+        """Restoring rolls the output count back with the outputs."""
+        self.computer.start()
+        snapshot = self.computer.snapshot()
+        self.computer.resume()
+        self.computer.restore(snapshot)
+        self.assertEqual(self.computer.outputs, [])
+        self.assertEqual(self.computer.output_device.total, 0)
+        self.computer.resume()
+        self.assertEqual(self.computer.outputs, [5, 10, 15])
+        self.assertEqual(self.computer.output_device.total, 3)
+
+    def test_restore_later_snapshot(self):
+        """Restoring a snapshot taken after the current state adds its outputs."""
+        self.computer.start()
+        start = self.computer.snapshot()
+        self.computer.resume(max_steps=22)
+        later = self.computer.snapshot()
+        self.computer.restore(start)
+        self.computer.restore(later)
+        self.assertEqual(self.computer.outputs, [5, 10])
+        self.computer.resume()
+        self.assertEqual(self.computer.outputs, [5, 10, 15])
+
+    def test_fork_runs_independently(self):
+        """Forks continue from the shared prefix with their own inputs."""
+        self.computer.run(max_steps=10)
+        children = [self.computer.fork() for _ in range(2)]
+        children[0].set_input(1)
+        children[1].set_input(100)
+        for child in children:
+            child.resume()
+        self.computer.resume()
+
+        self.assertEqual(self.computer.outputs, [5, 10, 15])
+        self.assertEqual(children[0].outputs, [5, 6, 7])
+        self.assertEqual(children[1].outputs, [5, 105, 205])
+
+    def test_restore_after_diverging(self):
+        """Outputs written after a different restore are replaced."""
+        self.computer.run(max_steps=10)
+        snapshot = self.computer.snapshot()
+        child = self.computer.fork()
+        child.set_input(1)
+        child.resume()
+        self.computer.resume()
+        child.restore(self.computer.snapshot())
+        self.assertEqual(child.outputs, [5, 10, 15])
+        child.restore(snapshot)
+        self.assertEqual(child.outputs, [5])
+
+    def test_fork_shares_pages(self):
+        """A fork shares snapshot pages with its parent."""
+        self.computer.run(max_steps=10)
+        child = self.computer.fork()
+        self.assertIs(child.memory.base, self.computer.memory.base)
+
+    def test_fork_keeps_engine(self):
+        """Forks use the same engine as their parent."""
+        computer = Computer(fuse_instructions=False, engine="blocks")
+        computer.load_program(ACCUMULATE)
+        computer.set_input(2)
+        computer.run(max_steps=7)
+        child = computer.fork()
+        child.resume()
+        self.assertEqual(child.engine, "blocks")
+        self.assertEqual(child.outputs, [2, 4, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
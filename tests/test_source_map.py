@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Unit tests for source maps from compiled instructions to SimpleScript lines.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.compiler import SimpleCompiler, SourceLocation, format_location
+from src.computer import Computer
+from src.objfile import write_ssb
+
+SOURCE = """# Comment
+x = 5
+
+if x == 5
+  y = x + x
+print y
+"""
+
+
+class TestCompilerSourceMap(unittest.TestCase):
+    """Tests for the source map recorded by SimpleCompiler."""
+
+    def setUp(self):
+        self.compiler = SimpleCompiler()
+        self.program = self.compiler.compile(SOURCE, "test.ss")
+        self.source_map = self.compiler.source_map
+
+    def lines(self, function=None):
+        return {location.line for location in self.source_map
+                if location.line is not None and location.function == function}
+
+    def test_one_entry_per_instruction(self):
+        """The source map is parallel to the program."""
+        self.assertEqual(len(self.source_map), len(self.program))
+        self.assertTrue(all(location.file == "test.ss" for location in self.source_map))
+
+    def test_line_numbers(self):
+        """Instructions map to their original line numbers, skipping comments and blanks."""
+        self.assertEqual(self.lines(), {2, 4, 5, 6})
+
+    def test_print_line(self):
+        """The output store maps to the print statement."""
+        stores = [i for i, (instruction, operand) in enumerate(self.program)
+                  if instruction == "STA" and operand == 0xF1]
+        self.assertEqual([self.source_map[i].line for i in stores], [6])
+
+    def test_generated_instructions(self):
+        """Instructions without a source line have no line number."""
+        self.assertEqual(self.source_map[-1], SourceLocation("test.ss", None, None))
+
+    def test_format_location(self):
+        """Locations format as file:line in function."""
+        self.assertEqual(format_location(SourceLocation("a.ss", 3, "f")), "a.ss:3 in f")
+        self.assertEqual(format_location(SourceLocation("a.ss", 3, None)), "a.ss:3")
+        self.assertEqual(format_location(SourceLocation("a.ss", None, None)), "a.ss")
+
+
+class TestRuntimeSourceMap(unittest.TestCase):
+    """Tests for source locations at run time."""
+
+    PROGRAM = [("LDA", 5), ("STA", 300), ("HALT", None)]
+    SOURCE_MAP = [SourceLocation("bad.ss", 1, None), SourceLocation("bad.ss", 2, "store"),
+                  SourceLocation("bad.ss", None, None)]
+
+    def test_error_location(self):
+        """Runtime errors keep their type and carry the failing line."""
+        computer = Computer()
+        computer.load_program(self.PROGRAM, self.SOURCE_MAP)
+        with self.assertRaises(IndexError) as context:
+            computer.run()
+        self.assertEqual(context.exception.source_location, self.SOURCE_MAP[1])
+        if hasattr(context.exception, "__notes__"):
+            self.assertIn("bad.ss:2 in store", context.exception.__notes__[0])
+
+    def test_error_without_source_map(self):
+        """Without a source map errors have no location."""
+        computer = Computer()
+        computer.load_program(self.PROGRAM)
+        with self.assertRaises(IndexError) as context:
+            computer.run()
+        self.assertIsNone(context.exception.source_location)
+
+    def test_location(self):
+        """location() maps program counters to source locations."""
+        computer = Computer()
+        computer.load_program(self.PROGRAM, self.SOURCE_MAP)
+        self.assertEqual(computer.location(), self.SOURCE_MAP[0])
+        self.assertEqual(computer.location(2), self.SOURCE_MAP[2])
+        self.assertIsNone(computer.location(3))
+
+    def test_length_mismatch(self):
+        """A source map must have one entry per instruction."""
+        with self.assertRaises(ValueError):
+            Computer().load_program(self.PROGRAM, self.SOURCE_MAP[:1])
+
+    def test_object_file_round_trip(self):
+        """Source maps are stored in object files and loaded with them."""
+        compiler = SimpleCompiler()
+        program = compiler.compile(SOURCE, "test.ss")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "test.ssb")
+            write_ssb(path, program, compiler.symbol_table(), compiler.source_map)
+            computer = Computer()
+            obj = computer.load_file(path)
+        self.assertEqual(obj.source_map, compiler.source_map)
+        self.assertEqual(computer.source_map, compiler.source_map)
+        computer.run()
+        self.assertEqual(computer.get_all_outputs(), [10])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit tests for time-travel debugging.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.timetravel import Recording
+
+# Counts n at address 16 down from 5, printing it each time
+PROGRAM = [
+    ("LDA", 5), ("STA", 16),                                   # 0-1
+    ("LDA_MEM", 16), ("STA", 0xF1),                            # 2-3
+    ("LDB", 1), ("SUB", None), ("STA", 16),                    # 4-6
+    ("LDB", 0), ("CMP", None), ("JNZ", 2),                     # 7-9
+    ("HALT", None),                                            # 10
+]
+STEPS = 2 + 5 * 8 + 1
+
+
+def state(computer):
+    """Return the observable state of a computer."""
+    cpu = computer.cpu
+    return (cpu.pc, cpu.register_a, cpu.register_b, cpu.zero_flag,
+            computer.memory.read(16), list(computer.outputs))
+
+
+def state_at(step):
+    """Return the state of a fresh run stopped before the given step."""
+    computer = Computer(fuse_instructions=False)
+    computer.load_program(PROGRAM)
+    computer.run(max_steps=step)
+    return state(computer)
+
+
+class TestRecording(unittest.TestCase):
+    """Tests for Computer.record() and Recording."""
+
+    def setUp(self):
+        self.computer = Computer()
+        self.computer.load_program(PROGRAM)
+        self.recording = self.computer.record(interval=4)
+
+    def test_record(self):
+        """Recording runs the whole program and takes periodic checkpoints."""
+        self.assertEqual(self.recording.steps, STEPS)
+        self.assertEqual(self.recording.position, STEPS)
+        self.assertEqual(len(self.recording.checkpoints), (STEPS + 3) // 4)
+        self.assertEqual(self.computer.get_all_outputs(), [5, 4, 3, 2, 1])
+        self.assertFalse(self.computer.hooks)
+
+    def test_goto_any_step(self):
+        """Every step can be reached, backwards and forwards, in any order."""
+        for step in list(range(STEPS, -1, -1)) + [7, 30, 3, 3, STEPS, 0]:
+            with self.subTest(step=step):
+                self.recording.goto(step)
+                self.assertEqual(self.recording.position, step)
+                self.assertEqual(state(self.computer), state_at(step))
+
+    def test_checkpoints_share_outputs(self):
+        """Checkpoints together save each output once."""
+        saved = {}
+        for checkpoint in self.recording.checkpoints:
+            history = checkpoint.outputs
+            while history.previous is not None:
+                saved[id(history)] = history.values
+                history = history.previous
+        self.assertEqual(sorted(sum(saved.values(), ())), [1, 2, 3, 4, 5])
+
+    def test_goto_replays_at_most_interval(self):
+        """Going to a step re-executes fewer instructions than the interval."""
+        executed = []
+        self.computer.hooks.add("instruction", executed.append)
+        self.recording.goto(23)
+        self.assertLess(len(executed), 4)
+        executed.clear()
+        self.recording.goto(22)
+        self.assertLess(len(executed), 4)
+
+    def test_step_back(self):
+        """Reverse-stepping undoes one instruction at a time."""
+        self.recording.goto(10)
+        self.recording.step_back()
+        self.assertEqual(state(self.computer), state_at(9))
+        self.recording.step(3)
+        self.assertEqual(state(self.computer), state_at(12))
+        self.recording.step_back(100)
+        self.assertEqual(self.recording.position, 0)
+
+    def test_write_log(self):
+        """The write log records every store with its step."""
+        writes = self.recording.writes(16)
+        self.assertEqual(writes[0], (1, 1, 5))
+        self.assertEqual([value for _, _, value in writes], [5, 4, 3, 2, 1, 0])
+        self.assertEqual(self.recording.last_write(16, 1), None)
+        self.assertEqual(self.recording.last_write(16, 2), (1, 1, 5))
+        self.assertEqual(self.recording.last_write(0xF1)[2], 1)
+
+    def test_max_steps(self):
+        """Recording can stop early."""
+        computer = Computer()
+        computer.load_program(PROGRAM)
+        recording = computer.record(interval=4, max_steps=10)
+        self.assertEqual(recording.steps, 10)
+        recording.goto(0)
+        self.assertEqual(state(computer), state_at(0))
+        with self.assertRaises(ValueError):
+            recording.goto(11)
+
+    def test_error_keeps_recording(self):
+        """The recording of a failed run is attached to the error."""
+        computer = Computer()
+        computer.load_program([("LDA", 1), ("STA", 16), ("STA", 300), ("HALT", None)])
+        with self.assertRaises(IndexError) as context:
+            computer.record(interval=1)
+        recording = context.exception.recording
+        self.assertEqual(recording.steps, 2)
+        recording.goto(1)
+        self.assertEqual(computer.cpu.register_a, 1)
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            Recording(self.computer, interval=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript tracing engine.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+
+COUNTER = 16
+TOTAL = 17
+
+
+def sum_program(limit):
+    """Sum the numbers limit..1, printing the running total when the counter is 50."""
+    return [
+        ("LDA", limit),
+        ("STA", COUNTER),
+        ("LDA_MEM", TOTAL),        # 2: loop head
+        ("LDB_MEM", COUNTER),
+        ("ADD", None),
+        ("STA", TOTAL),
+        ("LDA_MEM", COUNTER),
+        ("LDB", 50),
+        ("CMP", None),
+        ("JNZ", 12),               # Only print when the counter is 50
+        ("LDA_MEM", TOTAL),
+        ("STA", 0xF1),
+        ("LDA_MEM", COUNTER),      # 12
+        ("LDB", 1),
+        ("SUB", None),
+        ("STA", COUNTER),
+        ("LDB", 0),
+        ("CMP", None),
+        ("JNZ", 2),
+        ("LDA_MEM", TOTAL),
+        ("STA", 0xF1),
+        ("HALT", None),
+    ]
+
+
+def run_with(engine, program, max_steps=None):
+    computer = Computer(engine=engine)
+    computer.load_program(program)
+    steps = computer.run(max_steps=max_steps)
+    return computer, steps
+
+
+class TestTracingEngine(unittest.TestCase):
+    """Tests for hot loop tracing."""
+
+    def assertSameState(self, actual, expected):
+        self.assertEqual(actual.outputs, expected.outputs)
+        self.assertEqual(actual.memory.memory, expected.memory.memory)
+        for name in ("register_a", "register_b", "zero_flag", "carry_flag", "pc", "running"):
+            self.assertEqual(getattr(actual.cpu, name), getattr(expected.cpu, name), name)
+
+    def test_hot_loop_is_traced(self):
+        """A long loop is compiled into a trace and gives the same result."""
+        program = sum_program(1000)
+        expected, _ = run_with("interpreter", program)
+        actual, _ = run_with("tracing", program)
+
+        self.assertSameState(actual, expected)
+        self.assertEqual(actual.outputs[-1], 500500)
+        stats = actual.tracing_engine.stats()
+        self.assertEqual(stats["traces_compiled"], 1)
+        self.assertGreaterEqual(stats["traces_entered"], 1)
+        # Guards fail once for the print at counter 50 and once at the loop exit
+        self.assertEqual(stats["trace_bailouts"], 2)
+
+    def test_guard_failure_falls_back(self):
+        """A branch taken differently than recorded leaves the trace and resumes."""
+        program = sum_program(100)
+        engine = Computer(engine="tracing")
+        engine.load_program(program)
+        engine.tracing_engine.threshold = 1
+        engine.run()
+        expected, _ = run_with("interpreter", program)
+
+        self.assertSameState(engine, expected)
+        self.assertEqual(engine.outputs, expected.outputs)
+        self.assertEqual(engine.tracing_engine.trace_bailouts, 2)
+
+    def test_cold_loop_not_traced(self):
+        """Loops below the threshold stay interpreted."""
+        computer, _ = run_with("tracing", sum_program(10))
+        self.assertEqual(computer.tracing_engine.traces_compiled, 0)
+
+    def test_step_budget(self):
+        """A step budget is respected exactly inside traces."""
+        program = sum_program(1000)
+        expected, expected_steps = run_with("interpreter", program, max_steps=5003)
+        actual, steps = run_with("tracing", program, max_steps=5003)
+        self.assertEqual(steps, expected_steps)
+
+    def test_error_state(self):
+        """An error inside a trace leaves the pc and registers of the failing instruction."""
+        program = [
+            ("LDA_MEM", COUNTER),      # 0: pushes 1..100
+            ("LDB", 1),
+            ("ADD", None),
+            ("STA", COUNTER),
+            ("PUSH", None),
+            ("LDB", 100),
+            ("CMP", None),
+            ("JNZ", 0),
+            ("LDA_MEM", TOTAL),        # 8: pops until the stack underflows
+            ("LDB", 1),
+            ("ADD", None),
+            ("STA", TOTAL),
+            ("POP_PARAM", None),
+            ("LDB", 0),
+            ("CMP", None),
+            ("JZ", 17),
+            ("JMP", 8),
+            ("HALT", None),
+        ]
+        computers = {}
+        for engine in ("interpreter", "tracing"):
+            computer = Computer(engine=engine)
+            computer.load_program(program)
+            with self.assertRaises(IndexError):
+                computer.run()
+            computers[engine] = computer
+        actual, expected = computers["tracing"], computers["interpreter"]
+        self.assertGreater(actual.tracing_engine.traces_entered, 0)
+        self.assertEqual(actual.cpu.pc, 12)
+        for name in ("register_a", "register_b", "zero_flag", "carry_flag", "pc"):
+            self.assertEqual(getattr(actual.cpu, name), getattr(expected.cpu, name), name)
+        self.assertEqual(actual.memory.memory, expected.memory.memory)
+
+    def test_untraceable_loop_aborted(self):
+        """Loops that call functions are not traced."""
+        program = [
+            ("JMP", 2),
+            ("RET", None),
+            ("CALL", 1),         # 2: loop head
+            ("LDA_MEM", COUNTER),
+            ("LDB", 1),
+            ("ADD", None),
+            ("STA", COUNTER),
+            ("LDB", 200),
+            ("CMP", None),
+            ("JNZ", 2),
+            ("HALT", None),
+        ]
+        computer, _ = run_with("tracing", program)
+        self.assertEqual(computer.memory.read(COUNTER), 200)
+        self.assertEqual(computer.tracing_engine.traces_compiled, 0)
+        self.assertEqual(computer.tracing_engine.traces_aborted, 1)
+        # The loop head is no longer counted once its trace is abandoned
+        self.assertEqual(computer.tracing_engine.counts[2], computer.tracing_engine.threshold)
+
+    def test_recording_cut_by_budget_is_retried(self):
+        """A recording stopped by the step budget is tried again later."""
+        computer = Computer(engine="tracing")
+        computer.load_program(sum_program(1000))
+        engine = computer.tracing_engine
+        computer.start()
+        while engine.traces_aborted == 0:
+            computer.resume(max_steps=1)
+        self.assertEqual(engine.traces_compiled, 0)
+        computer.resume()
+        self.assertEqual(engine.traces_compiled, 1)
+        self.assertEqual(computer.outputs[-1], 500500)
+
+
+if __name__ == "__main__":
+    unittest.main()
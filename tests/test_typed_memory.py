@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the fixed-width typed memory backend.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.memory import TypedMemory
+from src.computer import Computer
+
+# Multiply memory[16] by itself three times and print it
+SQUARES = [
+    ("LDA", 1000),
+    ("STA", 16),
+    ("LDA_MEM", 16),
+    ("LDB_MEM", 16),
+    ("MUL", None),
+    ("STA", 16),
+    ("LDA_MEM", 16),
+    ("LDB_MEM", 16),
+    ("MUL", None),
+    ("STA", 16),
+    ("STA", 0xF1),
+    ("HALT", None),
+]
+
+
+def wrap(value, bits):
+    """Reference signed wraparound."""
+    value &= (1 << bits) - 1
+    return value - (1 << bits) if value >= 1 << (bits - 1) else value
+
+
+class TestTypedMemory(unittest.TestCase):
+    """Tests for TypedMemory."""
+
+    def test_write_wraps(self):
+        """Written values wrap around to the word width."""
+        memory = TypedMemory(16, word_bits=8)
+        memory.write(0, 127)
+        memory.write(1, 128)
+        memory.write(2, -129)
+        memory.write(3, 1000)
+        self.assertEqual([memory.read(i) for i in range(4)], [127, -128, 127, wrap(1000, 8)])
+
+    def test_word_widths(self):
+        """Every supported width stores words of that many bits."""
+        for bits in (8, 16, 32, 64):
+            with self.subTest(bits=bits):
+                memory = TypedMemory(4, word_bits=bits)
+                self.assertEqual(memory.memory.itemsize * 8, bits)
+                memory.write(0, 1 << bits)
+                self.assertEqual(memory.read(0), 0)
+
+    def test_unsupported_width(self):
+        """Unsupported widths are rejected."""
+        with self.assertRaises(ValueError):
+            TypedMemory(16, word_bits=12)
+
+    def test_bounds(self):
+        """Out-of-range addresses raise IndexError."""
+        memory = TypedMemory(16)
+        with self.assertRaises(IndexError):
+            memory.read(16)
+        with self.assertRaises(IndexError):
+            memory.write(-1, 0)
+
+
+class TestWraparoundArithmetic(unittest.TestCase):
+    """Tests for programs running on typed memory."""
+
+    def test_mul_wraps_on_every_engine(self):
+        """Products wrap around instead of growing into big integers."""
+        expected = wrap(wrap(1000 * 1000, 32) ** 2, 32)
+        for engine in Computer.ENGINES:
+            for fuse in (False, True):
+                with self.subTest(engine=engine, fuse=fuse):
+                    computer = Computer(engine=engine, fuse_instructions=fuse,
+                                        memory=TypedMemory(256, word_bits=32))
+                    computer.load_program(SQUARES)
+                    computer.run()
+                    self.assertEqual(computer.get_all_outputs(), [expected])
+                    self.assertTrue(computer.cpu.carry_flag)
+
+    def test_carry_flag(self):
+        """Arithmetic sets the carry flag exactly when it overflows."""
+        for engine in Computer.ENGINES:
+            with self.subTest(engine=engine):
+                computer = Computer(engine=engine, memory=TypedMemory(256, word_bits=8))
+                computer.load_program([("LDA", 100), ("LDB", 27), ("ADD", None), ("HALT", None)])
+                computer.run()
+                self.assertEqual(computer.cpu.register_a, 127)
+                self.assertFalse(computer.cpu.carry_flag)
+
+                computer.load_program([("LDA", 100), ("LDB", 28), ("ADD", None), ("HALT", None)])
+                computer.run()
+                self.assertEqual(computer.cpu.register_a, -128)
+                self.assertTrue(computer.cpu.carry_flag)
+
+    def test_immediates_wrap(self):
+        """Immediate values are loaded wrapped to the word width."""
+        computer = Computer(memory=TypedMemory(256, word_bits=16))
+        computer.load_program([("LDA", 70000), ("STA", 0xF1), ("HALT", None)])
+        computer.run()
+        self.assertEqual(computer.get_all_outputs(), [wrap(70000, 16)])
+
+    def test_list_memory_unchanged(self):
+        """The default memory keeps unbounded integers."""
+        computer = Computer()
+        computer.load_program(SQUARES)
+        computer.run()
+        self.assertEqual(computer.get_all_outputs(), [10 ** 12])
+
+    def test_snapshot_and_fork(self):
+        """Snapshots restore typed memory and forks keep the backend."""
+        computer = Computer(memory=TypedMemory(256, word_bits=16))
+        computer.load_program([("LDA", 5), ("STA", 16), ("HALT", None)])
+        computer.run()
+        snapshot = computer.snapshot()
+        computer.memory.write(16, 9)
+        computer.restore(snapshot)
+        self.assertEqual(computer.memory.read(16), 5)
+
+        child = computer.fork()
+        self.assertIsInstance(child.memory, TypedMemory)
+        self.assertEqual(child.memory.word_bits, 16)
+        self.assertEqual(child.memory.read(16), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript vector engine.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.computer import Computer
+from src.vector import VectorComputer, np
+
+# Counts down from the input value, printing each value, then prints 1000 / input
+COUNTDOWN = [
+    ("LDA_MEM", 0xF0),
+    ("STA", 16),
+    ("LDA_MEM", 16),      # 2: loop head
+    ("LDB", 0),
+    ("CMP", None),
+    ("JZ", 12),
+    ("LDA_MEM", 16),
+    ("STA", 0xF1),
+    ("LDB", 1),
+    ("SUB", None),
+    ("STA", 16),
+    ("JMP", 2),
+    ("LDA", 1000),        # 12
+    ("LDB_MEM", 0xF0),
+    ("DIV", None),
+    ("STA", 0xF1),
+    ("HALT", None),
+]
+
+# Calls a function that doubles the input when it is odd-indexed
+CALLS = [
+    ("JMP", 5),
+    ("LDA_MEM", 0xF0),    # 1: double()
+    ("LDB", 2),
+    ("MUL", None),
+    ("RET", None),
+    ("LDA_MEM", 0xF0),    # 5: main
+    ("LDB", 3),
+    ("CMP", None),
+    ("JZ", 10),
+    ("CALL", 1),
+    ("STA", 0xF1),        # 10
+    ("LDA", 7),
+    ("PUSH", None),
+    ("POP_PARAM", None),
+    ("STA", 0xF1),
+    ("HALT", None),
+]
+
+
+def scalar_outputs(program, value):
+    computer = Computer()
+    computer.load_program(program)
+    computer.set_input(value)
+    computer.run()
+    return computer.get_all_outputs()
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestVectorComputer(unittest.TestCase):
+    """Tests that lockstep execution matches the scalar interpreter."""
+
+    def assertMatchesScalar(self, program, inputs):
+        vector = VectorComputer(len(inputs))
+        vector.load_program(program)
+        vector.set_input(inputs)
+        vector.run()
+        expected = [scalar_outputs(program, value) for value in inputs]
+        self.assertEqual(vector.get_all_outputs(), expected)
+        self.assertFalse(vector.running.any())
+
+    def test_uniform_control_flow(self):
+        """Lanes with the same trip count stay in lockstep."""
+        self.assertMatchesScalar(COUNTDOWN, [5, 5, 5])
+
+    def test_divergent_loops(self):
+        """Lanes with different trip counts split and rejoin."""
+        self.assertMatchesScalar(COUNTDOWN, [0, 3, 1, 7, 2])
+
+    def test_calls(self):
+        """CALL, RET, PUSH and POP_PARAM work per lane."""
+        self.assertMatchesScalar(CALLS, [3, 4, 3, 10])
+
+    def test_single_lane(self):
+        """One lane behaves like a scalar computer."""
+        self.assertMatchesScalar(COUNTDOWN, [4])
+
+    def test_step_limit(self):
+        """run() stops after max_steps vector steps."""
+        vector = VectorComputer(2)
+        vector.load_program([("JMP", 0)])
+        self.assertEqual(vector.run(max_steps=10), 10)
+        self.assertTrue(vector.running.all())
+
+    def test_invalid_address_rejected(self):
+        """Memory operands outside memory are rejected at load time."""
+        vector = VectorComputer(2)
+        with self.assertRaises(ValueError):
+            vector.load_program([("STA", 300), ("HALT", None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
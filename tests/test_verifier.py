@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SimpleScript bytecode verifier.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.verifier import verify, VerificationError
+from src.computer import Computer
+
+
+class TestVerify(unittest.TestCase):
+    """Tests for verify()."""
+
+    def assertRejected(self, program, reason, position, memory_size=256):
+        with self.assertRaises(VerificationError) as context:
+            verify(program, memory_size)
+        self.assertEqual(context.exception.reason, reason)
+        self.assertEqual(context.exception.position, position)
+
+    def test_valid_program(self):
+        """A valid program passes."""
+        verify([("LDA_MEM", 16), ("STA", 255), ("JZ", 3), ("CALL", 0), ("HALT", None)], 256)
+
+    def test_jump_to_end(self):
+        """A jump to the end of the program is allowed."""
+        verify([("JMP", 1)], 256)
+
+    def test_unresolved_label(self):
+        """Labels are reported even after other problems."""
+        self.assertRejected([("STA", 999), ("JMP", "L0")], "label", 1)
+
+    def test_address_out_of_bounds(self):
+        """Memory operands must lie inside memory."""
+        self.assertRejected([("LDA", 999), ("LDB_MEM", 256)], "address", 1)
+        self.assertRejected([("STB", -1)], "address", 0)
+        self.assertRejected([("STA", None)], "address", 0)
+
+    def test_jump_target_out_of_range(self):
+        """Jump and call targets must lie inside the program."""
+        self.assertRejected([("JNZ", 3), ("HALT", None)], "target", 0)
+        self.assertRejected([("HALT", None), ("CALL", -1)], "target", 1)
+
+    def test_unknown_instruction(self):
+        """Unknown instructions are rejected."""
+        self.assertRejected([("NOP", None)], "instruction", 0)
+
+    def test_is_value_error(self):
+        """Verification errors are ValueErrors."""
+        self.assertTrue(issubclass(VerificationError, ValueError))
+
+
+class TestVerifiedExecution(unittest.TestCase):
+    """Tests for running verified and unverified programs."""
+
+    def test_verified_program_unchecked(self):
+        """Verified programs use the unchecked memory handlers."""
+        computer = Computer(fuse_instructions=False)
+        computer.load_program([("LDA", 5), ("STA", 16), ("LDB_MEM", 16), ("HALT", None)])
+        self.assertTrue(computer.verified)
+        self.assertEqual(computer.code.handlers[1], computer.cpu._sta_unchecked)
+        computer.run()
+        self.assertEqual(computer.cpu.register_b, 5)
+
+    def test_unverified_program_checked(self):
+        """Programs that fail verification keep their range checks."""
+        computer = Computer()
+        computer.load_program([("LDA", 5), ("STA", 300), ("HALT", None)])
+        self.assertFalse(computer.verified)
+        with self.assertRaises(IndexError):
+            computer.run()
+
+    def test_unresolved_label_on_run(self):
+        """Unresolved labels are reported when the program is run."""
+        computer = Computer()
+        computer.load_program([("JMP", "end"), ("HALT", None)])
+        with self.assertRaises(ValueError):
+            computer.run()
+
+    def test_snapshot_sees_unchecked_stores(self):
+        """Restoring a snapshot undoes stores made by unchecked handlers."""
+        computer = Computer(fuse_instructions=False)
+        computer.load_program([("LDA", 5), ("STA", 16), ("HALT", None)])
+        snapshot = computer.snapshot()
+        computer.run()
+        self.assertEqual(computer.memory.read(16), 5)
+        computer.restore(snapshot)
+        self.assertEqual(computer.memory.read(16), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()